@@ -2,11 +2,21 @@
 
 from .publish import (  # noqa: F401
     publish_application,
+    publish_applications,
+    publish_application_to_regions,
+    prepare_template,
+    prepare_templates,
+    publish_prepared_applications,
     update_application_metadata
 )
 
 from .permission_helper import (  # noqa: F401
     make_application_public,
     make_application_private,
-    share_application_with_accounts
+    share_application_with_accounts,
+    add_accounts_to_application,
+    remove_accounts_from_application,
+    make_applications_public,
+    make_applications_private,
+    share_applications_with_accounts
 )
@@ -0,0 +1,160 @@
+"""
+Coroutine versions of the publish and permission helpers for asyncio applications.
+
+The SAR calls are made by boto3 on a bounded thread pool, so an event loop can drive
+many of them concurrently without one thread per call. Requires Python 3.5 or greater.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from . import publish, permission_helper
+from .clients import get_client
+from .concurrency import DEFAULT_MAX_WORKERS
+
+
+def create_executor(max_concurrency=None):
+    """
+    Create a thread pool that limits how many SAR calls run at the same time.
+
+    :param max_concurrency: Maximum number of concurrent SAR calls, defaults to DEFAULT_MAX_WORKERS
+    :type max_concurrency: int
+    :return: Executor to pass to the coroutines of this module
+    :rtype: concurrent.futures.ThreadPoolExecutor
+    """
+    return ThreadPoolExecutor(max_workers=max_concurrency or DEFAULT_MAX_WORKERS)
+
+
+async def publish_application(template, sar_client=None, executor=None, parallel_version=False):
+    """
+    Create a new application or new application version in SAR.
+
+    :param template: Content of a packaged YAML or JSON SAM template
+    :type template: str_or_dict
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param executor: Executor running the SAR calls, defaults to the event loop's executor
+    :type executor: concurrent.futures.Executor
+    :param parallel_version: Create the application version at the same time as updating an existing application
+    :type parallel_version: bool
+    :return: Dictionary containing application id, actions taken, and updated details
+    :rtype: dict
+    :raises ValueError
+    """
+    return await _run(executor, functools.partial(publish.publish_application, parallel_version=parallel_version),
+                      template, sar_client or get_client())
+
+
+async def publish_applications(templates, sar_client=None, max_concurrency=None, parallel_version=False):
+    """
+    Publish multiple applications concurrently, sharing one SAR client.
+
+    A failure to publish one template doesn't stop the rest of the batch.
+
+    :param templates: Contents of packaged YAML or JSON SAM templates
+    :type templates: list of str_or_dict
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param max_concurrency: Maximum number of templates published at the same time
+    :type max_concurrency: int
+    :param parallel_version: Create application versions at the same time as updating existing applications
+    :type parallel_version: bool
+    :return: Dictionaries containing the 'result' of publish_application or the 'error' raised, in input order
+    :rtype: list of dict
+    """
+    max_concurrency = max_concurrency or DEFAULT_MAX_WORKERS
+    if not sar_client:
+        # Each publish has two calls in flight when creating versions in parallel
+        sar_client = get_client(max_pool_connections=max_concurrency * (2 if parallel_version else 1))
+
+    with create_executor(max_concurrency) as executor:
+        outcomes = await asyncio.gather(
+            *[publish_application(template, sar_client, executor, parallel_version) for template in templates],
+            return_exceptions=True
+        )
+
+    return [
+        {'result': None, 'error': outcome} if isinstance(outcome, Exception) else {'result': outcome, 'error': None}
+        for outcome in outcomes
+    ]
+
+
+async def update_application_metadata(template, application_id, sar_client=None, executor=None):
+    """
+    Update the application metadata.
+
+    :param template: Content of a packaged YAML or JSON SAM template
+    :type template: str_or_dict
+    :param application_id: The Amazon Resource Name (ARN) of the application
+    :type application_id: str
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param executor: Executor running the SAR calls, defaults to the event loop's executor
+    :type executor: concurrent.futures.Executor
+    :raises ValueError
+    """
+    await _run(executor, publish.update_application_metadata, template, application_id, sar_client or get_client())
+
+
+async def make_application_public(application_id, sar_client=None, executor=None):
+    """
+    Set the application to be public.
+
+    :param application_id: The Amazon Resource Name (ARN) of the application
+    :type application_id: str
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param executor: Executor running the SAR calls, defaults to the event loop's executor
+    :type executor: concurrent.futures.Executor
+    :raises ValueError
+    """
+    await _run(executor, permission_helper.make_application_public, application_id, sar_client or get_client())
+
+
+async def make_application_private(application_id, sar_client=None, executor=None):
+    """
+    Set the application to be private.
+
+    :param application_id: The Amazon Resource Name (ARN) of the application
+    :type application_id: str
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param executor: Executor running the SAR calls, defaults to the event loop's executor
+    :type executor: concurrent.futures.Executor
+    :raises ValueError
+    """
+    await _run(executor, permission_helper.make_application_private, application_id, sar_client or get_client())
+
+
+async def share_application_with_accounts(application_id, account_ids, sar_client=None, executor=None):
+    """
+    Share the application privately with given AWS account IDs.
+
+    :param application_id: The Amazon Resource Name (ARN) of the application
+    :type application_id: str
+    :param account_ids: List of AWS account IDs, or *
+    :type account_ids: list of str
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param executor: Executor running the SAR calls, defaults to the event loop's executor
+    :type executor: concurrent.futures.Executor
+    :raises ValueError
+    """
+    await _run(executor, permission_helper.share_application_with_accounts,
+               application_id, account_ids, sar_client or get_client())
+
+
+def _run(executor, func, *args):
+    """
+    Run the blocking function in the executor.
+
+    :param executor: Executor running the function, None for the event loop's executor
+    :type executor: concurrent.futures.Executor
+    :param func: Blocking function to run
+    :type func: callable
+    :return: Future wrapping the result of the function
+    :rtype: asyncio.Future
+    """
+    loop = asyncio.get_event_loop()
+    return loop.run_in_executor(executor, func, *args)
@@ -0,0 +1,131 @@
+"""Module containing class to cache SAR application IDs locally."""
+
+import os
+import json
+import tempfile
+import threading
+
+
+class ApplicationCache(object):
+    """
+    Class mapping application names to their application IDs and last published content digests.
+
+    Application names are only unique within an AWS account and region, so use one
+    cache per account and region.
+    """
+
+    APPLICATION_ID = 'ApplicationId'
+    DIGEST = 'Digest'
+
+    def __init__(self, path=None):
+        """
+        Initialize the cache, loading previous entries from the cache file if provided.
+
+        :param path: Path of the JSON file the cache is persisted to, or None to keep it in memory
+        :type path: str
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def get(self, name):
+        """
+        Get the cached application ID of an application.
+
+        :param name: Name of the application
+        :type name: str
+        :return: The Amazon Resource Name (ARN) of the application, or None if not cached
+        :rtype: str
+        """
+        with self._lock:
+            return self._entries.get(name, {}).get(self.APPLICATION_ID)
+
+    def get_digest(self, name):
+        """
+        Get the digest of the content last published for an application.
+
+        :param name: Name of the application
+        :type name: str
+        :return: Digest of the published content, or None if not cached
+        :rtype: str
+        """
+        with self._lock:
+            return self._entries.get(name, {}).get(self.DIGEST)
+
+    def put(self, name, application_id, digest=None):
+        """
+        Cache the application ID of an application and the digest of its published content.
+
+        :param name: Name of the application
+        :type name: str
+        :param application_id: The Amazon Resource Name (ARN) of the application
+        :type application_id: str
+        :param digest: Digest of the published content
+        :type digest: str
+        """
+        entry = {self.APPLICATION_ID: application_id}
+        if digest:
+            entry[self.DIGEST] = digest
+
+        with self._lock:
+            if self._entries.get(name) == entry:
+                return
+            self._entries[name] = entry
+            self._save()
+
+    def invalidate(self, name):
+        """
+        Remove a stale application from the cache.
+
+        :param name: Name of the application
+        :type name: str
+        """
+        with self._lock:
+            if self._entries.pop(name, None) is not None:
+                self._save()
+
+    def _load(self):
+        """
+        Load the entries from the cache file, ignoring a missing or malformed file.
+
+        :return: Cached entries keyed by application name
+        :rtype: dict
+        """
+        if not self.path or not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except ValueError:
+            return {}
+
+        return entries if isinstance(entries, dict) else {}
+
+    def _save(self):
+        """Atomically write the entries to the cache file, so readers never see a partial file."""
+        if not self.path:
+            return
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.serverlessrepo-cache-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self._entries, f, indent=2, sort_keys=True)
+            _replace(temp_path, self.path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+
+def _replace(source, destination):
+    """
+    Atomically rename source to destination, overwriting destination if it exists.
+
+    :param source: Path of the file to rename
+    :type source: str
+    :param destination: Path to rename the file to
+    :type destination: str
+    """
+    # os.replace isn't available on Python 2, where os.rename already overwrites on POSIX
+    getattr(os, 'replace', os.rename)(source, destination)
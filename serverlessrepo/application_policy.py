@@ -1,12 +1,19 @@
 """Module containing class to store SAR application permissions."""
 
-import re
+from collections import OrderedDict
 
 from .exceptions import InvalidApplicationPolicyError
 
 
 class ApplicationPolicy(object):
-    """Class representing SAR application policy."""
+    """
+    Class representing SAR application policy.
+
+    Principals and actions are stored as sets, so policies with the same principals and actions compare
+    equal and have the same hash, whatever their order or duplicates.
+    """
+
+    __slots__ = ('principals', 'actions')
 
     # Supported actions for setting SAR application permissions
     GET_APPLICATION = 'GetApplication'
@@ -27,7 +34,8 @@ class ApplicationPolicy(object):
         DEPLOY
     ]
 
-    _PRINCIPAL_PATTERN = re.compile(r'^([0-9]{12}|\*)$')
+    _SUPPORTED_ACTION_SET = frozenset(SUPPORTED_ACTIONS)
+    _DIGITS = frozenset('0123456789')
 
     def __init__(self, principals, actions):
         """
@@ -38,8 +46,23 @@ class ApplicationPolicy(object):
         :param actions: List of actions supported by SAR
         :type actions: list of str
         """
-        self.principals = principals
-        self.actions = actions
+        self.principals = frozenset(principals or ())
+        self.actions = frozenset(actions or ())
+
+    def __eq__(self, other):
+        """Compare the principals and actions of two policies."""
+        if not isinstance(other, ApplicationPolicy):
+            return NotImplemented
+        return self.principals == other.principals and self.actions == other.actions
+
+    def __ne__(self, other):
+        """Compare the principals and actions of two policies, needed on Python 2."""
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        """Hash the principals and actions of the policy."""
+        return hash((self.principals, self.actions))
 
     def validate(self):
         """
@@ -54,14 +77,15 @@ class ApplicationPolicy(object):
         if not self.actions:
             raise InvalidApplicationPolicyError(error_message='actions not provided')
 
-        if any(not self._PRINCIPAL_PATTERN.match(p) for p in self.principals):
-            raise InvalidApplicationPolicyError(
-                error_message='principal should be 12-digit AWS account ID or "*"')
+        for principal in self.principals:
+            if principal != '*' and (len(principal) != 12 or not self._DIGITS.issuperset(principal)):
+                raise InvalidApplicationPolicyError(
+                    error_message='principal should be 12-digit AWS account ID or "*"')
 
-        unsupported_actions = sorted(set(self.actions) - set(self.SUPPORTED_ACTIONS))
+        unsupported_actions = self.actions - self._SUPPORTED_ACTION_SET
         if unsupported_actions:
             raise InvalidApplicationPolicyError(
-                error_message='{} not supported'.format(', '.join(unsupported_actions)))
+                error_message='{} not supported'.format(', '.join(sorted(unsupported_actions))))
 
         return True
 
@@ -69,10 +93,101 @@ class ApplicationPolicy(object):
         """
         Convert to a policy statement dictionary.
 
-        :return: Dictionary containing Actions and Principals
+        :return: Dictionary containing sorted Actions and Principals
         :rtype: dict
         """
         return {
-            'Principals': self.principals,
-            'Actions': self.actions
+            'Principals': sorted(self.principals),
+            'Actions': sorted(self.actions)
         }
+
+
+def add_accounts(statements, account_ids, actions=None):
+    """
+    Grant the actions to AWS accounts, merging them into existing policy statements.
+
+    The accounts are added to the statement with the same set of actions, and statements with the same
+    set of actions are merged, so the policy keeps one statement per set of actions.
+
+    :param statements: Current policy statements
+    :type statements: list of dict
+    :param account_ids: List of AWS account IDs, or *
+    :type account_ids: list of str
+    :param actions: List of actions supported by SAR, defaults to Deploy
+    :type actions: list of str
+    :return: New policy statements
+    :rtype: list of dict
+    :raises: InvalidApplicationPolicyError
+    """
+    application_policy = ApplicationPolicy(account_ids, actions or [ApplicationPolicy.DEPLOY])
+    application_policy.validate()
+
+    groups, other_statements = _group_statements(statements)
+    groups.setdefault(application_policy.actions, set()).update(application_policy.principals)
+    return _to_statements(groups, other_statements)
+
+
+def remove_accounts(statements, account_ids, actions=None):
+    """
+    Revoke access from AWS accounts, removing them from existing policy statements.
+
+    Statements left without principals are removed, and statements with the same set of actions are merged.
+
+    :param statements: Current policy statements
+    :type statements: list of dict
+    :param account_ids: List of AWS account IDs, or *
+    :type account_ids: list of str
+    :param actions: Only remove the accounts from the statement with this set of actions, defaults to
+        every statement
+    :type actions: list of str
+    :return: New policy statements
+    :rtype: list of dict
+    """
+    account_ids = set(account_ids)
+    groups, other_statements = _group_statements(statements)
+    for group_actions, principals in groups.items():
+        if not actions or group_actions == frozenset(actions):
+            principals.difference_update(account_ids)
+
+    return _to_statements(groups, other_statements)
+
+
+def _group_statements(statements):
+    """
+    Group the principals of policy statements by their set of actions.
+
+    :param statements: Policy statements
+    :type statements: list of dict
+    :return: Principals keyed by set of actions, in order of appearance, and the statements restricted to
+        AWS Organizations, which are left as they are
+    :rtype: tuple
+    """
+    groups = OrderedDict()
+    other_statements = []
+    for statement in statements:
+        if statement.get('PrincipalOrgIDs'):
+            other_statements.append(statement)
+            continue
+
+        groups.setdefault(frozenset(statement.get('Actions', [])), set()).update(statement.get('Principals', []))
+
+    return groups, other_statements
+
+
+def _to_statements(groups, other_statements):
+    """
+    Convert grouped principals back to policy statements, dropping groups without principals.
+
+    :param groups: Principals keyed by set of actions
+    :type groups: dict
+    :param other_statements: Statements left as they are
+    :type other_statements: list of dict
+    :return: Policy statements
+    :rtype: list of dict
+    """
+    statements = [
+        {'Principals': sorted(principals), 'Actions': sorted(actions)}
+        for actions, principals in groups.items()
+        if principals and actions
+    ]
+    return statements + other_statements
@@ -0,0 +1,179 @@
+"""Command line interface publishing every application template found in directory trees."""
+
+import os
+import io
+import sys
+import json
+import fnmatch
+import argparse
+import functools
+
+from .__version__ import __version__
+from .application_cache import ApplicationCache
+from .clients import get_client
+from .concurrency import run_in_processes, DEFAULT_MAX_WORKERS
+from .parser import METADATA, SERVERLESS_REPO_APPLICATION, TemplateCache, get_template_cache, set_template_cache
+from .publish import prepare_template, publish_prepared_applications
+from .template_directory_cache import TemplateDirectoryCache
+
+# Source templates have the same metadata but local code, only the ones packaged for SAR are published
+DEFAULT_PATTERNS = ['packaged.yaml', 'packaged.yml']
+
+
+def main(argv=None):
+    """
+    Run the command line interface.
+
+    :param argv: Command line arguments, defaults to sys.argv
+    :type argv: list of str
+    :return: Exit code, 1 if any template failed to publish
+    :rtype: int
+    """
+    arg_parser = _get_arg_parser()
+    args = arg_parser.parse_args(argv)
+    for path in args.paths:
+        if not os.path.exists(path):
+            arg_parser.error('path not found: {}'.format(path))
+
+    summary = publish_directories(args)
+    json.dump(summary, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write('\n')
+    return 1 if summary['failed'] else 0
+
+
+def publish_directories(args):
+    """
+    Find the application templates in directory trees, prepare them in a process pool and publish them.
+
+    :param args: Parsed command line arguments of the publish command
+    :type args: argparse.Namespace
+    :return: Summary containing the outcome of every template found
+    :rtype: dict
+    """
+    paths = find_templates(args.paths, args.pattern or DEFAULT_PATTERNS)
+    results = []
+    prepared_templates = []
+    load_template = functools.partial(_load_template, template_cache_directory=args.template_cache)
+    for path, outcome in zip(paths, run_in_processes(load_template, paths, args.processes)):
+        if outcome['error']:
+            results.append({'path': path, 'error': str(outcome['error'])})
+        elif outcome['result']:
+            results.append({'path': path, 'error': None})
+            prepared_templates.append((results[-1], outcome['result']))
+
+    if not args.dry_run and prepared_templates:
+        sar_client = get_client(region_name=args.region, profile_name=args.profile,
+                                max_pool_connections=args.workers * (2 if args.parallel_version else 1))
+        application_cache = ApplicationCache(args.cache) if args.cache else None
+        outcomes = publish_prepared_applications(
+            [prepared_template for _, prepared_template in prepared_templates], sar_client, args.workers,
+            application_cache, parallel_version=args.parallel_version)
+        for (result, _), outcome in zip(prepared_templates, outcomes):
+            if outcome['error']:
+                result['error'] = str(outcome['error'])
+            else:
+                result.update(outcome['result'])
+
+    return {
+        'templates': len(results),
+        'failed': sum(1 for result in results if result['error']),
+        'results': results
+    }
+
+
+def find_templates(paths, patterns):
+    """
+    Find the files matching the patterns in directory trees, skipping hidden directories.
+
+    :param paths: Directories or files
+    :type paths: list of str
+    :param patterns: File name patterns, e.g. *.yaml
+    :type patterns: list of str
+    :return: Paths of the files found, sorted
+    :rtype: list of str
+    """
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+
+        for directory, directory_names, file_names in os.walk(path):
+            directory_names[:] = [name for name in directory_names if not name.startswith('.')]
+            found.extend(
+                os.path.join(directory, name) for name in file_names
+                if any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+            )
+    return sorted(set(found))
+
+
+def _load_template(path, template_cache_directory=None):
+    """
+    Read and prepare a template file, in a worker process.
+
+    :param path: Path of the file
+    :type path: str
+    :param template_cache_directory: Path of the directory prepared templates are cached in
+    :type template_cache_directory: str
+    :return: Application metadata and the template without it, or None if the file isn't an application template
+    :rtype: tuple
+    """
+    with io.open(path, encoding='utf-8') as f:
+        template = f.read()
+
+    if SERVERLESS_REPO_APPLICATION not in template or METADATA not in template:
+        return None
+
+    if template_cache_directory:
+        _use_template_cache_directory(template_cache_directory)
+    return prepare_template(template)
+
+
+def _use_template_cache_directory(directory):
+    """
+    Cache the prepared templates in a directory, once per process.
+
+    :param directory: Path of the directory prepared templates are cached in
+    :type directory: str
+    """
+    template_cache = get_template_cache()
+    directory_cache = template_cache.directory_cache if template_cache is not None else None
+    if directory_cache is None or directory_cache.path != directory:
+        set_template_cache(TemplateCache(directory_cache=TemplateDirectoryCache(directory)))
+
+
+def _get_arg_parser():
+    """
+    Get the parser of the command line arguments.
+
+    :return: The parser
+    :rtype: argparse.ArgumentParser
+    """
+    arg_parser = argparse.ArgumentParser(prog='serverlessrepo', description=__doc__)
+    arg_parser.add_argument('--version', action='version', version='%(prog)s ' + __version__)
+    subparsers = arg_parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    publish_parser = subparsers.add_parser(
+        'publish', help='publish every application template found in directory trees',
+        description='Find the templates containing AWS::ServerlessRepo::Application metadata in directory '
+                    'trees and publish them, printing a JSON summary.')
+    publish_parser.add_argument('paths', nargs='+', help='directories to search, or template files')
+    publish_parser.add_argument('--pattern', action='append',
+                                help='file name pattern of templates, can be repeated (default: {})'.format(
+                                    ' '.join(DEFAULT_PATTERNS)))
+    publish_parser.add_argument('--region', help='AWS region to publish to')
+    publish_parser.add_argument('--profile', help='AWS profile to use')
+    publish_parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS,
+                                help='number of templates published at the same time (default: %(default)s)')
+    publish_parser.add_argument('--processes', type=int,
+                                help='number of processes parsing templates (default: number of CPUs)')
+    publish_parser.add_argument('--cache', help='path of the application cache file, to skip unchanged templates')
+    publish_parser.add_argument('--template-cache',
+                                help='path of a directory caching the prepared templates, to skip parsing '
+                                     'unchanged templates, it can be shared by concurrent runs')
+    publish_parser.add_argument('--parallel-version', action='store_true',
+                                help='create application versions at the same time as updating applications')
+    publish_parser.add_argument('--dry-run', action='store_true',
+                                help='find and prepare the templates without publishing them')
+    return arg_parser
@@ -0,0 +1,53 @@
+"""Module caching SAR clients so that they're reused across calls."""
+
+import threading
+
+import boto3
+from botocore.config import Config
+
+# Same as the botocore default
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_client(region_name=None, profile_name=None, endpoint_url=None, max_pool_connections=None):
+    """
+    Get a SAR client, creating it only the first time it's requested.
+
+    Clients are thread-safe and keep their connections open, so they're shared by every caller
+    requesting the same region, profile, endpoint and connection pool size.
+
+    :param region_name: AWS region of the client, defaults to the region inferred from aws configurations
+    :type region_name: str
+    :param profile_name: AWS profile used for credentials and configuration, defaults to the default profile
+    :type profile_name: str
+    :param endpoint_url: SAR endpoint, defaults to the endpoint of the region
+    :type endpoint_url: str
+    :param max_pool_connections: Maximum number of connections kept open, defaults to DEFAULT_MAX_POOL_CONNECTIONS
+    :type max_pool_connections: int
+    :return: The boto3 client used to access SAR
+    :rtype: boto3.client
+    """
+    max_pool_connections = max_pool_connections or DEFAULT_MAX_POOL_CONNECTIONS
+    key = (region_name, profile_name, endpoint_url, max_pool_connections)
+    with _lock:
+        # boto3 sessions aren't thread-safe, so clients are created under the lock
+        if key not in _clients:
+            # The boto3 module creates clients from the default session
+            session = boto3.session.Session(profile_name=profile_name) if profile_name else boto3
+            _clients[key] = session.client(
+                'serverlessrepo',
+                region_name=region_name,
+                endpoint_url=endpoint_url,
+                # Calls are retried by the call scheduler, botocore retries would multiply its attempts
+                config=Config(max_pool_connections=max_pool_connections, retries={'max_attempts': 0})
+            )
+        return _clients[key]
+
+
+def clear_clients():
+    """Drop the cached clients, e.g. after credentials or configuration have changed."""
+    with _lock:
+        _clients.clear()
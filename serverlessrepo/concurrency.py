@@ -0,0 +1,115 @@
+"""Helpers to run independent SAR calls concurrently on a bounded thread pool, and CPU-bound work on processes."""
+
+import functools
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# botocore keeps at most 10 connections in a client's pool by default
+DEFAULT_MAX_WORKERS = 10
+# Threads of the shared pool are only started when calls are waiting, so the bound can be generous
+SHARED_MAX_WORKERS = 50
+
+_shared_executor = None  # pylint: disable=invalid-name
+_shared_executor_lock = threading.Lock()
+
+
+def get_shared_executor():
+    """
+    Get the thread pool shared by every call of this library, created on first use.
+
+    It runs the calls made alongside the calling thread's own, so they don't pay for creating a pool.
+
+    :return: The executor
+    :rtype: concurrent.futures.ThreadPoolExecutor
+    """
+    global _shared_executor  # pylint: disable=global-statement
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(max_workers=SHARED_MAX_WORKERS)
+        return _shared_executor
+
+
+def run_concurrently(func, items, max_workers=None):
+    """
+    Call the function once per item on a bounded thread pool.
+
+    A failure for one item doesn't stop the other items from being processed.
+
+    :param func: Function taking a single item as its argument
+    :type func: callable
+    :param items: Items to process
+    :type items: list
+    :param max_workers: Maximum number of concurrent calls, defaults to DEFAULT_MAX_WORKERS
+    :type max_workers: int
+    :return: Dictionaries containing the 'result' and 'error' of each call, in the same order as items
+    :rtype: list of dict
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    max_workers = max_workers or DEFAULT_MAX_WORKERS
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(func, item) for item in items]
+        return [_get_outcome(future) for future in futures]
+
+
+def run_in_processes(func, items, max_workers=None):
+    """
+    Call the function once per item on a process pool, to use every core for CPU-bound work.
+
+    The function, items, results and exceptions must be picklable. A failure for one item doesn't stop
+    the other items from being processed.
+
+    :param func: Module level function taking a single item as its argument
+    :type func: callable
+    :param items: Items to process
+    :type items: list
+    :param max_workers: Maximum number of processes, defaults to the number of CPUs, 1 to process the items
+        in this process
+    :type max_workers: int
+    :return: Dictionaries containing the 'result' and 'error' of each call, in the same order as items
+    :rtype: list of dict
+    """
+    items = list(items)
+    if max_workers == 1 or len(items) < 2:
+        return [_call(func, item) for item in items]
+
+    max_workers = min(max_workers or multiprocessing.cpu_count(), len(items))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Send items in batches, so small items don't pay one round trip to a process each
+        chunk_size = max(len(items) // (max_workers * 4), 1)
+        return list(executor.map(functools.partial(_call, func), items, chunksize=chunk_size))
+
+
+def _call(func, item):
+    """
+    Call the function and capture either its result or its exception.
+
+    :param func: Function taking a single item as its argument
+    :type func: callable
+    :param item: Item to process
+    :return: Dictionary containing the 'result' and 'error' of the call
+    :rtype: dict
+    """
+    try:
+        return {'result': func(item), 'error': None}
+    except Exception as e:  # pylint: disable=broad-except
+        return {'result': None, 'error': e}
+
+
+def _get_outcome(future):
+    """
+    Wait for the future and capture either its result or its exception.
+
+    :param future: Future of a submitted call
+    :type future: concurrent.futures.Future
+    :return: Dictionary containing the 'result' and 'error' of the call
+    :rtype: dict
+    """
+    error = future.exception()
+    return {
+        'result': None if error else future.result(),
+        'error': error
+    }
@@ -1,5 +1,7 @@
 """Collection of public exceptions raised by this library."""
 
+import functools
+
 
 class ServerlessRepoError(Exception):
     """Base exception raised by serverlessrepo library."""
@@ -9,6 +11,11 @@ class ServerlessRepoError(Exception):
     def __init__(self, **kwargs):
         """Init the exception object."""
         Exception.__init__(self, self.MESSAGE.format(**kwargs))
+        self.kwargs = kwargs
+
+    def __reduce__(self):
+        """Pickle the exception with its keyword arguments, e.g. to send it back from a process pool."""
+        return functools.partial(self.__class__, **self.kwargs), ()
 
 
 class InvalidApplicationMetadataError(ServerlessRepoError):
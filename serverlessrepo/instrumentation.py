@@ -0,0 +1,190 @@
+"""Module emitting timed spans for the phases of publishing and managing applications."""
+
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+_observers = []
+_lock = threading.Lock()
+
+
+class Span(object):  # pylint: disable=too-few-public-methods
+    """Class representing a timed phase, e.g. parsing a template or a SAR call."""
+
+    __slots__ = ('name', 'duration', 'attributes', 'error')
+
+    def __init__(self, name, duration, attributes, error=None):
+        """
+        Initialize the span.
+
+        :param name: Name of the phase, e.g. parse_template or sar.create_application
+        :type name: str
+        :param duration: Duration of the phase in seconds
+        :type duration: float
+        :param attributes: Details of the phase, e.g. template_bytes, retries or conflict
+        :type attributes: dict
+        :param error: Exception raised by the phase, or None if it succeeded
+        :type error: Exception
+        """
+        self.name = name
+        self.duration = duration
+        self.attributes = attributes
+        self.error = error
+
+
+class LatencyAggregator(object):
+    """
+    Observer collecting the durations of spans in process, to report their latency percentiles.
+
+    Only the most recent durations of each span name are kept, so memory stays bounded.
+    """
+
+    def __init__(self, max_samples=10000):
+        """
+        Initialize the aggregator.
+
+        :param max_samples: Maximum number of durations kept per span name
+        :type max_samples: int
+        """
+        self.max_samples = max_samples
+        self._samples = {}
+        self._counts = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, finished_span):
+        """
+        Record the duration of a span.
+
+        :param finished_span: The finished span
+        :type finished_span: Span
+        """
+        name = finished_span.name
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=self.max_samples)
+                self._counts[name] = 0
+                self._errors[name] = 0
+            self._samples[name].append(finished_span.duration)
+            self._counts[name] += 1
+            if finished_span.error is not None:
+                self._errors[name] += 1
+
+    def summary(self):
+        """
+        Get the latency percentiles of every span name.
+
+        :return: Dictionary keyed by span name, containing the count, errors, and p50, p95 and p99
+            durations in seconds
+        :rtype: dict
+        """
+        with self._lock:
+            samples = {name: sorted(durations) for name, durations in self._samples.items()}
+            counts = dict(self._counts)
+            errors = dict(self._errors)
+
+        return {
+            name: {
+                'count': counts[name],
+                'errors': errors[name],
+                'p50': _percentile(durations, 50),
+                'p95': _percentile(durations, 95),
+                'p99': _percentile(durations, 99)
+            }
+            for name, durations in samples.items()
+        }
+
+    def reset(self):
+        """Drop the durations recorded so far."""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._errors.clear()
+
+
+def register_observer(observer):
+    """
+    Register an observer called with every finished span.
+
+    Observers are called on the thread that ran the phase, so they must be thread-safe,
+    and shouldn't raise exceptions.
+
+    :param observer: Function taking a Span, e.g. a LatencyAggregator
+    :type observer: callable
+    """
+    global _observers  # pylint: disable=global-statement
+    with _lock:
+        # Replace the list instead of mutating it, so spans are emitted without locking
+        _observers = _observers + [observer]
+
+
+def unregister_observer(observer):
+    """
+    Stop calling an observer.
+
+    :param observer: Observer previously registered
+    :type observer: callable
+    """
+    global _observers  # pylint: disable=global-statement
+    with _lock:
+        _observers = [o for o in _observers if o != observer]
+
+
+def is_enabled():
+    """
+    Check whether spans are observed, to skip computing attributes nobody reads.
+
+    :return: True if an observer is registered
+    """
+    return bool(_observers)
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Time the wrapped block and emit it as a span to the registered observers.
+
+    Nothing is timed when no observer is registered.
+
+    :param name: Name of the phase
+    :type name: str
+    :param attributes: Initial details of the phase
+    :return: Dictionary of attributes the block can add details to
+    :rtype: dict
+    """
+    observers = _observers
+    if not observers:
+        yield attributes
+        return
+
+    start = _clock()
+    try:
+        yield attributes
+    except Exception as e:
+        _emit(observers, Span(name, _clock() - start, attributes, e))
+        raise
+    _emit(observers, Span(name, _clock() - start, attributes))
+
+
+def _emit(observers, finished_span):
+    """Call the observers with a finished span."""
+    for observer in observers:
+        observer(finished_span)
+
+
+def _percentile(durations, percent):
+    """
+    Get a percentile of sorted durations, using the nearest rank method.
+
+    :param durations: Sorted durations
+    :type durations: list of float
+    :param percent: Percentile between 0 and 100
+    :type percent: int
+    :return: The duration at the percentile
+    :rtype: float
+    """
+    rank = max(int(-(-len(durations) * percent // 100)), 1)
+    return durations[rank - 1]
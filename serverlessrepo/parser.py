@@ -3,6 +3,8 @@
 import re
 import copy
 import json
+import hashlib
+import threading
 from collections import OrderedDict
 
 import six
@@ -12,9 +14,18 @@ from yaml.resolver import ScalarNode, SequenceNode
 from .application_metadata import ApplicationMetadata
 from .exceptions import ApplicationMetadataNotFoundError
 
+try:
+    # Use the libyaml based implementations when available, they're much faster
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper
+
 METADATA = 'Metadata'
 SERVERLESS_REPO_APPLICATION = 'AWS::ServerlessRepo::Application'
 APPLICATION_ID_PATTERN = r'arn:[\w\-]+:serverlessrepo:[\w\-]+:[0-9]+:applications\/[\S]+'
+DEFAULT_TEMPLATE_CACHE_SIZE = 128
+# Document start or end marker, which can only be at the start of a line
+_DOCUMENT_MARKER = re.compile(r'^(?:---|\.\.\.)(?:[ \t\r\n]|$)', re.MULTILINE)
 
 
 def intrinsics_multi_constructor(loader, tag_prefix, node):
@@ -58,21 +69,36 @@ def _dict_representer(dumper, data):
     return dumper.represent_dict(data.items())
 
 
-def yaml_dump(dict_to_dump):
+def _dict_constructor(loader, node):
+    return OrderedDict(loader.construct_pairs(node))
+
+
+class SamLoader(_SafeLoader):  # pylint: disable=too-many-ancestors
+    """Safe YAML loader which parses CloudFormation intrinsics and preserves the order of mappings."""
+
+
+class SamDumper(_SafeDumper):  # pylint: disable=too-many-ancestors
+    """Safe YAML dumper which preserves the order of OrderedDict."""
+
+
+# Register once on dedicated classes instead of mutating the global PyYAML classes on every call
+SamLoader.add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, _dict_constructor)
+SamLoader.add_multi_constructor('!', intrinsics_multi_constructor)
+SamDumper.add_representer(OrderedDict, _dict_representer)
+
+
+def yaml_dump(dict_to_dump, stream=None):
     """
     Dump the dictionary as a YAML document.
 
     :param dict_to_dump: Data to be serialized as YAML
     :type dict_to_dump: dict
-    :return: YAML document
+    :param stream: File-like object the document is written to as it's emitted, instead of returning it
+    :type stream: file
+    :return: YAML document, or None if a stream is provided
     :rtype: str
     """
-    yaml.SafeDumper.add_representer(OrderedDict, _dict_representer)
-    return yaml.safe_dump(dict_to_dump, default_flow_style=False)
-
-
-def _dict_constructor(loader, node):
-    return OrderedDict(loader.construct_pairs(node))
+    return yaml.dump(dict_to_dump, stream, Dumper=SamDumper, default_flow_style=False)
 
 
 def parse_template(template_str):
@@ -90,9 +116,259 @@ def parse_template(template_str):
         # json parser.
         return json.loads(template_str, object_pairs_hook=OrderedDict)
     except ValueError:
-        yaml.SafeLoader.add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, _dict_constructor)
-        yaml.SafeLoader.add_multi_constructor('!', intrinsics_multi_constructor)
-        return yaml.safe_load(template_str)
+        return yaml.load(template_str, Loader=SamLoader)
+
+
+def extract_app_metadata(template_str):
+    """
+    Extract the "AWS::ServerlessRepo::Application" metadata section from a YAML template.
+
+    Only the metadata section is constructed, the rest of the template is scanned for its structure
+    up to the end of the Metadata section.
+
+    :param template_str: A packaged YAML CloudFormation template
+    :type template_str: str
+    :return: Application metadata, or None if the metadata section isn't a block in a block style
+        template and the template has to be parsed instead
+    :rtype: ApplicationMetadata
+    """
+    app_section = _load_app_metadata_section(template_str)
+    return app_section[0] if app_section else None
+
+
+def split_app_metadata(template_str):
+    """
+    Extract the "AWS::ServerlessRepo::Application" metadata section from a YAML template and strip it.
+
+    Only the metadata section is constructed, the rest of the template is scanned for its structure
+    and kept as is, including formatting and comments.
+
+    :param template_str: A packaged YAML CloudFormation template
+    :type template_str: str
+    :return: Application metadata and the template without it, or None if the metadata section
+        isn't a block in a block style template and the template has to be parsed instead
+    :rtype: tuple
+    """
+    app_section = _load_app_metadata_section(template_str)
+    if not app_section:
+        return None
+
+    app_metadata, (strip_start, strip_end) = app_section
+    stripped_template = template_str[:strip_start] + template_str[strip_end:]
+    if not stripped_template.strip():
+        return None
+
+    return app_metadata, stripped_template
+
+
+def _load_app_metadata_section(template_str):
+    """
+    Construct the application metadata from the lines of its section only.
+
+    :param template_str: A packaged YAML CloudFormation template
+    :type template_str: str
+    :return: Application metadata, and start and end index of the lines to strip from the template
+    :rtype: tuple
+    """
+    # JSON and flow style templates can't be split by lines, and the marks of byte strings are character
+    # offsets which don't match their bytes
+    if not isinstance(template_str, six.text_type) or template_str.lstrip()[:1] in ('', '{'):
+        return None
+
+    # Scanning events doesn't reject multi-document streams, parse_template has to
+    if _has_other_documents(template_str):
+        return None
+
+    try:
+        spans = _find_app_metadata_spans(template_str)
+        if not spans:
+            return None
+
+        (app_start, app_end), strip_span = spans
+        app_metadata_dict = yaml.load(template_str[app_start:app_end], Loader=SamLoader)
+    except yaml.YAMLError:
+        return None
+
+    if not isinstance(app_metadata_dict.get(SERVERLESS_REPO_APPLICATION), dict):
+        return None
+
+    return ApplicationMetadata(app_metadata_dict[SERVERLESS_REPO_APPLICATION]), strip_span
+
+
+def _has_other_documents(template_str):
+    """
+    Check whether the template has document markers other than the explicit start of its first document.
+
+    :param template_str: A packaged YAML CloudFormation template
+    :type template_str: str
+    :return: True if the stream may have more than one document
+    """
+    markers = _DOCUMENT_MARKER.finditer(template_str)
+    first_marker = next(markers, None)
+    if not first_marker:
+        return False
+
+    if next(markers, None) or not template_str.startswith('---', first_marker.start()):
+        return True
+
+    # Only comments and directives can come before the start of the first document
+    return any(line.strip() and not line.lstrip().startswith(('#', '%'))
+               for line in template_str[:first_marker.start()].splitlines())
+
+
+def _find_app_metadata_spans(template_str):
+    """
+    Find the "AWS::ServerlessRepo::Application" section, scanning the YAML events of the whole template.
+
+    Events after Metadata are only scanned to check that the rest of the template is well-formed,
+    no objects are constructed for them.
+
+    :param template_str: A packaged YAML CloudFormation template
+    :type template_str: str
+    :return: Start and end index of the lines of the application metadata section, and of the lines
+        to strip, which are the whole Metadata section if the application metadata is its only key
+    :rtype: tuple
+    """
+    events = yaml.parse(template_str, Loader=SamLoader)
+    metadata_key = _find_metadata(events)
+    if not metadata_key:
+        return None
+
+    app_section = _find_app_metadata(events)
+    if not app_section:
+        return None
+
+    app_key, content_end, other_keys = app_section
+    line_starts = []
+    for key in [app_key] if other_keys else [app_key, metadata_key]:
+        line_start = key.start_mark.index - key.start_mark.column
+        # The key must be the first token of its line
+        if template_str[line_start:key.start_mark.index].strip():
+            return None
+        line_starts.append(line_start)
+
+    for _ in events:
+        pass
+
+    app_end = _get_line_end(template_str, content_end)
+    return (line_starts[0], app_end), (line_starts[-1], app_end)
+
+
+def _find_metadata(events):
+    """
+    Consume the YAML events up to the start of the Metadata block mapping.
+
+    :param events: YAML events of the template
+    :type events: generator
+    :return: Event of the Metadata key, or None if the template or Metadata isn't a block mapping
+    :rtype: yaml.ScalarEvent
+    """
+    # skip StreamStartEvent and DocumentStartEvent
+    next(events)
+    next(events)
+    if not _is_block_mapping_start(next(events)):
+        return None
+
+    for key in events:
+        if not isinstance(key, yaml.ScalarEvent):
+            return None
+        if key.value != METADATA:
+            _skip_node(events)
+            continue
+
+        metadata = next(events)
+        # The whole section may be stripped, so it mustn't define anchors either
+        if not _is_block_mapping_start(metadata) or metadata.anchor:
+            return None
+        return key
+    return None
+
+
+def _find_app_metadata(events):
+    """
+    Consume the YAML events of the Metadata mapping, looking for the application metadata.
+
+    :param events: YAML events of the template, positioned inside the Metadata mapping
+    :type events: generator
+    :return: Event of the application metadata key, index of the end of its last token, and whether
+        Metadata has other keys, or None if the application metadata can't be stripped by lines
+    :rtype: tuple
+    """
+    app_section = None
+    other_keys = False
+    for key in events:
+        if isinstance(key, yaml.MappingEndEvent):
+            break
+        if not isinstance(key, yaml.ScalarEvent):
+            return None
+
+        if key.value != SERVERLESS_REPO_APPLICATION:
+            other_keys = True
+            _skip_node(events)
+            continue
+
+        content_end, has_anchors = _skip_node(events)
+        # Duplicate section, or it defines anchors that may be referenced by the rest of the template
+        if app_section or has_anchors:
+            return None
+        app_section = (key, content_end)
+
+    return app_section + (other_keys,) if app_section else None
+
+
+def _get_line_end(template_str, index):
+    """
+    Get the index of the start of the line following the one containing index.
+
+    :param template_str: A packaged YAML CloudFormation template
+    :type template_str: str
+    :param index: Index of a character in the template
+    :type index: int
+    :return: Index of the start of the next line, or the length of the template for the last line
+    :rtype: int
+    """
+    if index and template_str[index - 1] == '\n':
+        # Block scalars end after their trailing line break
+        return index
+    line_end = template_str.find('\n', index)
+    return len(template_str) if line_end < 0 else line_end + 1
+
+
+def _is_block_mapping_start(event):
+    """
+    Check whether the YAML event starts a block style mapping.
+
+    :param event: YAML event
+    :type event: yaml.Event
+    :return: True if event is the start of a block mapping
+    """
+    return isinstance(event, yaml.MappingStartEvent) and not event.flow_style
+
+
+def _skip_node(events):
+    """
+    Consume the YAML events of the next node.
+
+    :param events: YAML events
+    :type events: generator
+    :return: Index of the end of the last token of the node, and whether the node or its children define anchors
+    :rtype: tuple
+    """
+    depth = 0
+    content_end = 0
+    has_anchors = False
+    for event in events:
+        has_anchors = has_anchors or bool(getattr(event, 'anchor', None))
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+        # The end of block collections is only marked by the next token, which isn't part of the node
+        if event.end_mark.index > event.start_mark.index:
+            content_end = event.end_mark.index
+        if not depth:
+            break
+    return content_end, has_anchors
 
 
 def get_app_metadata(template_dict):
@@ -130,20 +406,185 @@ def strip_app_metadata(template_dict):
     """
     Strip the "AWS::ServerlessRepo::Application" metadata section from template.
 
+    Only the containers on the path to the section are copied, the rest of the template
+    is shared with the input, which isn't modified.
+
     :param template_dict: SAM template as a dictionary
     :type template_dict: dict
     :return: stripped template content
-    :rtype: str
+    :rtype: dict
     """
     if SERVERLESS_REPO_APPLICATION not in template_dict.get(METADATA, {}):
         return template_dict
 
-    template_dict_copy = copy.deepcopy(template_dict)
+    template_dict_copy = copy.copy(template_dict)
 
     # strip the whole metadata section if SERVERLESS_REPO_APPLICATION is the only key in it
     if not [k for k in template_dict_copy.get(METADATA) if k != SERVERLESS_REPO_APPLICATION]:
         template_dict_copy.pop(METADATA, None)
     else:
-        template_dict_copy.get(METADATA).pop(SERVERLESS_REPO_APPLICATION, None)
+        metadata_copy = copy.copy(template_dict_copy.get(METADATA))
+        metadata_copy.pop(SERVERLESS_REPO_APPLICATION, None)
+        template_dict_copy[METADATA] = metadata_copy
 
     return template_dict_copy
+
+
+class TemplateCache(object):
+    """
+    Class keeping what was derived from the most recently used template strings, keyed by get_template_digest.
+
+    Entries hold the application metadata and the stripped YAML template, each one filled in when first
+    computed. The metadata is kept as a private copy of its dictionary and every read builds a new
+    ApplicationMetadata from another copy, so callers can't change the entry. Parsed templates aren't
+    kept, copying them costs more than parsing them again. Prepared templates can also be kept in a
+    TemplateDirectoryCache, to reuse them in later process runs.
+    It's thread-safe.
+    """
+
+    APP_METADATA = 'app_metadata'
+    STRIPPED_TEMPLATE = 'stripped_template'
+
+    def __init__(self, max_size=DEFAULT_TEMPLATE_CACHE_SIZE, directory_cache=None):
+        """
+        Initialize an empty cache.
+
+        :param max_size: Maximum number of templates kept, the least recently used ones are evicted
+        :type max_size: int
+        :param directory_cache: Cache of prepared templates persisted across process runs
+        :type directory_cache: TemplateDirectoryCache
+        """
+        self.max_size = max_size
+        self.directory_cache = directory_cache
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, digest, key):
+        """
+        Get a value derived from a template.
+
+        :param digest: Digest of the template
+        :type digest: str
+        :param key: APP_METADATA or STRIPPED_TEMPLATE
+        :type key: str
+        :return: The value, or None if not cached
+        """
+        value = self._get_entry(digest).get(key)
+        if key == self.APP_METADATA and value is not None:
+            return ApplicationMetadata(copy.deepcopy(value))
+        return value
+
+    def put(self, digest, **values):
+        """
+        Cache values derived from a template, evicting the least recently used templates.
+
+        :param digest: Digest of the template
+        :type digest: str
+        :param values: Values keyed by APP_METADATA or STRIPPED_TEMPLATE
+        """
+        values = {key: value for key, value in values.items() if value is not None}
+        if self.APP_METADATA in values:
+            values[self.APP_METADATA] = copy.deepcopy(values[self.APP_METADATA].template_dict)
+        with self._lock:
+            entry = self._entries.pop(digest, {})
+            entry.update(values)
+            self._entries[digest] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_prepared(self, digest):
+        """
+        Get the application metadata and the stripped template, looking in the directory cache on a miss.
+
+        :param digest: Digest of the template
+        :type digest: str
+        :return: Application metadata and the template without it, or None if not cached
+        :rtype: tuple
+        """
+        # Both values come from the same entry, which may be evicted by another thread in the meantime
+        entry = self._get_entry(digest)
+        if entry.get(self.STRIPPED_TEMPLATE) is not None:
+            return ApplicationMetadata(copy.deepcopy(entry[self.APP_METADATA])), entry[self.STRIPPED_TEMPLATE]
+
+        prepared_template = self.directory_cache.get(digest) if self.directory_cache else None
+        if prepared_template:
+            self.put(digest, app_metadata=prepared_template[0], stripped_template=prepared_template[1])
+        return prepared_template
+
+    def put_prepared(self, digest, app_metadata, stripped_template):
+        """
+        Cache the application metadata and the stripped template.
+
+        :param digest: Digest of the template
+        :type digest: str
+        :param app_metadata: Object containing app metadata
+        :type app_metadata: ApplicationMetadata
+        :param stripped_template: A packaged YAML SAM template without app metadata
+        :type stripped_template: str
+        """
+        self.put(digest, app_metadata=app_metadata, stripped_template=stripped_template)
+        if self.directory_cache:
+            self.directory_cache.put(digest, app_metadata, stripped_template)
+
+    def clear(self):
+        """Remove every template from the cache, templates in the directory cache are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def _get_entry(self, digest):
+        """
+        Get the values cached for a template, marking it as the most recently used.
+
+        :param digest: Digest of the template
+        :type digest: str
+        :return: Values keyed by APP_METADATA and STRIPPED_TEMPLATE, empty if not cached
+        :rtype: dict
+        """
+        with self._lock:
+            entry = self._entries.pop(digest, None)
+            if entry is None:
+                return {}
+            self._entries[digest] = entry
+            return dict(entry)
+
+    def __len__(self):
+        """Get the number of templates cached."""
+        with self._lock:
+            return len(self._entries)
+
+
+_template_cache = None  # pylint: disable=invalid-name
+
+
+def get_template_cache():
+    """
+    Get the cache of templates used when publishing or updating applications.
+
+    :return: The cache, or None if templates aren't cached, which is the default
+    :rtype: TemplateCache
+    """
+    return _template_cache
+
+
+def set_template_cache(template_cache):
+    """
+    Replace the cache of templates used when publishing or updating applications.
+
+    :param template_cache: The new cache, or None to stop caching templates
+    :type template_cache: TemplateCache
+    """
+    global _template_cache  # pylint: disable=global-statement
+    _template_cache = template_cache
+
+
+def get_template_digest(template_str):
+    """
+    Get the digest identifying a template, so large templates aren't kept as cache keys.
+
+    :param template_str: A packaged YAML or JSON CloudFormation template
+    :type template_str: str
+    :return: Hex digest of the template
+    :rtype: str
+    """
+    # Python 2 byte strings are hashed as they are, encoding them would decode them as ASCII first
+    return hashlib.sha256(six.ensure_binary(template_str)).hexdigest()
@@ -1,11 +1,15 @@
 """Module containing methods to manage application permissions."""
 
-import boto3
+from collections import OrderedDict
 
-from .application_policy import ApplicationPolicy
+from .application_policy import ApplicationPolicy, add_accounts, remove_accounts
+from .clients import get_client
+from .concurrency import run_concurrently, DEFAULT_MAX_WORKERS
+from .throttling import make_call
+from .instrumentation import span
 
 
-def make_application_public(application_id, sar_client=None):
+def make_application_public(application_id, sar_client=None, ensure=False):
     """
     Set the application to be public.
 
@@ -13,23 +17,24 @@ def make_application_public(application_id, sar_client=None):
     :type application_id: str
     :param sar_client: The boto3 client used to access SAR
     :type sar_client: boto3.client
+    :param ensure: Only write the policy if it differs from the current policy of the application
+    :type ensure: bool
+    :return: True if the policy was written, False if it already matched
+    :rtype: bool
     :raises ValueError
     """
     if not application_id:
         raise ValueError('Require application id to make the app public')
 
     if not sar_client:
-        sar_client = boto3.client('serverlessrepo')
+        sar_client = get_client()
 
     application_policy = ApplicationPolicy(['*'], [ApplicationPolicy.DEPLOY])
     application_policy.validate()
-    sar_client.put_application_policy(
-        ApplicationId=application_id,
-        Statements=[application_policy.to_statement()]
-    )
+    return _put_application_policy(sar_client, application_id, [application_policy.to_statement()], ensure)
 
 
-def make_application_private(application_id, sar_client=None):
+def make_application_private(application_id, sar_client=None, ensure=False):
     """
     Set the application to be private.
 
@@ -37,21 +42,22 @@ def make_application_private(application_id, sar_client=None):
     :type application_id: str
     :param sar_client: The boto3 client used to access SAR
     :type sar_client: boto3.client
+    :param ensure: Only write the policy if it differs from the current policy of the application
+    :type ensure: bool
+    :return: True if the policy was written, False if it already matched
+    :rtype: bool
     :raises ValueError
     """
     if not application_id:
         raise ValueError('Require application id to make the app private')
 
     if not sar_client:
-        sar_client = boto3.client('serverlessrepo')
+        sar_client = get_client()
 
-    sar_client.put_application_policy(
-        ApplicationId=application_id,
-        Statements=[]
-    )
+    return _put_application_policy(sar_client, application_id, [], ensure)
 
 
-def share_application_with_accounts(application_id, account_ids, sar_client=None):
+def share_application_with_accounts(application_id, account_ids, sar_client=None, ensure=False):
     """
     Share the application privately with given AWS account IDs.
 
@@ -61,17 +67,293 @@ def share_application_with_accounts(application_id, account_ids, sar_client=None
     :type account_ids: list of str
     :param sar_client: The boto3 client used to access SAR
     :type sar_client: boto3.client
+    :param ensure: Only write the policy if it differs from the current policy of the application
+    :type ensure: bool
+    :return: True if the policy was written, False if it already matched
+    :rtype: bool
     :raises ValueError
     """
     if not application_id or not account_ids:
         raise ValueError('Require application id and list of AWS account IDs to share the app')
 
     if not sar_client:
-        sar_client = boto3.client('serverlessrepo')
+        sar_client = get_client()
 
     application_policy = ApplicationPolicy(account_ids, [ApplicationPolicy.DEPLOY])
     application_policy.validate()
-    sar_client.put_application_policy(
-        ApplicationId=application_id,
-        Statements=[application_policy.to_statement()]
+    return _put_application_policy(sar_client, application_id, [application_policy.to_statement()], ensure)
+
+
+def add_accounts_to_application(application_id, account_ids, sar_client=None, actions=None):
+    """
+    Share the application with more AWS account IDs, keeping the accounts it's already shared with.
+
+    :param application_id: The Amazon Resource Name (ARN) of the application
+    :type application_id: str
+    :param account_ids: List of AWS account IDs, or *
+    :type account_ids: list of str
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param actions: List of actions granted to the accounts, defaults to Deploy
+    :type actions: list of str
+    :return: True if the policy was written, False if the accounts already had access
+    :rtype: bool
+    :raises ValueError
+    """
+    if not application_id or not account_ids:
+        raise ValueError('Require application id and list of AWS account IDs to share the app')
+
+    if not sar_client:
+        sar_client = get_client()
+
+    current_statements = _get_application_policy(sar_client, application_id)
+    statements = add_accounts(current_statements, account_ids, actions)
+    return _put_changed_application_policy(sar_client, application_id, current_statements, statements)
+
+
+def remove_accounts_from_application(application_id, account_ids, sar_client=None, actions=None):
+    """
+    Stop sharing the application with AWS account IDs, keeping the other accounts it's shared with.
+
+    :param application_id: The Amazon Resource Name (ARN) of the application
+    :type application_id: str
+    :param account_ids: List of AWS account IDs, or *
+    :type account_ids: list of str
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param actions: Only revoke the statement granting this list of actions, defaults to every statement
+    :type actions: list of str
+    :return: True if the policy was written, False if the accounts didn't have access
+    :rtype: bool
+    :raises ValueError
+    """
+    if not application_id or not account_ids:
+        raise ValueError('Require application id and list of AWS account IDs to unshare the app')
+
+    if not sar_client:
+        sar_client = get_client()
+
+    current_statements = _get_application_policy(sar_client, application_id)
+    statements = remove_accounts(current_statements, account_ids, actions)
+    return _put_changed_application_policy(sar_client, application_id, current_statements, statements)
+
+
+def make_applications_public(application_ids, sar_client=None, max_workers=None, ensure=False,
+                             policy_snapshot=None):
+    """
+    Set multiple applications to be public, updating their policies concurrently.
+
+    :param application_ids: The Amazon Resource Names (ARNs) of the applications
+    :type application_ids: list of str
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param max_workers: Maximum number of policies updated at the same time
+    :type max_workers: int
+    :param ensure: Only write the policies that differ from the current policies of the applications
+    :type ensure: bool
+    :param policy_snapshot: Policy statements keyed by application id, used instead of fetching the current
+        policies when ensure is set, and kept up to date with the policies written
+    :type policy_snapshot: dict
+    :return: Dictionary containing the 'result' and 'error' of each application, keyed by application id
+    :rtype: dict
+    :raises ValueError
+    """
+    if not application_ids:
+        raise ValueError('Require application ids to make the apps public')
+
+    application_policy = ApplicationPolicy(['*'], [ApplicationPolicy.DEPLOY])
+    application_policy.validate()
+    return _put_application_policies(application_ids, [application_policy.to_statement()], sar_client,
+                                     max_workers, ensure, policy_snapshot)
+
+
+def make_applications_private(application_ids, sar_client=None, max_workers=None, ensure=False,
+                              policy_snapshot=None):
+    """
+    Set multiple applications to be private, updating their policies concurrently.
+
+    :param application_ids: The Amazon Resource Names (ARNs) of the applications
+    :type application_ids: list of str
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param max_workers: Maximum number of policies updated at the same time
+    :type max_workers: int
+    :param ensure: Only write the policies that differ from the current policies of the applications
+    :type ensure: bool
+    :param policy_snapshot: Policy statements keyed by application id, used instead of fetching the current
+        policies when ensure is set, and kept up to date with the policies written
+    :type policy_snapshot: dict
+    :return: Dictionary containing the 'result' and 'error' of each application, keyed by application id
+    :rtype: dict
+    :raises ValueError
+    """
+    if not application_ids:
+        raise ValueError('Require application ids to make the apps private')
+
+    return _put_application_policies(application_ids, [], sar_client, max_workers, ensure, policy_snapshot)
+
+
+def share_applications_with_accounts(  # pylint: disable=too-many-arguments
+        application_ids, account_ids, sar_client=None, max_workers=None, ensure=False, policy_snapshot=None):
+    """
+    Share multiple applications privately with given AWS account IDs, updating their policies concurrently.
+
+    The policy is validated once for all the applications.
+
+    :param application_ids: The Amazon Resource Names (ARNs) of the applications
+    :type application_ids: list of str
+    :param account_ids: List of AWS account IDs, or *
+    :type account_ids: list of str
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param max_workers: Maximum number of policies updated at the same time
+    :type max_workers: int
+    :param ensure: Only write the policies that differ from the current policies of the applications
+    :type ensure: bool
+    :param policy_snapshot: Policy statements keyed by application id, used instead of fetching the current
+        policies when ensure is set, and kept up to date with the policies written
+    :type policy_snapshot: dict
+    :return: Dictionary containing the 'result' and 'error' of each application, keyed by application id
+    :rtype: dict
+    :raises ValueError
+    """
+    if not application_ids or not account_ids:
+        raise ValueError('Require application ids and list of AWS account IDs to share the apps')
+
+    application_policy = ApplicationPolicy(account_ids, [ApplicationPolicy.DEPLOY])
+    application_policy.validate()
+    return _put_application_policies(application_ids, [application_policy.to_statement()], sar_client,
+                                     max_workers, ensure, policy_snapshot)
+
+
+def _put_application_policies(  # pylint: disable=too-many-arguments
+        application_ids, statements, sar_client, max_workers, ensure=False, policy_snapshot=None):
+    """
+    Set the same policy statements on multiple applications concurrently.
+
+    A failure for one application doesn't stop the others from being updated.
+
+    :param application_ids: The Amazon Resource Names (ARNs) of the applications
+    :type application_ids: list of str
+    :param statements: Policy statements
+    :type statements: list of dict
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param max_workers: Maximum number of policies updated at the same time
+    :type max_workers: int
+    :param ensure: Only write the policies that differ from the current policies
+    :type ensure: bool
+    :param policy_snapshot: Policy statements keyed by application id
+    :type policy_snapshot: dict
+    :return: Dictionary containing the 'result' and 'error' of each application, keyed by application id
+    :rtype: dict
+    """
+    max_workers = max_workers or DEFAULT_MAX_WORKERS
+    if not sar_client:
+        sar_client = get_client(max_pool_connections=max_workers)
+
+    # Update each application once, even if it's listed multiple times
+    application_ids = list(OrderedDict.fromkeys(application_ids))
+    outcomes = run_concurrently(
+        lambda application_id: _put_application_policy(
+            sar_client, application_id, statements, ensure, policy_snapshot),
+        application_ids,
+        max_workers
+    )
+    return OrderedDict(zip(application_ids, outcomes))
+
+
+def _put_application_policy(sar_client, application_id, statements, ensure=False, policy_snapshot=None):
+    """
+    Set the policy statements of an application.
+
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param application_id: The Amazon Resource Name (ARN) of the application
+    :type application_id: str
+    :param statements: Policy statements
+    :type statements: list of dict
+    :param ensure: Only write the policy if it differs from the current policy
+    :type ensure: bool
+    :param policy_snapshot: Policy statements keyed by application id, used instead of fetching the current
+        policy when it contains the application
+    :type policy_snapshot: dict
+    :return: True if the policy was written, False if it already matched
+    :rtype: bool
+    """
+    current_statements = None
+    if ensure:
+        if policy_snapshot is not None and application_id in policy_snapshot:
+            current_statements = policy_snapshot[application_id]
+        else:
+            current_statements = _get_application_policy(sar_client, application_id)
+
+    changed = _put_changed_application_policy(sar_client, application_id, current_statements, statements)
+    if policy_snapshot is not None:
+        policy_snapshot[application_id] = statements if changed else current_statements
+    return changed
+
+
+def _get_application_policy(sar_client, application_id):
+    """
+    Get the current policy statements of an application.
+
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param application_id: The Amazon Resource Name (ARN) of the application
+    :type application_id: str
+    :return: Policy statements
+    :rtype: list of dict
+    """
+    response = make_call(sar_client, 'get_application_policy', ApplicationId=application_id)
+    return response.get('Statements', [])
+
+
+def _put_changed_application_policy(sar_client, application_id, current_statements, statements):
+    """
+    Set the policy statements of an application if they differ from its current statements.
+
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param application_id: The Amazon Resource Name (ARN) of the application
+    :type application_id: str
+    :param current_statements: Current policy statements, or None to always write the policy
+    :type current_statements: list of dict
+    :param statements: Policy statements
+    :type statements: list of dict
+    :return: True if the policy was written, False if it already matched
+    :rtype: bool
+    """
+    with span('update_application_policy', changed=False) as attributes:
+        if current_statements is not None and \
+                _canonicalize_statements(current_statements) == _canonicalize_statements(statements):
+            return False
+
+        make_call(
+            sar_client, 'put_application_policy',
+            ApplicationId=application_id,
+            Statements=statements
+        )
+        attributes['changed'] = True
+        return True
+
+
+def _canonicalize_statements(statements):
+    """
+    Convert policy statements to a form that compares equal for equivalent policies.
+
+    The order of statements, principals and actions, and statement IDs assigned by SAR are ignored.
+
+    :param statements: Policy statements
+    :type statements: list of dict
+    :return: Sorted principals, organization IDs and actions of every statement
+    :rtype: list of tuple
+    """
+    return sorted(
+        (
+            tuple(sorted(set(statement.get('Principals', [])))),
+            tuple(sorted(set(statement.get('PrincipalOrgIDs', [])))),
+            tuple(sorted(set(statement.get('Actions', []))))
+        )
+        for statement in statements
     )
@@ -1,24 +1,36 @@
 """Module containing functions to publish or update application."""
 
 import re
-import copy
+import json
+import time
+import hashlib
+from collections import OrderedDict
 
-import boto3
+import six
 from botocore.exceptions import ClientError
 
 from .application_metadata import ApplicationMetadata
 from .parser import (
     yaml_dump, parse_template, get_app_metadata,
-    parse_application_id, strip_app_metadata
+    parse_application_id, strip_app_metadata, split_app_metadata,
+    extract_app_metadata, get_template_cache, get_template_digest, TemplateCache
 )
 from .exceptions import ServerlessRepoClientError, S3PermissionsRequired, InvalidS3UriError
+from .clients import get_client
+from .concurrency import run_concurrently, run_in_processes, get_shared_executor, DEFAULT_MAX_WORKERS
+from .throttling import make_call
+from .instrumentation import span, is_enabled
+from .publish_result import PublishResult
 
 CREATE_APPLICATION = 'CREATE_APPLICATION'
 UPDATE_APPLICATION = 'UPDATE_APPLICATION'
 CREATE_APPLICATION_VERSION = 'CREATE_APPLICATION_VERSION'
 
+_clock = getattr(time, 'perf_counter', time.time)
 
-def publish_application(template, sar_client=None):
+
+def publish_application(template, sar_client=None, application_cache=None, rich_result=False,
+                        parallel_version=False):
     """
     Create a new application or new application version in SAR.
 
@@ -26,54 +38,192 @@ def publish_application(template, sar_client=None):
     :type template: str_or_dict
     :param sar_client: The boto3 client used to access SAR
     :type sar_client: boto3.client
-    :return: Dictionary containing application id, actions taken, and updated details
-    :rtype: dict
+    :param application_cache: Cache of application IDs and content digests, used to skip redundant SAR calls
+    :type application_cache: ApplicationCache
+    :param rich_result: Return a PublishResult recording timings and request sizes instead of a dictionary
+    :type rich_result: bool
+    :param parallel_version: Create the application version at the same time as updating an existing
+        application, instead of after the update
+    :type parallel_version: bool
+    :return: Dictionary containing application id, actions taken, and updated details, or PublishResult
+    :rtype: dict_or_PublishResult
     :raises ValueError
     """
     if not template:
         raise ValueError('Require SAM template to publish the application')
 
     if not sar_client:
-        sar_client = boto3.client('serverlessrepo')
+        sar_client = get_client()
+
+    start = _clock()
+    template_bytes = None
+    if is_enabled() and isinstance(template, six.string_types):
+        template_bytes = len(six.ensure_binary(template))
+    with span('publish_application', template_bytes=template_bytes) as attributes:
+        app_metadata, stripped_template = _prepare_template(template)
+        prepare_time = _clock() - start
+        result = _publish_prepared_application(sar_client, app_metadata, stripped_template, application_cache,
+                                               rich_result, parallel_version)
+        if rich_result:
+            result.duration += prepare_time
+        attributes['actions'] = result.actions if rich_result else result['actions']
+        return result
+
+
+def publish_applications(  # pylint: disable=too-many-arguments
+        templates, sar_client=None, max_workers=None, application_cache=None, rich_result=False,
+        parallel_version=False):
+    """
+    Publish multiple applications concurrently, sharing one SAR client.
 
-    template_dict = _get_template_dict(template)
-    app_metadata = get_app_metadata(template_dict)
-    stripped_template_dict = strip_app_metadata(template_dict)
-    stripped_template = yaml_dump(stripped_template_dict)
-    try:
-        request = _create_application_request(app_metadata, stripped_template)
-        response = sar_client.create_application(**request)
-        application_id = response['ApplicationId']
-        actions = [CREATE_APPLICATION]
-    except ClientError as e:
-        if not _is_conflict_exception(e):
-            raise _wrap_client_error(e)
+    A failure to publish one template doesn't stop the rest of the batch.
 
-        # Update the application if it already exists
-        error_message = e.response['Error']['Message']
-        application_id = parse_application_id(error_message)
-        try:
-            request = _update_application_request(app_metadata, application_id)
-            sar_client.update_application(**request)
-            actions = [UPDATE_APPLICATION]
-        except ClientError as e:
-            raise _wrap_client_error(e)
+    :param templates: Contents of packaged YAML or JSON SAM templates
+    :type templates: list of str_or_dict
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param max_workers: Maximum number of templates published at the same time
+    :type max_workers: int
+    :param application_cache: Cache of application IDs and published content digests
+    :type application_cache: ApplicationCache
+    :param rich_result: Return PublishResult results instead of dictionaries
+    :type rich_result: bool
+    :param parallel_version: Create application versions at the same time as updating existing applications
+    :type parallel_version: bool
+    :return: Dictionaries containing the 'result' of publish_application or the 'error' raised, in input order
+    :rtype: list of dict
+    """
+    max_workers = max_workers or DEFAULT_MAX_WORKERS
+    if not sar_client:
+        # boto3 clients are thread-safe, make sure the connection pool can serve every worker, each worker
+        # has two calls in flight when creating versions in parallel
+        sar_client = get_client(max_pool_connections=max_workers * (2 if parallel_version else 1))
 
-        # Create application version if semantic version is specified
-        if app_metadata.semantic_version:
-            try:
-                request = _create_application_version_request(app_metadata, application_id, stripped_template)
-                sar_client.create_application_version(**request)
-                actions.append(CREATE_APPLICATION_VERSION)
-            except ClientError as e:
-                if not _is_conflict_exception(e):
-                    raise _wrap_client_error(e)
+    return run_concurrently(
+        lambda template: publish_application(template, sar_client, application_cache, rich_result, parallel_version),
+        templates,
+        max_workers
+    )
 
-    return {
-        'application_id': application_id,
-        'actions': actions,
-        'details': _get_publish_details(actions, app_metadata.template_dict)
-    }
+
+def publish_application_to_regions(  # pylint: disable=too-many-arguments
+        template, regions, sar_clients=None, max_workers=None, application_caches=None, rich_result=False,
+        parallel_version=False):
+    """
+    Publish an application to multiple regions concurrently.
+
+    The template is parsed and stripped once for all the regions. A failure to publish to one region
+    doesn't stop the other regions.
+
+    :param template: Content of a packaged YAML or JSON SAM template
+    :type template: str_or_dict
+    :param regions: AWS regions to publish the application to
+    :type regions: list of str
+    :param sar_clients: The boto3 clients used to access SAR keyed by region, defaults to a shared client
+        for each region
+    :type sar_clients: dict
+    :param max_workers: Maximum number of regions published to at the same time
+    :type max_workers: int
+    :param application_caches: Caches of application IDs and published content digests keyed by region
+    :type application_caches: dict
+    :param rich_result: Return PublishResult results instead of dictionaries, their durations exclude
+        preparing the template
+    :type rich_result: bool
+    :param parallel_version: Create the application version at the same time as updating an existing
+        application
+    :type parallel_version: bool
+    :return: Dictionary containing the 'result' of publish_application or the 'error' raised for each region,
+        keyed by region
+    :rtype: dict
+    :raises ValueError
+    """
+    if not template or not regions:
+        raise ValueError('Require SAM template and regions to publish the application')
+
+    # Share one copy of the template between the regions
+    app_metadata, stripped_template = prepare_template(template)
+    sar_clients = sar_clients or {}
+    application_caches = application_caches or {}
+
+    def publish_to_region(region):
+        sar_client = sar_clients.get(region) or get_client(region_name=region)
+        return _publish_prepared_application(sar_client, app_metadata, stripped_template,
+                                             application_caches.get(region), rich_result, parallel_version)
+
+    # Publish to each region once, even if it's listed multiple times
+    regions = list(OrderedDict.fromkeys(regions))
+    outcomes = run_concurrently(publish_to_region, regions, max_workers or DEFAULT_MAX_WORKERS)
+    return OrderedDict(zip(regions, outcomes))
+
+
+def prepare_template(template):
+    """
+    Get the application metadata and the template without it, the CPU-bound part of publishing.
+
+    :param template: Content of a packaged YAML or JSON SAM template
+    :type template: str_or_dict
+    :return: Application metadata, and the template without it
+    :rtype: tuple
+    :raises ValueError
+    """
+    if not template:
+        raise ValueError('Require SAM template to prepare the template')
+
+    app_metadata, stripped_template = _prepare_template(template)
+    return app_metadata, _get_template_body(stripped_template)
+
+
+def prepare_templates(templates, max_processes=None):
+    """
+    Prepare multiple templates on a process pool, so parsing big templates uses every core.
+
+    Threads don't speed up parsing templates, since it's pure Python. A failure to prepare one template
+    doesn't stop the rest of the batch.
+
+    :param templates: Contents of packaged YAML or JSON SAM templates
+    :type templates: list of str_or_dict
+    :param max_processes: Maximum number of processes, defaults to the number of CPUs
+    :type max_processes: int
+    :return: Dictionaries containing the 'result' of prepare_template or the 'error' raised, in input order
+    :rtype: list of dict
+    """
+    return run_in_processes(prepare_template, templates, max_processes)
+
+
+def publish_prepared_applications(  # pylint: disable=too-many-arguments
+        prepared_templates, sar_client=None, max_workers=None, application_cache=None, rich_result=False,
+        parallel_version=False):
+    """
+    Publish multiple applications prepared by prepare_template or prepare_templates concurrently.
+
+    A failure to publish one application doesn't stop the rest of the batch.
+
+    :param prepared_templates: Application metadata and templates without it returned by prepare_template
+    :type prepared_templates: list of tuple
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param max_workers: Maximum number of applications published at the same time
+    :type max_workers: int
+    :param application_cache: Cache of application IDs and published content digests
+    :type application_cache: ApplicationCache
+    :param rich_result: Return PublishResult results instead of dictionaries
+    :type rich_result: bool
+    :param parallel_version: Create application versions at the same time as updating existing applications
+    :type parallel_version: bool
+    :return: Dictionaries containing the 'result' of publish_application or the 'error' raised, in input order
+    :rtype: list of dict
+    """
+    max_workers = max_workers or DEFAULT_MAX_WORKERS
+    if not sar_client:
+        sar_client = get_client(max_pool_connections=max_workers * (2 if parallel_version else 1))
+
+    return run_concurrently(
+        lambda prepared_template: _publish_prepared_application(
+            sar_client, prepared_template[0], prepared_template[1], application_cache, rich_result,
+            parallel_version),
+        prepared_templates,
+        max_workers
+    )
 
 
 def update_application_metadata(template, application_id, sar_client=None):
@@ -92,17 +242,159 @@ def update_application_metadata(template, application_id, sar_client=None):
         raise ValueError('Require SAM template and application ID to update application metadata')
 
     if not sar_client:
-        sar_client = boto3.client('serverlessrepo')
+        sar_client = get_client()
 
-    template_dict = _get_template_dict(template)
-    app_metadata = get_app_metadata(template_dict)
+    app_metadata = _get_app_metadata(template)
     request = _update_application_request(app_metadata, application_id)
-    sar_client.update_application(**request)
+    make_call(sar_client, 'update_application', **request)
+
+
+def _publish_prepared_application(  # pylint: disable=too-many-arguments
+        sar_client, app_metadata, stripped_template, application_cache=None, rich_result=False,
+        parallel_version=False):
+    """
+    Create a new application or new application version in SAR from a prepared template.
+
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param app_metadata: Object containing app metadata
+    :type app_metadata: ApplicationMetadata
+    :param stripped_template: A packaged YAML SAM template without app metadata, or a buffer containing it
+    :type stripped_template: str_or_io.StringIO
+    :param application_cache: Cache of application IDs and content digests, used to skip redundant SAR calls
+    :type application_cache: ApplicationCache
+    :param rich_result: Return a PublishResult instead of a dictionary
+    :type rich_result: bool
+    :param parallel_version: Create the application version at the same time as updating the application
+    :type parallel_version: bool
+    :return: Dictionary containing application id, actions taken, and updated details, or PublishResult
+    :rtype: dict_or_PublishResult
+    """
+    start = _clock()
+    result = PublishResult() if rich_result else None
+    actions = None
+    application_id = application_cache.get(app_metadata.name) if application_cache and app_metadata.name else None
+    if application_id:
+        # Skipping create_application mustn't skip validating what it requires
+        app_metadata.validate(['author', 'description', 'name'])
+        if application_cache.get_digest(app_metadata.name) == \
+                _get_publish_digest(app_metadata, application_id, stripped_template):
+            # Nothing changed since the last publish
+            actions = []
+        else:
+            try:
+                actions = _update_application(sar_client, app_metadata, application_id, stripped_template, result,
+                                              parallel_version)
+            except ClientError as e:
+                if not _is_not_found_exception(e):
+                    raise _wrap_client_error(e)
+
+                # The cached application no longer exists, fall back to creating it
+                application_cache.invalidate(app_metadata.name)
+
+    if actions is None:
+        application_id, actions = _create_application(sar_client, app_metadata, stripped_template, result,
+                                                      parallel_version)
+
+    if application_cache:
+        digest = _get_publish_digest(app_metadata, application_id, stripped_template)
+        application_cache.put(app_metadata.name, application_id, digest)
+
+    details = _get_publish_details(actions, app_metadata.template_dict)
+    if result is None:
+        return {
+            'application_id': application_id,
+            'actions': actions,
+            'details': details
+        }
+
+    result.application_id = application_id
+    result.actions = actions
+    result.details = details
+    result.duration = _clock() - start
+    return result
+
+
+def _get_app_metadata(template):
+    """
+    Get the application metadata, without parsing the rest of YAML templates when possible.
+
+    :param template: Content of a packaged YAML or JSON SAM template
+    :type template: str_or_dict
+    :return: Application metadata
+    :rtype: ApplicationMetadata
+    :raises ValueError
+    """
+    if not isinstance(template, six.string_types):
+        return get_app_metadata(_get_template_dict(template))
+
+    template_cache = get_template_cache()
+    if template_cache is not None:
+        digest = get_template_digest(template)
+        app_metadata = template_cache.get(digest, TemplateCache.APP_METADATA)
+        if app_metadata:
+            return app_metadata
+
+    app_metadata = extract_app_metadata(template) or get_app_metadata(parse_template(template))
+    if template_cache is not None:
+        template_cache.put(digest, app_metadata=app_metadata)
+    return app_metadata
+
+
+def _prepare_template(template):
+    """
+    Get the application metadata and the template without it.
+
+    YAML templates are stripped without parsing them when possible, so the rest of the template
+    is published as written. Otherwise the template is parsed and dumped as YAML. When a template cache
+    is set, the outcome for string templates is cached, so templates published again aren't prepared again.
+
+    :param template: Content of a packaged YAML or JSON SAM template
+    :type template: str_or_dict
+    :return: Application metadata, and the template without it as a string or buffer
+    :rtype: tuple
+    :raises ValueError
+    """
+    with span('prepare_template') as attributes:
+        template_cache = get_template_cache() if isinstance(template, six.string_types) else None
+        if template_cache is not None:
+            digest = get_template_digest(template)
+            prepared_template = template_cache.get_prepared(digest)
+            attributes['cached'] = prepared_template is not None
+            if prepared_template:
+                return prepared_template
+
+        if isinstance(template, six.string_types):
+            with span('split_app_metadata'):
+                split_template = split_app_metadata(template)
+            if split_template:
+                attributes['parsed'] = False
+                if template_cache is not None:
+                    template_cache.put_prepared(digest, *split_template)
+                return split_template
+
+        attributes['parsed'] = True
+        with span('parse_template'):
+            template_dict = _get_template_dict(template)
+        app_metadata = get_app_metadata(template_dict)
+        with span('strip_app_metadata'):
+            template_dict = strip_app_metadata(template_dict)
+        # The parsed template is released when returning, only the YAML document is kept
+        stripped_template = six.StringIO()
+        with span('yaml_dump') as dump_attributes:
+            yaml_dump(template_dict, stripped_template)
+            if is_enabled():
+                dump_attributes['template_bytes'] = len(six.ensure_binary(stripped_template.getvalue()))
+        if template_cache is not None:
+            template_cache.put_prepared(digest, app_metadata, stripped_template.getvalue())
+        return app_metadata, stripped_template
 
 
 def _get_template_dict(template):
     """
-    Parse string template and or copy dictionary template.
+    Parse string template, dictionary templates are returned as is.
+
+    The returned dictionary is only read, never modified.
 
     :param template: Content of a packaged YAML or JSON SAM template
     :type template: str_or_dict
@@ -110,23 +402,166 @@ def _get_template_dict(template):
     :rtype: dict
     :raises ValueError
     """
-    if isinstance(template, str):
+    if isinstance(template, six.string_types):
         return parse_template(template)
 
     if isinstance(template, dict):
-        return copy.deepcopy(template)
+        return template
 
     raise ValueError('Input template should be a string or dictionary')
 
 
+def _create_application(sar_client, app_metadata, stripped_template, result=None, parallel_version=False):
+    """
+    Create the application, or update it if an application with the same name already exists.
+
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param app_metadata: Object containing app metadata
+    :type app_metadata: ApplicationMetadata
+    :param stripped_template: A packaged YAML SAM template without app metadata, or a buffer containing it
+    :type stripped_template: str_or_io.StringIO
+    :param result: Result recording the SAR calls made
+    :type result: PublishResult
+    :param parallel_version: Create the application version at the same time as updating the application
+    :type parallel_version: bool
+    :return: Application id and actions taken
+    :rtype: tuple
+    """
+    with span('create_application', conflict=False) as attributes:
+        try:
+            request = _create_application_request(app_metadata, stripped_template)
+            response = _make_call(sar_client, 'create_application', result, **request)
+            return response['ApplicationId'], [CREATE_APPLICATION]
+        except ClientError as e:
+            if not _is_conflict_exception(e):
+                raise _wrap_client_error(e)
+
+            # Update the application if it already exists
+            attributes['conflict'] = True
+            if result:
+                result.conflict = True
+            error_message = e.response['Error']['Message']
+            application_id = parse_application_id(error_message)
+
+    try:
+        actions = _update_application(sar_client, app_metadata, application_id, stripped_template, result,
+                                      parallel_version)
+    except ClientError as e:
+        raise _wrap_client_error(e)
+
+    return application_id, actions
+
+
+def _update_application(  # pylint: disable=too-many-arguments
+        sar_client, app_metadata, application_id, stripped_template, result=None, parallel_version=False):
+    """
+    Update an existing application, and create a new version if semantic version is specified.
+
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param app_metadata: Object containing app metadata
+    :type app_metadata: ApplicationMetadata
+    :param application_id: The Amazon Resource Name (ARN) of the application
+    :type application_id: str
+    :param stripped_template: A packaged YAML SAM template without app metadata, or a buffer containing it
+    :type stripped_template: str_or_io.StringIO
+    :param result: Result recording the SAR calls made
+    :type result: PublishResult
+    :param parallel_version: Create the version at the same time as updating the application, the version
+        request doesn't depend on the update response
+    :type parallel_version: bool
+    :return: Actions taken
+    :rtype: list of str
+    :raises ClientError
+    """
+    with span('update_application', version_conflict=False) as attributes:
+        update_request = _update_application_request(app_metadata, application_id)
+        if not app_metadata.semantic_version:
+            _make_call(sar_client, 'update_application', result, **update_request)
+            return [UPDATE_APPLICATION]
+
+        # Create application version if semantic version is specified
+        version_request = _create_application_version_request(app_metadata, application_id, stripped_template)
+        if parallel_version:
+            # The version is created on the shared pool while this thread updates the application
+            version_future = get_shared_executor().submit(
+                _make_call, sar_client, 'create_application_version', result, **version_request)
+            try:
+                _make_call(sar_client, 'update_application', result, **update_request)
+            except Exception as e:
+                _record_version_outcome(e, version_future.exception())
+                raise
+            finally:
+                # Wait for the version even when the update fails, so no call outlives the publish
+                version_error = version_future.exception()
+        else:
+            _make_call(sar_client, 'update_application', result, **update_request)
+            try:
+                _make_call(sar_client, 'create_application_version', result, **version_request)
+                version_error = None
+            except ClientError as e:
+                version_error = e
+
+        actions = [UPDATE_APPLICATION]
+        if version_error is None:
+            actions.append(CREATE_APPLICATION_VERSION)
+        elif isinstance(version_error, ClientError) and _is_conflict_exception(version_error):
+            attributes['version_conflict'] = True
+        else:
+            raise version_error
+
+        return actions
+
+
+def _record_version_outcome(error, version_error):
+    """
+    Record on the error updating an application what became of the version created at the same time.
+
+    The version may have been created even though the update failed, so the error gets the actions
+    taken, and the error creating the version if there was one.
+
+    :param error: Error updating the application
+    :type error: Exception
+    :param version_error: Error creating the version, or None if it was created
+    :type version_error: Exception
+    """
+    error.actions = [CREATE_APPLICATION_VERSION] if version_error is None else []
+    error.version_error = version_error
+
+
+def _make_call(sar_client, operation_name, result, **request):
+    """
+    Call a SAR operation, recording it in the publish result if there's one.
+
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param operation_name: Name of the client method, e.g. create_application
+    :type operation_name: str
+    :param result: Result recording the SAR calls made, or None
+    :type result: PublishResult
+    :return: Response of the call
+    :rtype: dict
+    :raises ClientError
+    """
+    if result is None:
+        return make_call(sar_client, operation_name, **request)
+
+    start = _clock()
+    try:
+        return make_call(sar_client, operation_name, **request)
+    finally:
+        result.record_call(operation_name, _clock() - start, request.get('TemplateBody'))
+
+
 def _create_application_request(app_metadata, template):
     """
     Construct the request body to create application.
 
     :param app_metadata: Object containing app metadata
     :type app_metadata: ApplicationMetadata
-    :param template: A packaged YAML or JSON SAM template
-    :type template: str
+    :param template: A packaged YAML or JSON SAM template, or a buffer containing it
+    :type template: str_or_io.StringIO
     :return: SAR CreateApplication request body
     :rtype: dict
     """
@@ -144,7 +579,7 @@ def _create_application_request(app_metadata, template):
         'SemanticVersion': app_metadata.semantic_version,
         'SourceCodeUrl': app_metadata.source_code_url,
         'SpdxLicenseId': app_metadata.spdx_license_id,
-        'TemplateBody': template
+        'TemplateBody': _get_template_body(template)
     }
     # Remove None values
     return {k: v for k, v in request.items() if v}
@@ -181,8 +616,8 @@ def _create_application_version_request(app_metadata, application_id, template):
     :type app_metadata: ApplicationMetadata
     :param application_id: The Amazon Resource Name (ARN) of the application
     :type application_id: str
-    :param template: A packaged YAML or JSON SAM template
-    :type template: str
+    :param template: A packaged YAML or JSON SAM template, or a buffer containing it
+    :type template: str_or_io.StringIO
     :return: SAR CreateApplicationVersion request body
     :rtype: dict
     """
@@ -191,11 +626,49 @@ def _create_application_version_request(app_metadata, application_id, template):
         'ApplicationId': application_id,
         'SemanticVersion': app_metadata.semantic_version,
         'SourceCodeUrl': app_metadata.source_code_url,
-        'TemplateBody': template
+        'TemplateBody': _get_template_body(template)
     }
     return {k: v for k, v in request.items() if v}
 
 
+def _get_publish_digest(app_metadata, application_id, stripped_template):
+    """
+    Compute a digest of everything an update of the application would send to SAR.
+
+    :param app_metadata: Object containing app metadata
+    :type app_metadata: ApplicationMetadata
+    :param application_id: The Amazon Resource Name (ARN) of the application
+    :type application_id: str
+    :param stripped_template: A packaged YAML SAM template without app metadata, or a buffer containing it
+    :type stripped_template: str_or_io.StringIO
+    :return: Hex digest of the update request and the application version content
+    :rtype: str
+    """
+    content = {
+        'UpdateApplication': _update_application_request(app_metadata, application_id),
+        'SemanticVersion': app_metadata.semantic_version,
+        'SourceCodeUrl': app_metadata.source_code_url
+    }
+    digest = hashlib.sha256(six.ensure_binary(json.dumps(content, sort_keys=True, default=str)))
+    digest.update(six.ensure_binary(_get_template_body(stripped_template)))
+    return digest.hexdigest()
+
+
+def _get_template_body(template):
+    """
+    Get the template body to send to SAR.
+
+    :param template: A packaged YAML or JSON SAM template, or a buffer containing it
+    :type template: str_or_io.StringIO
+    :return: The template
+    :rtype: str
+    """
+    if hasattr(template, 'getvalue'):
+        # Doesn't copy the content of a buffer that has only been written to
+        return template.getvalue()
+    return template
+
+
 def _is_conflict_exception(e):
     """
     Check whether the botocore ClientError is ConflictException.
@@ -208,6 +681,18 @@ def _is_conflict_exception(e):
     return error_code == 'ConflictException'
 
 
+def _is_not_found_exception(e):
+    """
+    Check whether the botocore ClientError is NotFoundException.
+
+    :param e: botocore exception
+    :type e: ClientError
+    :return: True if e is NotFoundException
+    """
+    error_code = e.response['Error']['Code']
+    return error_code == 'NotFoundException'
+
+
 def _wrap_client_error(e):
     """
     Wrap botocore ClientError exception into ServerlessRepoClientError.
@@ -219,15 +704,19 @@ def _wrap_client_error(e):
     error_code = e.response['Error']['Code']
     message = e.response['Error']['Message']
 
+    wrapped_error = ServerlessRepoClientError(message=message)
     if error_code == 'BadRequestException':
-        if "Failed to copy S3 object. Access denied:" in message:
-            match = re.search('bucket=(.+?), key=(.+?)$', message)
-            if match:
-                return S3PermissionsRequired(bucket=match.group(1), key=match.group(2))
-        if "Invalid S3 URI" in message:
-            return InvalidS3UriError(message=message)
+        match = re.search('bucket=(.+?), key=(.+?)$', message)
+        if "Failed to copy S3 object. Access denied:" in message and match:
+            wrapped_error = S3PermissionsRequired(bucket=match.group(1), key=match.group(2))
+        elif "Invalid S3 URI" in message:
+            wrapped_error = InvalidS3UriError(message=message)
 
-    return ServerlessRepoClientError(message=message)
+    # Keep the outcome of the version created at the same time as the update
+    for attribute in ('actions', 'version_error'):
+        if hasattr(e, attribute):
+            setattr(wrapped_error, attribute, getattr(e, attribute))
+    return wrapped_error
 
 
 def _get_publish_details(actions, app_metadata_template):
@@ -241,6 +730,9 @@ def _get_publish_details(actions, app_metadata_template):
     :return: Updated fields and values of the application
     :rtype: dict
     """
+    if not actions:
+        return {}
+
     if actions == [CREATE_APPLICATION]:
         return {k: v for k, v in app_metadata_template.items() if v}
 
@@ -0,0 +1,64 @@
+"""Module containing class to store the outcome and costs of publishing an application."""
+
+import threading
+
+import six
+
+
+class PublishResult(object):
+    """
+    Class representing the result of publishing an application, with timings and request sizes.
+
+    Results are meant to be aggregated across many publishes, so they only hold small values.
+    """
+
+    __slots__ = ('application_id', 'actions', 'details', 'duration', 'call_timings', 'template_bytes',
+                 'conflict', 'sar_calls', '_lock')
+
+    def __init__(self):
+        """Initialize an empty result, filled in while publishing."""
+        self.application_id = None
+        self.actions = []
+        self.details = {}
+        self.duration = 0.0
+        self.call_timings = {}
+        self.template_bytes = 0
+        self.conflict = False
+        self.sar_calls = 0
+        # SAR calls can be recorded from multiple threads
+        self._lock = threading.Lock()
+
+    def record_call(self, operation_name, duration, template_body=None):
+        """
+        Record a SAR call made while publishing.
+
+        :param operation_name: Name of the client method, e.g. create_application
+        :type operation_name: str
+        :param duration: Wall time of the call in seconds, including retries of throttled calls
+        :type duration: float
+        :param template_body: TemplateBody sent with the call
+        :type template_body: str
+        """
+        template_bytes = len(six.ensure_binary(template_body)) if template_body else 0
+        with self._lock:
+            self.sar_calls += 1
+            self.call_timings[operation_name] = self.call_timings.get(operation_name, 0.0) + duration
+            self.template_bytes += template_bytes
+
+    def to_dict(self):
+        """
+        Convert to the dictionary returned by publish_application.
+
+        :return: Dictionary containing application id, actions taken, and updated details
+        :rtype: dict
+        """
+        return {
+            'application_id': self.application_id,
+            'actions': self.actions,
+            'details': self.details
+        }
+
+    def __repr__(self):
+        """Show the fields of the result."""
+        return 'PublishResult({})'.format(', '.join(
+            '{}={!r}'.format(name, getattr(self, name)) for name in self.__slots__ if not name.startswith('_')))
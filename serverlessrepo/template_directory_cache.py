@@ -0,0 +1,171 @@
+"""Module containing class to cache prepared templates in a directory, across process runs."""
+
+import os
+import json
+import time
+import tempfile
+import threading
+
+import six
+import yaml
+
+from .__version__ import __version__
+from .application_cache import _replace
+from .application_metadata import ApplicationMetadata
+
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+# Version of the entry format, bump it when the way templates are prepared changes
+FORMAT_VERSION = 1
+
+# Entries prepared by other library versions may differ, they're never read and get evicted over time
+_ENTRY_PREFIX = 'v{}-{}-pyyaml-{}-'.format(FORMAT_VERSION, __version__, yaml.__version__)
+
+_ENTRY_SUFFIX = '.json'
+_TEMP_PREFIX = '.serverlessrepo-template-'
+# Temporary files older than this were left behind by processes that died while writing them
+_STALE_TEMP_SECONDS = 3600
+
+
+class TemplateDirectoryCache(object):
+    """
+    Class mapping template digests to their application metadata and stripped YAML template, one file each.
+
+    Entries are written atomically and the least recently used ones are evicted once the directory grows
+    over its size bound, so several processes, e.g. CI workers, can share the directory. File names include
+    the versions of this library and PyYAML, so templates prepared by other versions aren't reused.
+    """
+
+    APPLICATION_METADATA = 'ApplicationMetadata'
+    STRIPPED_TEMPLATE = 'StrippedTemplate'
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache, creating its directory if it doesn't exist.
+
+        :param path: Path of the directory the templates are cached in
+        :type path: str
+        :param max_bytes: Size of the directory above which the least recently used templates are evicted
+        :type max_bytes: int
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if not os.path.isdir(path):
+            try:
+                os.makedirs(path)
+            except OSError:
+                # Another process created it in the meantime
+                if not os.path.isdir(path):
+                    raise
+        # Estimate of the size of the directory, refreshed when evicting
+        self._size = self._evict()
+
+    def get(self, digest):
+        """
+        Get the prepared template.
+
+        :param digest: Digest of the template
+        :type digest: str
+        :return: Application metadata and the template without it, or None if not cached
+        :rtype: tuple
+        """
+        path = self._get_entry_path(digest)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            # Mark the entry as recently used
+            os.utime(path, None)
+        except (IOError, OSError, ValueError):
+            # Missing, being evicted by another process, or malformed
+            return None
+
+        if not isinstance(entry, dict) or not isinstance(entry.get(self.APPLICATION_METADATA), dict) \
+                or not isinstance(entry.get(self.STRIPPED_TEMPLATE), six.string_types):
+            return None
+
+        return ApplicationMetadata(entry[self.APPLICATION_METADATA]), entry[self.STRIPPED_TEMPLATE]
+
+    def put(self, digest, app_metadata, stripped_template):
+        """
+        Cache the prepared template, evicting the least recently used templates if the directory is too big.
+
+        :param digest: Digest of the template
+        :type digest: str
+        :param app_metadata: Object containing app metadata
+        :type app_metadata: ApplicationMetadata
+        :param stripped_template: A packaged YAML SAM template without app metadata
+        :type stripped_template: str
+        """
+        try:
+            content = json.dumps({
+                self.APPLICATION_METADATA: app_metadata.template_dict,
+                self.STRIPPED_TEMPLATE: stripped_template
+            })
+        except (TypeError, ValueError):
+            # The metadata has values JSON can't represent, e.g. YAML timestamps
+            return
+
+        fd, temp_path = tempfile.mkstemp(dir=self.path, prefix=_TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+            _replace(temp_path, self._get_entry_path(digest))
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self._size += len(content)
+            if self._size <= self.max_bytes:
+                return
+            self._size = self._evict()
+
+    def _evict(self):
+        """
+        Remove the least recently used entries until the directory is under 90% of its size bound.
+
+        Files removed by other processes in the meantime are skipped.
+
+        :return: Size of the entries left
+        :rtype: int
+        """
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.path):
+            path = os.path.join(self.path, name)
+            try:
+                stat = os.stat(path)
+                if name.startswith(_TEMP_PREFIX):
+                    if now - stat.st_mtime > _STALE_TEMP_SECONDS:
+                        os.remove(path)
+                elif name.endswith(_ENTRY_SUFFIX):
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        if size <= self.max_bytes:
+            return size
+
+        # Leave some room, so the next writes don't evict again right away
+        target_size = self.max_bytes * 9 // 10
+        for _, entry_size, path in sorted(entries):
+            if size <= target_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
+        return size
+
+    def _get_entry_path(self, digest):
+        """
+        Get the path of the file of an entry, which is specific to the versions preparing the template.
+
+        :param digest: Digest of the template
+        :type digest: str
+        :return: Path of the file
+        :rtype: str
+        """
+        return os.path.join(self.path, _ENTRY_PREFIX + digest + _ENTRY_SUFFIX)
@@ -0,0 +1,207 @@
+"""Module containing an in-process stand-in for SAR, to test and load test code using this library."""
+
+import time
+import random
+import threading
+
+from botocore.exceptions import ClientError
+
+_clock = getattr(time, 'monotonic', time.time)
+
+# HTTP status codes SAR responds with, other errors are bad requests
+_HTTP_STATUS_CODES = {
+    'NotFoundException': 404,
+    'ConflictException': 409,
+    'TooManyRequestsException': 429,
+    'InternalServerErrorException': 500
+}
+
+
+class _ClientMeta(object):  # pylint: disable=too-few-public-methods
+    """Class mimicking the meta attribute of boto3 clients."""
+
+    def __init__(self, region_name, endpoint_url):
+        self.region_name = region_name
+        self.endpoint_url = endpoint_url
+
+
+class FakeServerlessRepoClient(object):
+    """
+    Class standing in for a boto3 SAR client, keeping applications in memory.
+
+    It implements CreateApplication, UpdateApplication, CreateApplicationVersion, GetApplicationPolicy and
+    PutApplicationPolicy, raising the same ClientError codes and messages as SAR. Latency, throttling and
+    errors can be injected to test how callers behave under load. It's thread-safe.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, latency=0.0, throttle_rate=0.0, error_rate=0.0, rate_limit=None, region_name='us-east-1',
+            account_id='123456789012', seed=None, sleep=time.sleep):
+        """
+        Initialize the client without any application.
+
+        :param latency: Seconds every call takes, or a function returning them
+        :type latency: float_or_callable
+        :param throttle_rate: Probability of a call failing with TooManyRequestsException
+        :type throttle_rate: float
+        :param error_rate: Probability of a call failing with InternalServerErrorException
+        :type error_rate: float
+        :param rate_limit: Maximum number of calls per second, calls above it fail with TooManyRequestsException
+        :type rate_limit: int
+        :param region_name: Region used in application ids
+        :type region_name: str
+        :param account_id: AWS account ID used in application ids
+        :type account_id: str
+        :param seed: Seed of the random injected failures, to make them reproducible
+        :type seed: int
+        :param sleep: Function used to wait for the latency
+        :type sleep: callable
+        """
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.account_id = account_id
+        self.meta = _ClientMeta(region_name, 'https://serverlessrepo.{}.amazonaws.com'.format(region_name))
+        self.calls = {}
+        self._sleep = sleep
+        self._random = random.Random(seed)
+        self._applications = {}
+        self._failures = {}
+        self._window = (None, 0)
+        self._lock = threading.Lock()
+
+    def fail_next(self, operation_name, error_code, message='Injected failure', count=1):
+        """
+        Make the next calls of an operation fail with a ClientError.
+
+        :param operation_name: Name of the client method, e.g. create_application
+        :type operation_name: str
+        :param error_code: Error code of the ClientError, e.g. BadRequestException
+        :type error_code: str
+        :param message: Error message of the ClientError
+        :type message: str
+        :param count: Number of calls to fail
+        :type count: int
+        """
+        with self._lock:
+            self._failures.setdefault(operation_name, []).extend([(error_code, message)] * count)
+
+    def get_application_state(self, application_id):
+        """
+        Get the state of an application, for assertions.
+
+        :param application_id: The Amazon Resource Name (ARN) of the application
+        :type application_id: str
+        :return: Dictionary containing the metadata, versions and policy statements of the application
+        :rtype: dict
+        """
+        with self._lock:
+            return self._applications[application_id]
+
+    def create_application(self, **kwargs):
+        """Create an application, failing with ConflictException if one has the same name."""
+        self._before_call('create_application', 'CreateApplication')
+        missing = [key for key in ('Author', 'Description', 'Name') if not kwargs.get(key)]
+        if missing:
+            _raise('CreateApplication', 'BadRequestException', 'Missing required parameters: {}'.format(missing))
+
+        application_id = 'arn:aws:serverlessrepo:{}:{}:applications/{}'.format(
+            self.meta.region_name, self.account_id, kwargs['Name'])
+        with self._lock:
+            if application_id in self._applications:
+                _raise('CreateApplication', 'ConflictException',
+                       'Application with id {} already exists'.format(application_id))
+
+            versions = {}
+            if kwargs.get('SemanticVersion'):
+                versions[kwargs['SemanticVersion']] = kwargs.get('TemplateBody')
+            self._applications[application_id] = {
+                'Metadata': {k: v for k, v in kwargs.items() if k != 'TemplateBody'},
+                'Versions': versions,
+                'Statements': []
+            }
+        return {'ApplicationId': application_id, 'Name': kwargs['Name']}
+
+    def update_application(self, **kwargs):
+        """Update the metadata of an application."""
+        self._before_call('update_application', 'UpdateApplication')
+        with self._lock:
+            application = self._get('UpdateApplication', kwargs.get('ApplicationId'))
+            application['Metadata'].update((k, v) for k, v in kwargs.items() if k != 'ApplicationId')
+        return {'ApplicationId': kwargs['ApplicationId']}
+
+    def create_application_version(self, **kwargs):
+        """Create an application version, failing with ConflictException if it already exists."""
+        self._before_call('create_application_version', 'CreateApplicationVersion')
+        with self._lock:
+            application = self._get('CreateApplicationVersion', kwargs.get('ApplicationId'))
+            semantic_version = kwargs.get('SemanticVersion')
+            if semantic_version in application['Versions']:
+                _raise('CreateApplicationVersion', 'ConflictException',
+                       'Cannot publish version {} for application {} because it already exists'.format(
+                           semantic_version, kwargs['ApplicationId']))
+            application['Versions'][semantic_version] = kwargs.get('TemplateBody')
+        return {'ApplicationId': kwargs['ApplicationId'], 'SemanticVersion': semantic_version}
+
+    def get_application_policy(self, **kwargs):
+        """Get the policy statements of an application."""
+        self._before_call('get_application_policy', 'GetApplicationPolicy')
+        with self._lock:
+            application = self._get('GetApplicationPolicy', kwargs.get('ApplicationId'))
+            return {'Statements': [dict(s) for s in application['Statements']]}
+
+    def put_application_policy(self, **kwargs):
+        """Replace the policy statements of an application, assigning statement IDs."""
+        self._before_call('put_application_policy', 'PutApplicationPolicy')
+        with self._lock:
+            application = self._get('PutApplicationPolicy', kwargs.get('ApplicationId'))
+            application['Statements'] = [
+                dict(statement, StatementId=statement.get('StatementId') or str(i))
+                for i, statement in enumerate(kwargs.get('Statements', []))
+            ]
+            return {'Statements': [dict(s) for s in application['Statements']]}
+
+    def _get(self, operation_name, application_id):
+        """Get an application, failing with NotFoundException if it doesn't exist. Requires the lock."""
+        if application_id not in self._applications:
+            _raise(operation_name, 'NotFoundException', 'Resource with id {} not found'.format(application_id))
+        return self._applications[application_id]
+
+    def _before_call(self, method_name, operation_name):
+        """Count the call, wait for the latency and inject failures."""
+        latency = self.latency() if callable(self.latency) else self.latency
+        with self._lock:
+            self.calls[method_name] = self.calls.get(method_name, 0) + 1
+            failures = self._failures.get(method_name)
+            failure = failures.pop(0) if failures else None
+            throttled = self._is_over_rate_limit() or self._random.random() < self.throttle_rate
+            failed = self._random.random() < self.error_rate
+
+        if latency:
+            self._sleep(latency)
+        if failure:
+            _raise(operation_name, *failure)
+        if throttled:
+            _raise(operation_name, 'TooManyRequestsException', 'Rate exceeded')
+        if failed:
+            _raise(operation_name, 'InternalServerErrorException', 'Internal server error')
+
+    def _is_over_rate_limit(self):
+        """Count the call in the current one second window. Requires the lock."""
+        if not self.rate_limit:
+            return False
+
+        second = int(_clock())
+        window_second, window_calls = self._window
+        window_calls = window_calls + 1 if window_second == second else 1
+        self._window = (second, window_calls)
+        return window_calls > self.rate_limit
+
+
+def _raise(operation_name, error_code, message):
+    """Raise a ClientError shaped like the errors raised by boto3, status code included."""
+    raise ClientError({
+        'Error': {'Code': error_code, 'Message': message},
+        'ResponseMetadata': {'HTTPStatusCode': _HTTP_STATUS_CODES.get(error_code, 400)}
+    }, operation_name)
@@ -0,0 +1,271 @@
+"""Module containing the rate limiter and retry layer used for every SAR call."""
+
+import time
+import random
+import threading
+
+from botocore.exceptions import ClientError, ConnectionError as BotocoreConnectionError, HTTPClientError
+
+from .instrumentation import span
+
+# Error codes returned by SAR when requests are throttled
+THROTTLING_ERROR_CODES = frozenset(['TooManyRequestsException', 'ThrottlingException', 'Throttling'])
+
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class TokenBucket(object):
+    """
+    Class limiting the rate of calls.
+
+    The rate is halved every time a call is throttled and recovers gradually as calls succeed.
+    """
+
+    def __init__(self, rate, capacity=None, sleep=time.sleep, clock=_clock):
+        """
+        Initialize the bucket full of tokens.
+
+        :param rate: Maximum number of calls per second
+        :type rate: float
+        :param capacity: Maximum number of calls in a burst, defaults to rate
+        :type capacity: float
+        :param sleep: Function used to wait for tokens
+        :type sleep: callable
+        :param clock: Function returning the current time in seconds
+        :type clock: callable
+        """
+        self.max_rate = float(rate)
+        self.rate = self.max_rate
+        self.capacity = float(capacity or max(rate, 1))
+        self._tokens = self.capacity
+        self._sleep = sleep
+        self._clock = clock
+        self._last_refill = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, waiting until one is available.
+
+        :return: Time waited in seconds
+        :rtype: float
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            # Reserve the token now, so concurrent callers queue up behind each other
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait:
+            self._sleep(wait)
+        return wait
+
+    def on_throttled(self):
+        """Halve the rate after a throttled call."""
+        with self._lock:
+            self.rate = max(self.rate / 2, self.max_rate / 16)
+
+    def on_success(self):
+        """Recover the rate gradually after a successful call."""
+        with self._lock:
+            self.rate = min(self.rate + self.max_rate / 16, self.max_rate)
+
+
+class CallScheduler(object):
+    """
+    Class making SAR calls through a token bucket per region, retrying throttled calls with backoff.
+
+    Server errors and connection errors are retried the same way. The clients created by get_client don't
+    retry on their own, so this is the only retry layer and its stats count every attempt.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, max_attempts=5, base_delay=0.5, max_delay=20.0, rate=None, retry_budget=None, sleep=time.sleep):
+        """
+        Initialize the scheduler.
+
+        :param max_attempts: Maximum number of attempts per call, including the first one
+        :type max_attempts: int
+        :param base_delay: Upper bound in seconds of the jittered delay before the first retry, doubled after
+            every retry
+        :type base_delay: float
+        :param max_delay: Maximum delay in seconds before a retry
+        :type max_delay: float
+        :param rate: Maximum number of calls per second per region and endpoint, or None for no limit
+        :type rate: float
+        :param retry_budget: Maximum number of retries across all calls, or None for no limit
+        :type retry_budget: int
+        :param sleep: Function used to wait
+        :type sleep: callable
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate = rate
+        self.retry_budget = retry_budget
+        self._sleep = sleep
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'retries': 0, 'throttled': 0, 'wait_time': 0.0}
+
+    def call(self, sar_client, operation_name, **kwargs):
+        """
+        Call a SAR operation, retrying it while it's throttled or fails with a transient error.
+
+        :param sar_client: The boto3 client used to access SAR
+        :type sar_client: boto3.client
+        :param operation_name: Name of the client method, e.g. create_application
+        :type operation_name: str
+        :return: Response of the call
+        :rtype: dict
+        :raises ClientError
+        """
+        bucket = self._get_bucket(sar_client)
+        self._add_stats(calls=1)
+        with span('sar.' + operation_name, retries=0, wait_time=0.0) as attributes:
+            attempt = 0
+            while True:
+                if bucket:
+                    wait = bucket.acquire()
+                    attributes['wait_time'] += wait
+                    self._add_stats(wait_time=wait)
+
+                try:
+                    response = getattr(sar_client, operation_name)(**kwargs)
+                except (ClientError, BotocoreConnectionError, HTTPClientError) as e:
+                    attempt += 1
+                    if isinstance(e, ClientError):
+                        attributes['error_code'] = e.response['Error']['Code']
+                    if _is_throttling_exception(e):
+                        self._add_stats(throttled=1)
+                        if bucket:
+                            bucket.on_throttled()
+                    elif not _is_transient_error(e):
+                        raise
+
+                    if attempt >= self.max_attempts or not self._take_retry():
+                        raise
+
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+                    attributes['retries'] += 1
+                    attributes['wait_time'] += delay
+                    self._add_stats(wait_time=delay)
+                    self._sleep(delay)
+                    continue
+
+                attributes.pop('error_code', None)
+                if bucket:
+                    bucket.on_success()
+                return response
+
+    def stats(self):
+        """
+        Get the counters of the calls made so far.
+
+        :return: Dictionary containing the number of calls, retries and throttled attempts, and the time
+            spent waiting in seconds
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _get_bucket(self, sar_client):
+        """
+        Get the token bucket of the client's region and endpoint.
+
+        :param sar_client: The boto3 client used to access SAR
+        :type sar_client: boto3.client
+        :return: Token bucket, or None if calls aren't rate limited
+        :rtype: TokenBucket
+        """
+        if not self.rate:
+            return None
+
+        meta = getattr(sar_client, 'meta', None)
+        key = (getattr(meta, 'region_name', None), getattr(meta, 'endpoint_url', None))
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self.rate, sleep=self._sleep)
+            return self._buckets[key]
+
+    def _take_retry(self):
+        """
+        Take a retry from the retry budget.
+
+        :return: True if the budget allows another retry
+        """
+        with self._lock:
+            if self.retry_budget is not None and self._stats['retries'] >= self.retry_budget:
+                return False
+            self._stats['retries'] += 1
+            return True
+
+    def _add_stats(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                self._stats[name] += value
+
+
+_scheduler = CallScheduler()
+
+
+def get_scheduler():
+    """
+    Get the scheduler used for every SAR call made by this library.
+
+    :return: The scheduler
+    :rtype: CallScheduler
+    """
+    return _scheduler
+
+
+def set_scheduler(scheduler):
+    """
+    Replace the scheduler used for every SAR call made by this library.
+
+    :param scheduler: The new scheduler
+    :type scheduler: CallScheduler
+    """
+    global _scheduler  # pylint: disable=global-statement
+    _scheduler = scheduler
+
+
+def make_call(sar_client, operation_name, **kwargs):
+    """
+    Call a SAR operation through the current scheduler.
+
+    :param sar_client: The boto3 client used to access SAR
+    :type sar_client: boto3.client
+    :param operation_name: Name of the client method, e.g. create_application
+    :type operation_name: str
+    :return: Response of the call
+    :rtype: dict
+    :raises ClientError
+    """
+    return _scheduler.call(sar_client, operation_name, **kwargs)
+
+
+def _is_throttling_exception(e):
+    """
+    Check whether the botocore ClientError means the call was throttled.
+
+    :param e: botocore exception
+    :type e: ClientError
+    :return: True if e is a throttling exception
+    """
+    return isinstance(e, ClientError) and e.response['Error']['Code'] in THROTTLING_ERROR_CODES
+
+
+def _is_transient_error(e):
+    """
+    Check whether the botocore exception is a server or connection error, which may not happen again.
+
+    :param e: botocore exception
+    :type e: ClientError
+    :return: True if e is a transient error
+    """
+    if not isinstance(e, ClientError):
+        return True
+    return e.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0) >= 500
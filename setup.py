@@ -1,18 +1,34 @@
 """A setuptools based setup module."""
 
+import sys
 from io import open
 from os import path
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
 
 # Required packages for this module to work
 REQUIRED = [
     'pyyaml~=5.1',
     'boto3~=1.9, >=1.9.56',
-    'six~=1.11'
+    'six~=1.12',
+    # backport of concurrent.futures for Python 2
+    'futures~=3.2; python_version < "3"'
 ]
 
 here = path.abspath(path.dirname(__file__))
 
+
+class BuildPy(build_py):
+    """Leave out the asyncio support on Python 2.7 and 3.4, which can't parse coroutine syntax."""
+
+    def find_package_modules(self, package, package_dir):
+        """Find the modules of a package to build."""
+        modules = build_py.find_package_modules(self, package, package_dir)
+        if sys.version_info < (3, 5):
+            modules = [m for m in modules if (m[0], m[1]) != ('serverlessrepo', 'aio')]
+        return modules
+
+
 # Get the long description from the README file
 with open(path.join(here, 'README.md'), encoding='utf-8') as f:
     long_description = '\n' + f.read()
@@ -38,6 +54,10 @@ setup(
         '>=2.7, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*'
     ),
     install_requires=REQUIRED,
+    cmdclass={'build_py': BuildPy},
+    entry_points={
+        'console_scripts': ['serverlessrepo=serverlessrepo.cli:main']
+    },
     classifiers=[
         'Development Status :: 4 - Beta',
         'Environment :: Console',
@@ -0,0 +1,220 @@
+"""
+Benchmark parsing, stripping and dumping SAM templates of increasing size.
+
+Synthetic templates with 10 to 50,000 resources are generated in YAML (with intrinsic
+function tags) and JSON. For each template it reports the best time out of a few runs,
+the throughput and the peak memory allocated by:
+
+* parse_template
+* strip_app_metadata
+* yaml_dump
+* publish_application, against a stubbed SAR client
+
+Run it with `make benchmark`, or `python -m tests.benchmark.benchmark_template --help`.
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from serverlessrepo.parser import parse_template, strip_app_metadata, yaml_dump, set_template_cache
+from serverlessrepo.publish import publish_application
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 50000]
+
+APP_METADATA = {
+    'Name': 'benchmark-app',
+    'Description': 'Synthetic application used to benchmark the publish path',
+    'Author': 'benchmark',
+    'SpdxLicenseId': 'Apache-2.0',
+    'LicenseUrl': 's3://bucket/LICENSE',
+    'ReadmeUrl': 's3://bucket/README.md',
+    'Labels': ['benchmark'],
+    'HomePageUrl': 'https://github.com/benchmark/app',
+    'SemanticVersion': '1.0.0',
+    'SourceCodeUrl': 'https://github.com/benchmark/app'
+}
+
+YAML_RESOURCE = """  Function{index}:
+    Type: AWS::Serverless::Function
+    Properties:
+      CodeUri: s3://bucket/function{index}.zip
+      Handler: index.handler
+      Runtime: python3.7
+      Role: !GetAtt Role{index}.Arn
+      Environment:
+        Variables:
+          TABLE: !Ref Table
+          QUEUE: !Sub '${{Queue}}-{index}'
+          STAGE: !If [IsProd, prod, !Join ['-', [dev, !Ref Stage]]]
+"""
+
+
+class StubServerlessRepoClient(object):
+    """SAR client returning canned responses without any network calls."""
+
+    APPLICATION_ID = 'arn:aws:serverlessrepo:us-east-1:123456789012:applications/benchmark-app'
+
+    def create_application(self, **kwargs):
+        """Pretend to create the application."""
+        return {'ApplicationId': self.APPLICATION_ID}
+
+    def update_application(self, **kwargs):
+        """Pretend to update the application."""
+        return {'ApplicationId': self.APPLICATION_ID}
+
+    def create_application_version(self, **kwargs):
+        """Pretend to create the application version."""
+        return {'ApplicationId': self.APPLICATION_ID}
+
+
+def generate_yaml_template(num_resources):
+    """
+    Generate a YAML SAM template using intrinsic function tags.
+
+    :param num_resources: Number of resources in the template
+    :type num_resources: int
+    :return: YAML template
+    :rtype: str
+    """
+    lines = ['AWSTemplateFormatVersion: "2010-09-09"', 'Transform: AWS::Serverless-2016-10-31', 'Metadata:',
+             '  AWS::ServerlessRepo::Application:']
+    lines.extend('    {}: {}'.format(k, json.dumps(v)) for k, v in APP_METADATA.items())
+    lines.append('Resources:')
+    return '\n'.join(lines) + '\n' + ''.join(YAML_RESOURCE.format(index=i) for i in range(num_resources))
+
+
+def generate_json_template(num_resources):
+    """
+    Generate a JSON SAM template using intrinsic functions.
+
+    :param num_resources: Number of resources in the template
+    :type num_resources: int
+    :return: JSON template
+    :rtype: str
+    """
+    resources = {}
+    for i in range(num_resources):
+        resources['Function{}'.format(i)] = {
+            'Type': 'AWS::Serverless::Function',
+            'Properties': {
+                'CodeUri': 's3://bucket/function{}.zip'.format(i),
+                'Handler': 'index.handler',
+                'Runtime': 'python3.7',
+                'Role': {'Fn::GetAtt': ['Role{}'.format(i), 'Arn']},
+                'Environment': {'Variables': {'TABLE': {'Ref': 'Table'}}}
+            }
+        }
+    template = {
+        'AWSTemplateFormatVersion': '2010-09-09',
+        'Transform': 'AWS::Serverless-2016-10-31',
+        'Metadata': {'AWS::ServerlessRepo::Application': APP_METADATA},
+        'Resources': resources
+    }
+    return json.dumps(template, indent=2)
+
+
+def measure(func, arg, repeat):
+    """
+    Measure the best wall time and the peak memory allocated by func(arg).
+
+    :param func: Function to measure
+    :type func: callable
+    :param arg: Argument of the function
+    :param repeat: Number of timed runs
+    :type repeat: int
+    :return: Best time in seconds and peak memory in bytes
+    :rtype: tuple
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - start)
+
+    # tracing slows allocations down, so measure memory in a separate run
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return min(timings), peak
+
+
+def format_row(template_format, size, template_bytes, name, seconds, peak):  # pylint: disable=too-many-arguments
+    """
+    Format the line reporting one measurement.
+
+    :param template_format: Template format, 'yaml' or 'json'
+    :type template_format: str
+    :param size: Number of resources in the template
+    :type size: int
+    :param template_bytes: Length of the template
+    :type template_bytes: int
+    :param name: Name of the measured function
+    :type name: str
+    :param seconds: Best time of the timed runs
+    :type seconds: float
+    :param peak: Peak memory allocated, in bytes
+    :type peak: int
+    :return: The line
+    :rtype: str
+    """
+    return '{:<6}{:>10}{:>12}  {:<20}{:>12.2f}{:>14.0f}{:>10.2f}{:>12.2f}'.format(
+        template_format, size, template_bytes, name, seconds * 1000, size / seconds,
+        template_bytes / seconds / 1e6, peak / 1e6)
+
+
+def run(sizes, formats, repeat):
+    """
+    Run the benchmarks and print one line per template format, size and measured function.
+
+    :param sizes: Numbers of resources in the generated templates
+    :type sizes: list of int
+    :param formats: Template formats, 'yaml' and/or 'json'
+    :type formats: list of str
+    :param repeat: Number of timed runs per measurement
+    :type repeat: int
+    """
+    generators = {'yaml': generate_yaml_template, 'json': generate_json_template}
+    sar_client = StubServerlessRepoClient()
+    # Every timed run has to prepare the template, not hit the cache filled by the previous run
+    set_template_cache(None)
+    print('{:<6}{:>10}{:>12}  {:<20}{:>12}{:>14}{:>10}{:>12}'.format(
+        'format', 'resources', 'bytes', 'function', 'time (ms)', 'resources/s', 'MB/s', 'peak (MB)'))
+
+    for template_format in formats:
+        for size in sizes:
+            template = generators[template_format](size)
+            template_dict = parse_template(template)
+            stripped_template_dict = strip_app_metadata(template_dict)
+            cases = [
+                ('parse_template', parse_template, template),
+                ('strip_app_metadata', strip_app_metadata, template_dict),
+                ('yaml_dump', yaml_dump, stripped_template_dict),
+                ('publish_application', lambda t: publish_application(t, sar_client), template)
+            ]
+            for name, func, arg in cases:
+                print(format_row(template_format, size, len(template), name, *measure(func, arg, repeat)))
+
+
+def main():
+    """Parse the command line arguments and run the benchmarks."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                            help='numbers of resources in the generated templates')
+    arg_parser.add_argument('--formats', nargs='+', choices=['yaml', 'json'], default=['yaml', 'json'],
+                            help='template formats to benchmark')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='number of timed runs per measurement')
+    args = arg_parser.parse_args()
+    run(args.sizes, args.formats, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
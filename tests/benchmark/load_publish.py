@@ -0,0 +1,124 @@
+"""
+Load test publishing and sharing applications against an in-process fake SAR.
+
+Synthetic YAML templates are published concurrently to a FakeServerlessRepoClient with
+injected latency, throttling and errors, then published again to go through the
+conflict path, then shared with accounts. For each phase it reports the end-to-end
+throughput, the errors, the throttled calls retried by the call scheduler, and the
+p50/p95/p99 latency of every instrumented span.
+
+Run it with `make load-test`, or `python -m tests.benchmark.load_publish --help`.
+"""
+
+import argparse
+import time
+
+from serverlessrepo import instrumentation, publish_applications, share_applications_with_accounts
+from serverlessrepo.testing import FakeServerlessRepoClient
+from serverlessrepo.throttling import CallScheduler, get_scheduler, set_scheduler
+
+from .benchmark_template import generate_yaml_template
+
+
+def generate_templates(num_applications, num_resources):
+    """
+    Generate YAML templates of applications with different names.
+
+    :param num_applications: Number of templates
+    :type num_applications: int
+    :param num_resources: Number of resources in each template
+    :type num_resources: int
+    :return: YAML templates
+    :rtype: list of str
+    """
+    template = generate_yaml_template(num_resources)
+    return [template.replace('benchmark-app', 'benchmark-app-{}'.format(i), 1) for i in range(num_applications)]
+
+
+def run_phase(name, func, items, scheduler):
+    """
+    Run one phase of the load test and print its throughput, errors and span latencies.
+
+    :param name: Name of the phase
+    :type name: str
+    :param func: Function taking the items and returning their outcomes
+    :type func: callable
+    :param items: Templates or application ids
+    :type items: list
+    :param scheduler: Scheduler making the SAR calls
+    :type scheduler: CallScheduler
+    """
+    aggregator = instrumentation.LatencyAggregator()
+    instrumentation.register_observer(aggregator)
+    stats_before = scheduler.stats()
+    start = time.perf_counter()
+    try:
+        outcomes = func(items)
+    finally:
+        seconds = time.perf_counter() - start
+        instrumentation.unregister_observer(aggregator)
+
+    stats = scheduler.stats()
+    errors = sum(1 for outcome in outcomes if outcome['error'])
+    print('{}: {} in {:.2f}s, {:.1f}/s, {} errors, {} throttled calls, {} retries'.format(
+        name, len(items), seconds, len(items) / seconds, errors,
+        stats['throttled'] - stats_before['throttled'], stats['retries'] - stats_before['retries']))
+    for span_name, summary in sorted(aggregator.summary().items()):
+        print('  {:<30}{:>8} calls{:>10.1f}ms p50{:>10.1f}ms p95{:>10.1f}ms p99'.format(
+            span_name, summary['count'], summary['p50'] * 1000, summary['p95'] * 1000, summary['p99'] * 1000))
+
+
+def run(args):
+    """
+    Publish, republish and share the applications.
+
+    :param args: Parsed command line arguments
+    :type args: argparse.Namespace
+    """
+    sar_client = FakeServerlessRepoClient(
+        latency=args.latency / 1000.0,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        seed=args.seed
+    )
+    templates = generate_templates(args.applications, args.resources)
+    previous_scheduler = get_scheduler()
+    scheduler = CallScheduler(base_delay=args.latency / 1000.0 or 0.01, rate=args.client_rate)
+    set_scheduler(scheduler)
+    try:
+        run_phase('publish', lambda items: publish_applications(
+            items, sar_client, args.workers, parallel_version=args.parallel_version), templates, scheduler)
+        run_phase('republish', lambda items: publish_applications(
+            items, sar_client, args.workers, parallel_version=args.parallel_version), templates, scheduler)
+
+        application_ids = [
+            'arn:aws:serverlessrepo:us-east-1:123456789012:applications/benchmark-app-{}'.format(i)
+            for i in range(args.applications)
+        ]
+        run_phase('share', lambda items: list(share_applications_with_accounts(
+            items, ['123456789013'], sar_client, args.workers).values()), application_ids, scheduler)
+    finally:
+        set_scheduler(previous_scheduler)
+
+
+def main():
+    """Parse the command line arguments and run the load test."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--applications', type=int, default=1000, help='number of applications published')
+    arg_parser.add_argument('--resources', type=int, default=10, help='number of resources in each template')
+    arg_parser.add_argument('--workers', type=int, default=20, help='number of concurrent publishes')
+    arg_parser.add_argument('--latency', type=float, default=20, help='latency of every SAR call in milliseconds')
+    arg_parser.add_argument('--throttle-rate', type=float, default=0.0,
+                            help='probability of a SAR call being throttled')
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help='probability of a SAR call failing')
+    arg_parser.add_argument('--rate-limit', type=int, help='SAR calls per second above which calls are throttled')
+    arg_parser.add_argument('--client-rate', type=float, help='SAR calls per second the client is limited to')
+    arg_parser.add_argument('--parallel-version', action='store_true',
+                            help='create application versions at the same time as updating applications')
+    arg_parser.add_argument('--seed', type=int, help='seed of the injected failures')
+    run(arg_parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
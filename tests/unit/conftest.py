@@ -1,4 +1,18 @@
 import os
+import sys
+
+import pytest
+
+from serverlessrepo.parser import set_template_cache
 
 # set expected aws region environment variable
 os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+# coroutine syntax requires Python 3.5 or greater
+collect_ignore = ['test_aio.py'] if sys.version_info < (3, 5) else []
+
+
+@pytest.fixture(autouse=True)
+def clear_template_cache():
+    # templates are cached across calls once a cache is set, start every test without one
+    set_template_cache(None)
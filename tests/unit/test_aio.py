@@ -0,0 +1,93 @@
+import json
+import asyncio
+from unittest import TestCase
+from mock import patch, Mock
+
+from serverlessrepo import aio
+from serverlessrepo.application_policy import ApplicationPolicy
+from serverlessrepo.exceptions import InvalidApplicationMetadataError
+from serverlessrepo.publish import CREATE_APPLICATION
+
+
+class TestAio(TestCase):
+
+    def setUp(self):
+        patcher = patch('serverlessrepo.aio.get_client')
+        self.addCleanup(patcher.stop)
+        self.get_client_mock = patcher.start()
+        self.serverlessrepo_mock = Mock()
+        self.get_client_mock.return_value = self.serverlessrepo_mock
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        app_metadata = {'Name': 'test-app', 'Description': 'hello world', 'Author': 'abc'}
+        self.template = json.dumps({'Metadata': {'AWS::ServerlessRepo::Application': app_metadata}})
+        self.application_id = 'arn:aws:serverlessrepo:us-east-1:123456789012:applications/test-app'
+        self.serverlessrepo_mock.create_application.return_value = {
+            'ApplicationId': self.application_id
+        }
+
+    def test_publish_application(self):
+        actual_result = self.loop.run_until_complete(aio.publish_application(self.template))
+        self.assertEqual(actual_result['application_id'], self.application_id)
+        self.assertEqual(actual_result['actions'], [CREATE_APPLICATION])
+        self.serverlessrepo_mock.create_application.assert_called_once()
+
+    def test_publish_application_with_passed_in_sar_client_and_executor(self):
+        sar_client = Mock()
+        sar_client.create_application.return_value = {'ApplicationId': self.application_id}
+        with aio.create_executor(2) as executor:
+            self.loop.run_until_complete(aio.publish_application(self.template, sar_client, executor))
+
+        sar_client.create_application.assert_called_once()
+        self.get_client_mock.assert_not_called()
+
+    def test_publish_applications_returns_results_in_input_order(self):
+        template_without_name = self.template.replace('"Name": "test-app", ', '')
+        actual_result = self.loop.run_until_complete(
+            aio.publish_applications([self.template, template_without_name], max_concurrency=2))
+
+        self.assertEqual(actual_result[0]['result']['application_id'], self.application_id)
+        self.assertIsNone(actual_result[0]['error'])
+        self.assertIsNone(actual_result[1]['result'])
+        self.assertIsInstance(actual_result[1]['error'], InvalidApplicationMetadataError)
+        self.get_client_mock.assert_called_once_with(max_pool_connections=2)
+
+    def test_publish_applications_parallel_version(self):
+        actual_result = self.loop.run_until_complete(
+            aio.publish_applications([self.template], max_concurrency=2, parallel_version=True))
+
+        self.assertEqual(actual_result[0]['result']['actions'], [CREATE_APPLICATION])
+        self.get_client_mock.assert_called_once_with(max_pool_connections=4)
+
+    def test_update_application_metadata(self):
+        self.loop.run_until_complete(aio.update_application_metadata(self.template, self.application_id))
+        self.serverlessrepo_mock.update_application.assert_called_once_with(
+            ApplicationId=self.application_id,
+            Author='abc',
+            Description='hello world'
+        )
+
+    def test_make_application_public(self):
+        self.loop.run_until_complete(aio.make_application_public(self.application_id))
+        self.serverlessrepo_mock.put_application_policy.assert_called_once_with(
+            ApplicationId=self.application_id,
+            Statements=[{'Principals': ['*'], 'Actions': [ApplicationPolicy.DEPLOY]}]
+        )
+
+    def test_make_application_private(self):
+        self.loop.run_until_complete(aio.make_application_private(self.application_id))
+        self.serverlessrepo_mock.put_application_policy.assert_called_once_with(
+            ApplicationId=self.application_id,
+            Statements=[]
+        )
+
+    def test_share_application_with_accounts(self):
+        self.loop.run_until_complete(aio.share_application_with_accounts(self.application_id, ['123456789012']))
+        self.serverlessrepo_mock.put_application_policy.assert_called_once_with(
+            ApplicationId=self.application_id,
+            Statements=[{'Principals': ['123456789012'], 'Actions': [ApplicationPolicy.DEPLOY]}]
+        )
+
+    def test_propagates_errors(self):
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(aio.make_application_public(''))
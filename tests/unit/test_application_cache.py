@@ -0,0 +1,60 @@
+import os
+import json
+import shutil
+import tempfile
+from unittest import TestCase
+
+from serverlessrepo.application_cache import ApplicationCache
+
+
+class TestApplicationCache(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.path = os.path.join(self.temp_dir, 'cache.json')
+        self.application_id = 'arn:aws:serverlessrepo:us-east-1:123456789012:applications/test-app'
+
+    def test_in_memory_cache(self):
+        cache = ApplicationCache()
+        self.assertIsNone(cache.get('test-app'))
+
+        cache.put('test-app', self.application_id)
+        self.assertEqual(cache.get('test-app'), self.application_id)
+
+        cache.invalidate('test-app')
+        self.assertIsNone(cache.get('test-app'))
+
+    def test_persist_to_file(self):
+        ApplicationCache(self.path).put('test-app', self.application_id)
+        self.assertEqual(ApplicationCache(self.path).get('test-app'), self.application_id)
+
+        ApplicationCache(self.path).invalidate('test-app')
+        self.assertIsNone(ApplicationCache(self.path).get('test-app'))
+        # temporary files shouldn't be left behind
+        self.assertEqual(os.listdir(self.temp_dir), ['cache.json'])
+
+    def test_missing_file(self):
+        cache = ApplicationCache(self.path)
+        self.assertIsNone(cache.get('test-app'))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_ignore_malformed_file(self):
+        with open(self.path, 'w') as f:
+            f.write('not json')
+
+        cache = ApplicationCache(self.path)
+        self.assertIsNone(cache.get('test-app'))
+
+        cache.put('test-app', self.application_id)
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {'test-app': {'ApplicationId': self.application_id}})
+
+    def test_digest(self):
+        cache = ApplicationCache(self.path)
+        cache.put('test-app', self.application_id, 'digest')
+        self.assertEqual(ApplicationCache(self.path).get_digest('test-app'), 'digest')
+
+        cache.put('test-app', self.application_id)
+        self.assertEqual(cache.get('test-app'), self.application_id)
+        self.assertIsNone(ApplicationCache(self.path).get_digest('test-app'))
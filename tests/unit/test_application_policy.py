@@ -1,15 +1,15 @@
 from unittest import TestCase
 
-from serverlessrepo.application_policy import ApplicationPolicy
+from serverlessrepo.application_policy import ApplicationPolicy, add_accounts, remove_accounts
 from serverlessrepo.exceptions import InvalidApplicationPolicyError
 
 
 class TestApplicationPolicy(TestCase):
 
     def test_init(self):
-        app_policy = ApplicationPolicy(['1', '2'], ['a', 'b'])
-        self.assertEqual(app_policy.principals, ['1', '2'])
-        self.assertEqual(app_policy.actions, ['a', 'b'])
+        app_policy = ApplicationPolicy(['1', '2', '1'], ['a', 'b'])
+        self.assertEqual(app_policy.principals, frozenset(['1', '2']))
+        self.assertEqual(app_policy.actions, frozenset(['a', 'b']))
 
     def test_valid_principals_actions(self):
         principals = ['123456789011', '*']
@@ -60,3 +60,87 @@ class TestApplicationPolicy(TestCase):
             'Actions': ['actionA', 'actionB']
         }
         self.assertEqual(app_policy.to_statement(), expected_statement)
+
+    def test_to_statement_sorted_and_deduplicated(self):
+        app_policy = ApplicationPolicy(['2', '1', '2'], ['actionB', 'actionA', 'actionB'])
+        expected_statement = {
+            'Principals': ['1', '2'],
+            'Actions': ['actionA', 'actionB']
+        }
+        self.assertEqual(app_policy.to_statement(), expected_statement)
+
+    def test_non_ascii_digits_principals(self):
+        app_policy = ApplicationPolicy([u'12345678901\u0663'], [ApplicationPolicy.DEPLOY])
+        with self.assertRaises(InvalidApplicationPolicyError):
+            app_policy.validate()
+
+    def test_equality_and_hash(self):
+        app_policy = ApplicationPolicy(['123456789012', '*'], [ApplicationPolicy.DEPLOY])
+        same_policy = ApplicationPolicy(['*', '123456789012', '*'], [ApplicationPolicy.DEPLOY])
+        other_policy = ApplicationPolicy(['*'], [ApplicationPolicy.DEPLOY])
+
+        self.assertEqual(app_policy, same_policy)
+        self.assertFalse(app_policy != same_policy)
+        self.assertEqual(hash(app_policy), hash(same_policy))
+        self.assertNotEqual(app_policy, other_policy)
+        self.assertNotEqual(app_policy, app_policy.to_statement())
+        self.assertEqual(len({app_policy, same_policy, other_policy}), 2)
+
+    def test_slots(self):
+        app_policy = ApplicationPolicy(['*'], [ApplicationPolicy.DEPLOY])
+        with self.assertRaises(AttributeError):
+            app_policy.statement_id = 'abc'  # pylint: disable=assigning-non-slot
+
+
+class TestAddRemoveAccounts(TestCase):
+
+    def test_add_accounts_to_empty_policy(self):
+        statements = add_accounts([], ['123456789012', '123456789012'])
+        self.assertEqual(statements, [{'Principals': ['123456789012'], 'Actions': [ApplicationPolicy.DEPLOY]}])
+
+    def test_add_accounts_merges_statements_with_same_actions(self):
+        current = [
+            {'StatementId': 'a', 'Principals': ['123456789013'], 'Actions': ['Deploy', 'GetApplication']},
+            {'StatementId': 'b', 'Principals': ['123456789011'], 'Actions': ['Deploy']},
+            {'StatementId': 'c', 'Principals': ['123456789014'], 'Actions': ['GetApplication', 'Deploy']}
+        ]
+        statements = add_accounts(current, ['123456789012', '123456789011'],
+                                  [ApplicationPolicy.GET_APPLICATION, ApplicationPolicy.DEPLOY])
+        self.assertEqual(statements, [
+            {
+                'Principals': ['123456789011', '123456789012', '123456789013', '123456789014'],
+                'Actions': ['Deploy', 'GetApplication']
+            },
+            {'Principals': ['123456789011'], 'Actions': ['Deploy']}
+        ])
+
+    def test_add_accounts_keeps_organization_statements(self):
+        org_statement = {'Principals': ['*'], 'PrincipalOrgIDs': ['o-abc'], 'Actions': ['Deploy']}
+        statements = add_accounts([org_statement], ['123456789012'])
+        self.assertEqual(statements, [
+            {'Principals': ['123456789012'], 'Actions': ['Deploy']},
+            org_statement
+        ])
+
+    def test_add_accounts_with_invalid_account_ids(self):
+        with self.assertRaises(InvalidApplicationPolicyError):
+            add_accounts([], ['123'])
+
+    def test_remove_accounts_from_every_statement(self):
+        current = [
+            {'Principals': ['123456789011', '123456789012'], 'Actions': ['Deploy']},
+            {'Principals': ['123456789012'], 'Actions': ['GetApplication']}
+        ]
+        statements = remove_accounts(current, ['123456789012'])
+        self.assertEqual(statements, [{'Principals': ['123456789011'], 'Actions': ['Deploy']}])
+
+    def test_remove_accounts_from_statement_with_actions(self):
+        current = [
+            {'Principals': ['123456789011', '123456789012'], 'Actions': ['Deploy']},
+            {'Principals': ['123456789012'], 'Actions': ['GetApplication']}
+        ]
+        statements = remove_accounts(current, ['123456789012'], [ApplicationPolicy.DEPLOY])
+        self.assertEqual(statements, [
+            {'Principals': ['123456789011'], 'Actions': ['Deploy']},
+            {'Principals': ['123456789012'], 'Actions': ['GetApplication']}
+        ])
@@ -0,0 +1,146 @@
+import io
+import os
+import json
+import tempfile
+import shutil
+from unittest import TestCase
+from mock import patch
+
+from serverlessrepo import cli
+from serverlessrepo.parser import TemplateCache, set_template_cache
+from serverlessrepo.testing import FakeServerlessRepoClient
+
+TEMPLATE = u"""Metadata:
+  AWS::ServerlessRepo::Application:
+    Name: {name}
+    Description: hello world
+    Author: abc
+    SemanticVersion: 1.0.0
+Resources: {{}}
+"""
+
+
+class TestCli(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        patcher = patch('serverlessrepo.cli.get_client')
+        self.addCleanup(patcher.stop)
+        self.get_client_mock = patcher.start()
+        self.sar_client = FakeServerlessRepoClient()
+        self.get_client_mock.return_value = self.sar_client
+
+        self.write('app-a/packaged.yaml', TEMPLATE.format(name='app-a'))
+        self.write('app-b/nested/packaged.yml', TEMPLATE.format(name='app-b'))
+        self.write('app-c/template.yaml', u'Resources: {}\n')
+        self.write('app-c/README.md', TEMPLATE.format(name='app-c'))
+        self.write('.aws-sam/packaged.yaml', TEMPLATE.format(name='app-d'))
+
+    def write(self, relative_path, content):
+        path = os.path.join(self.directory, relative_path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def run_cli(self, *args):
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            exit_code = cli.main(['publish', self.directory, '--processes', '1'] + list(args))
+        return exit_code, json.loads(stdout.getvalue())
+
+    def test_publish_templates_found_in_directory(self):
+        exit_code, summary = self.run_cli('--region', 'us-west-2', '--workers', '4')
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(summary['templates'], 2)
+        self.assertEqual(summary['failed'], 0)
+        self.assertEqual([os.path.relpath(r['path'], self.directory) for r in summary['results']],
+                         [os.path.join('app-a', 'packaged.yaml'), os.path.join('app-b', 'nested', 'packaged.yml')])
+        self.assertEqual([r['actions'] for r in summary['results']], [['CREATE_APPLICATION']] * 2)
+        self.get_client_mock.assert_called_once_with(region_name='us-west-2', profile_name=None,
+                                                     max_pool_connections=4)
+
+    def test_publish_parallel_version_doubles_connection_pool(self):
+        exit_code, _ = self.run_cli('--workers', '4', '--parallel-version')
+
+        self.assertEqual(exit_code, 0)
+        self.get_client_mock.assert_called_once_with(region_name=None, profile_name=None, max_pool_connections=8)
+
+    def test_publish_skips_source_templates_by_default(self):
+        self.write('app-a/template.yaml', TEMPLATE.format(name='app-a'))
+        exit_code, summary = self.run_cli()
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(summary['templates'], 2)
+        self.assertEqual(self.sar_client.calls, {'create_application': 2})
+
+    def test_publish_unicode_template(self):
+        self.write('app-a/packaged.yaml', TEMPLATE.format(name='app-a').replace(u'hello world', u'caf\xe9'))
+        exit_code, summary = self.run_cli()
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(summary['failed'], 0)
+        application_id = summary['results'][0]['application_id']
+        self.assertEqual(self.sar_client.get_application_state(application_id)['Metadata']['Description'], u'caf\xe9')
+
+    def test_missing_path(self):
+        with patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            with self.assertRaises(SystemExit) as context:
+                cli.main(['publish', os.path.join(self.directory, 'missing')])
+
+        self.assertEqual(context.exception.code, 2)
+        self.assertIn('path not found', stderr.getvalue())
+        self.get_client_mock.assert_not_called()
+
+    def test_publish_reports_failures(self):
+        self.write('app-e/packaged.yaml', u'Metadata:\n  AWS::ServerlessRepo::Application: [\n')
+        self.sar_client.fail_next('create_application', 'BadRequestException', 'Invalid S3 URI')
+
+        exit_code, summary = self.run_cli()
+
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(summary['failed'], 2)
+        errors = [r['error'] for r in summary['results']]
+        self.assertIn('Invalid S3 URI', errors[0])
+        self.assertIsNone(errors[1])
+        self.assertIn('did not find expected node content', errors[2])
+
+    def test_publish_with_cache_skips_unchanged_templates(self):
+        cache_path = os.path.join(self.directory, 'cache.json')
+        self.run_cli('--cache', cache_path)
+        exit_code, summary = self.run_cli('--cache', cache_path)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual([r['actions'] for r in summary['results']], [[], []])
+        self.assertEqual(self.sar_client.calls, {'create_application': 2})
+
+    @patch('serverlessrepo.publish.split_app_metadata')
+    def test_publish_with_template_cache_skips_preparing_unchanged_templates(self, split_app_metadata_mock):
+        split_app_metadata_mock.return_value = None
+        template_cache = os.path.join(self.directory, '.template-cache')
+        self.run_cli('--template-cache', template_cache)
+        set_template_cache(TemplateCache())
+        exit_code, summary = self.run_cli('--template-cache', template_cache)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual([r['actions'] for r in summary['results']], [['UPDATE_APPLICATION']] * 2)
+        self.assertEqual(split_app_metadata_mock.call_count, 2)
+        self.assertEqual(len(os.listdir(template_cache)), 2)
+
+    def test_dry_run(self):
+        exit_code, summary = self.run_cli('--dry-run', '--pattern', '*.yaml')
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(summary['templates'], 1)
+        self.get_client_mock.assert_not_called()
+
+    def test_prepare_templates_in_process_pool(self):
+        self.write('app-e/packaged.yaml', u'Metadata:\n  AWS::ServerlessRepo::Application: [\n')
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            exit_code = cli.main(['publish', self.directory, '--processes', '2'])
+
+        self.assertEqual(exit_code, 1)
+        summary = json.loads(stdout.getvalue())
+        self.assertEqual([r['error'] is None for r in summary['results']], [True, True, False])
@@ -0,0 +1,49 @@
+from unittest import TestCase
+from mock import patch
+
+from serverlessrepo import clients
+
+
+class TestClients(TestCase):
+
+    def setUp(self):
+        patcher = patch('serverlessrepo.clients.boto3')
+        self.addCleanup(patcher.stop)
+        self.boto3_mock = patcher.start()
+        self.boto3_mock.client.side_effect = lambda *args, **kwargs: object()
+        self.boto3_mock.session.Session.return_value.client.side_effect = lambda *args, **kwargs: object()
+        clients.clear_clients()
+        self.addCleanup(clients.clear_clients)
+
+    def test_get_client_reuses_client(self):
+        sar_client = clients.get_client()
+        self.assertIs(clients.get_client(), sar_client)
+        self.assertIs(clients.get_client(max_pool_connections=clients.DEFAULT_MAX_POOL_CONNECTIONS), sar_client)
+        self.boto3_mock.client.assert_called_once()
+
+        args, kwargs = self.boto3_mock.client.call_args
+        self.assertEqual(args, ('serverlessrepo',))
+        self.assertIsNone(kwargs['region_name'])
+        self.assertIsNone(kwargs['endpoint_url'])
+        self.assertEqual(kwargs['config'].max_pool_connections, clients.DEFAULT_MAX_POOL_CONNECTIONS)
+        # the call scheduler is the only retry layer
+        self.assertEqual(kwargs['config'].retries, {'max_attempts': 0})
+
+    def test_get_client_per_region_endpoint_and_pool_size(self):
+        sar_client = clients.get_client()
+        self.assertIsNot(clients.get_client(region_name='us-west-2'), sar_client)
+        self.assertIsNot(clients.get_client(endpoint_url='http://localhost:8000'), sar_client)
+        self.assertIsNot(clients.get_client(max_pool_connections=50), sar_client)
+        self.assertEqual(self.boto3_mock.client.call_count, 4)
+        self.assertEqual(self.boto3_mock.client.call_args[1]['config'].max_pool_connections, 50)
+
+    def test_get_client_with_profile(self):
+        sar_client = clients.get_client(profile_name='test')
+        self.assertIs(clients.get_client(profile_name='test'), sar_client)
+        self.boto3_mock.session.Session.assert_called_once_with(profile_name='test')
+        self.boto3_mock.client.assert_not_called()
+
+    def test_clear_clients(self):
+        sar_client = clients.get_client()
+        clients.clear_clients()
+        self.assertIsNot(clients.get_client(), sar_client)
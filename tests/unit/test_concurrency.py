@@ -0,0 +1,65 @@
+from unittest import TestCase
+
+from serverlessrepo.concurrency import run_concurrently, run_in_processes, get_shared_executor
+
+
+class TestRunConcurrently(TestCase):
+
+    def test_empty_items(self):
+        self.assertEqual(run_concurrently(lambda item: item, []), [])
+
+    def test_results_in_input_order(self):
+        actual_result = run_concurrently(lambda item: item * 2, [3, 1, 2], max_workers=2)
+        expected_result = [
+            {'result': 6, 'error': None},
+            {'result': 2, 'error': None},
+            {'result': 4, 'error': None}
+        ]
+        self.assertEqual(actual_result, expected_result)
+
+    def test_failure_does_not_stop_other_items(self):
+        error = ValueError('bad item')
+
+        def func(item):
+            if item == 'bad':
+                raise error
+            return item
+
+        actual_result = run_concurrently(func, ['good', 'bad', 'good'])
+        self.assertEqual(actual_result[0], {'result': 'good', 'error': None})
+        self.assertEqual(actual_result[1], {'result': None, 'error': error})
+        self.assertEqual(actual_result[2], {'result': 'good', 'error': None})
+
+
+class TestSharedExecutor(TestCase):
+
+    def test_executor_is_created_once(self):
+        self.assertIs(get_shared_executor(), get_shared_executor())
+        self.assertEqual(get_shared_executor().submit(abs, -1).result(), 1)
+
+
+class TestRunInProcesses(TestCase):
+
+    def test_empty_items(self):
+        self.assertEqual(run_in_processes(int, []), [])
+
+    def test_results_in_input_order(self):
+        actual_result = run_in_processes(int, ['3', '1', '2'], max_workers=2)
+        expected_result = [
+            {'result': 3, 'error': None},
+            {'result': 1, 'error': None},
+            {'result': 2, 'error': None}
+        ]
+        self.assertEqual(actual_result, expected_result)
+
+    def test_failure_does_not_stop_other_items(self):
+        actual_result = run_in_processes(int, ['1', 'bad', '3'], max_workers=2)
+        self.assertEqual(actual_result[0], {'result': 1, 'error': None})
+        self.assertIsNone(actual_result[1]['result'])
+        self.assertIsInstance(actual_result[1]['error'], ValueError)
+        self.assertEqual(actual_result[2], {'result': 3, 'error': None})
+
+    def test_runs_inline_with_one_worker(self):
+        # Lambdas can't be sent to worker processes
+        actual_result = run_in_processes(lambda item: item * 2, [1, 2], max_workers=1)
+        self.assertEqual(actual_result, [{'result': 2, 'error': None}, {'result': 4, 'error': None}])
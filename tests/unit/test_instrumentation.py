@@ -0,0 +1,112 @@
+from unittest import TestCase
+from mock import Mock
+
+from botocore.exceptions import ClientError
+
+from serverlessrepo import instrumentation, publish_application, make_application_private
+from serverlessrepo.instrumentation import LatencyAggregator, Span, span
+from serverlessrepo.throttling import CallScheduler
+
+
+class TestSpan(TestCase):
+
+    def setUp(self):
+        self.spans = []
+        instrumentation.register_observer(self.spans.append)
+        self.addCleanup(instrumentation.unregister_observer, self.spans.append)
+
+    def test_span_emitted_with_attributes(self):
+        with span('phase', size=10) as attributes:
+            attributes['extra'] = True
+
+        self.assertEqual(len(self.spans), 1)
+        self.assertEqual(self.spans[0].name, 'phase')
+        self.assertEqual(self.spans[0].attributes, {'size': 10, 'extra': True})
+        self.assertGreaterEqual(self.spans[0].duration, 0)
+        self.assertIsNone(self.spans[0].error)
+
+    def test_span_emitted_with_error(self):
+        error = ValueError('failed')
+        with self.assertRaises(ValueError):
+            with span('phase'):
+                raise error
+
+        self.assertIs(self.spans[0].error, error)
+
+    def test_no_span_emitted_without_observers(self):
+        instrumentation.unregister_observer(self.spans.append)
+        self.assertFalse(instrumentation.is_enabled())
+        with span('phase') as attributes:
+            attributes['extra'] = True
+
+        self.assertEqual(self.spans, [])
+
+    def test_sar_call_span_with_retries(self):
+        throttled = ClientError({'Error': {'Code': 'TooManyRequestsException', 'Message': 'Random'}}, 'get')
+        sar_client = Mock()
+        sar_client.get_application.side_effect = [throttled, {'ApplicationId': 'id'}]
+        CallScheduler(sleep=lambda delay: None).call(sar_client, 'get_application', ApplicationId='id')
+
+        self.assertEqual(self.spans[0].name, 'sar.get_application')
+        self.assertEqual(self.spans[0].attributes['retries'], 1)
+        self.assertNotIn('error_code', self.spans[0].attributes)
+
+    def test_publish_application_spans(self):
+        sar_client = Mock()
+        sar_client.create_application.side_effect = ClientError(
+            {'Error': {
+                'Code': 'ConflictException',
+                'Message': 'Application with id arn:aws:serverlessrepo:us-east-1:123456789012:applications/'
+                           'test-app already exists'
+            }},
+            'create_application'
+        )
+        template = '{"Metadata": {"AWS::ServerlessRepo::Application": ' \
+                   '{"Name": "test-app", "Description": "hello", "Author": "abc"}}}'
+        publish_application(template, sar_client)
+
+        spans = {s.name: s for s in self.spans}
+        self.assertEqual(set(spans), {
+            'split_app_metadata', 'parse_template', 'strip_app_metadata', 'yaml_dump', 'prepare_template',
+            'sar.create_application', 'create_application', 'sar.update_application', 'update_application',
+            'publish_application'
+        })
+        self.assertEqual(spans['publish_application'].attributes['template_bytes'], len(template))
+        self.assertEqual(spans['publish_application'].attributes['actions'], ['UPDATE_APPLICATION'])
+        self.assertTrue(spans['prepare_template'].attributes['parsed'])
+        self.assertTrue(spans['create_application'].attributes['conflict'])
+        self.assertEqual(spans['sar.create_application'].attributes['error_code'], 'ConflictException')
+        self.assertIsNotNone(spans['sar.create_application'].error)
+
+    def test_application_policy_span(self):
+        make_application_private('arn:aws:serverlessrepo:us-east-1:123456789012:applications/test-app', Mock())
+
+        self.assertEqual([s.name for s in self.spans], ['sar.put_application_policy', 'update_application_policy'])
+        self.assertTrue(self.spans[1].attributes['changed'])
+
+
+class TestLatencyAggregator(TestCase):
+
+    def test_summary(self):
+        aggregator = LatencyAggregator()
+        for duration in range(1, 101):
+            aggregator(Span('phase', float(duration), {}))
+        aggregator(Span('other', 1.0, {}, ValueError()))
+
+        summary = aggregator.summary()
+        self.assertEqual(summary['phase'], {'count': 100, 'errors': 0, 'p50': 50.0, 'p95': 95.0, 'p99': 99.0})
+        self.assertEqual(summary['other'], {'count': 1, 'errors': 1, 'p50': 1.0, 'p95': 1.0, 'p99': 1.0})
+
+    def test_max_samples(self):
+        aggregator = LatencyAggregator(max_samples=2)
+        for duration in [100.0, 1.0, 2.0]:
+            aggregator(Span('phase', duration, {}))
+
+        self.assertEqual(aggregator.summary()['phase']['count'], 3)
+        self.assertEqual(aggregator.summary()['phase']['p99'], 2.0)
+
+    def test_reset(self):
+        aggregator = LatencyAggregator()
+        aggregator(Span('phase', 1.0, {}))
+        aggregator.reset()
+        self.assertEqual(aggregator.summary(), {})
@@ -1,6 +1,10 @@
 import re
+import io
 from collections import OrderedDict
 from unittest import TestCase
+from mock import patch
+
+import yaml
 
 from serverlessrepo.exceptions import ApplicationMetadataNotFoundError
 from serverlessrepo.application_metadata import ApplicationMetadata
@@ -56,6 +60,12 @@ class TestParser(TestCase):
         output_again = parser.parse_template(formatted_str)
         self.assertEqual(output, output_again)
 
+    def test_yaml_dump_to_stream(self):
+        output = parser.parse_template(self.yaml_with_tags)
+        stream = io.StringIO()
+        self.assertIsNone(parser.yaml_dump(output, stream))
+        self.assertEqual(stream.getvalue(), parser.yaml_dump(output))
+
     def test_yaml_getatt(self):
         # This is an invalid syntax for !GetAtt. But make sure the code does not crash when we encouter this syntax
         # Let CloudFormation interpret this value at runtime
@@ -133,6 +143,18 @@ class TestParser(TestCase):
         self.assertEqual(re.sub(r'\n|\s', '', input_template),
                          re.sub(r'\n|\s', '', output_template))
 
+    def test_parse_and_dump_do_not_modify_global_yaml_classes(self):
+        safe_loader_constructors = dict(yaml.SafeLoader.yaml_constructors)
+        safe_loader_multi_constructors = dict(yaml.SafeLoader.yaml_multi_constructors)
+        safe_dumper_representers = dict(yaml.SafeDumper.yaml_representers)
+
+        parser.yaml_dump(parser.parse_template(self.yaml_with_tags))
+
+        self.assertEqual(safe_loader_constructors, yaml.SafeLoader.yaml_constructors)
+        self.assertEqual(safe_loader_multi_constructors, yaml.SafeLoader.yaml_multi_constructors)
+        self.assertEqual(safe_dumper_representers, yaml.SafeDumper.yaml_representers)
+        self.assertNotIn('!', yaml.SafeLoader.yaml_multi_constructors)
+
     def test_get_app_metadata_missing_metadata(self):
         template_dict_without_metadata = {
             'RandomKey': {
@@ -231,3 +253,258 @@ class TestParser(TestCase):
         }
         actual_output = parser.strip_app_metadata(template_dict)
         self.assertEqual(actual_output, expected_output)
+
+    def test_strip_app_metadata_does_not_modify_input(self):
+        template_dict = {
+            'Metadata': {
+                'AWS::ServerlessRepo::Application': {'Name': 'name'},
+                'AnotherKey': {}
+            },
+            'Resources': {'Key1': {}}
+        }
+        actual_output = parser.strip_app_metadata(template_dict)
+        self.assertEqual(actual_output, {'Metadata': {'AnotherKey': {}}, 'Resources': {'Key1': {}}})
+        self.assertEqual(template_dict['Metadata'], {
+            'AWS::ServerlessRepo::Application': {'Name': 'name'},
+            'AnotherKey': {}
+        })
+        # sections not on the path to the app metadata are shared, not copied
+        self.assertIs(actual_output['Resources'], template_dict['Resources'])
+        self.assertIs(actual_output['Metadata']['AnotherKey'], template_dict['Metadata']['AnotherKey'])
+
+    def test_strip_app_metadata_preserves_order(self):
+        template_dict = OrderedDict([
+            ('Resources', {}),
+            ('Metadata', OrderedDict([('B', {}), ('AWS::ServerlessRepo::Application', {}), ('A', {})])),
+            ('Outputs', {})
+        ])
+        actual_output = parser.strip_app_metadata(template_dict)
+        self.assertEqual(list(actual_output), ['Resources', 'Metadata', 'Outputs'])
+        self.assertEqual(list(actual_output['Metadata']), ['B', 'A'])
+        self.assertEqual(len(template_dict['Metadata']), 3)
+
+
+class TestSplitAppMetadata(TestCase):
+
+    def test_split_app_metadata_keeps_rest_of_template(self):
+        template = (
+            "Transform: AWS::Serverless-2016-10-31  # comment\n"
+            "Metadata:\n"
+            "  AWS::ServerlessRepo::Application:\n"
+            "    Name: name\n"
+            "    Labels: [a, b]\n"
+            "    ReadmeUrl: !Ref Readme\n"
+            "  AnotherKey: {}\n"
+            "Resources:\n"
+            "    Key1: !GetAtt Another.Arn\n"
+        )
+        app_metadata, stripped_template = parser.split_app_metadata(template)
+        expected_metadata = ApplicationMetadata({'Name': 'name', 'Labels': ['a', 'b'], 'ReadmeUrl': {'Ref': 'Readme'}})
+        self.assertEqual(app_metadata, expected_metadata)
+        self.assertEqual(stripped_template, (
+            "Transform: AWS::Serverless-2016-10-31  # comment\n"
+            "Metadata:\n"
+            "  AnotherKey: {}\n"
+            "Resources:\n"
+            "    Key1: !GetAtt Another.Arn\n"
+        ))
+
+    def test_split_app_metadata_strips_metadata_with_only_app_metadata(self):
+        template = (
+            "Resources:\r\n"
+            "  Key1: {}\r\n"
+            "Metadata:\r\n"
+            "  AWS::ServerlessRepo::Application:\r\n"
+            "    Name: name"
+        )
+        app_metadata, stripped_template = parser.split_app_metadata(template)
+        self.assertEqual(app_metadata, ApplicationMetadata({'Name': 'name'}))
+        self.assertEqual(stripped_template, "Resources:\r\n  Key1: {}\r\n")
+
+    def test_split_app_metadata_last_key_of_metadata(self):
+        template = (
+            "Metadata:\n"
+            "  AnotherKey: 1\n"
+            "  AWS::ServerlessRepo::Application: {Name: name}\n"
+            "Resources: {}\n"
+        )
+        app_metadata, stripped_template = parser.split_app_metadata(template)
+        self.assertEqual(app_metadata, ApplicationMetadata({'Name': 'name'}))
+        self.assertEqual(stripped_template, "Metadata:\n  AnotherKey: 1\nResources: {}\n")
+
+    def test_split_app_metadata_with_block_scalar_and_comments(self):
+        template = (
+            "Metadata:\n"
+            "  # application metadata\n"
+            "  AWS::ServerlessRepo::Application:\n"
+            "    ReadmeBody: |\n"
+            "      hello\n"
+            "\n"
+            "  # comment about AnotherKey\n"
+            "  AnotherKey: 1\n"
+            "Resources: {}\n"
+        )
+        app_metadata, stripped_template = parser.split_app_metadata(template)
+        self.assertEqual(app_metadata, ApplicationMetadata({'ReadmeBody': 'hello\n'}))
+        self.assertEqual(stripped_template, (
+            "Metadata:\n"
+            "  # application metadata\n"
+            "  # comment about AnotherKey\n"
+            "  AnotherKey: 1\n"
+            "Resources: {}\n"
+        ))
+
+    def test_split_app_metadata_unsupported_templates(self):
+        templates = [
+            # JSON and flow style
+            '{"Metadata": {"AWS::ServerlessRepo::Application": {"Name": "name"}}}',
+            "Metadata: {AWS::ServerlessRepo::Application: {Name: name}}\nResources: {}\n",
+            # missing metadata
+            "Resources: {}\n",
+            "Metadata:\n  AnotherKey: 1\nResources: {}\n",
+            # anchors may be referenced by the rest of the template
+            "Metadata:\n  AWS::ServerlessRepo::Application: &app\n    Name: name\nResources: *app\n",
+            "Metadata: &metadata\n  AWS::ServerlessRepo::Application:\n    Name: name\nResources: *metadata\n",
+            # nothing left after stripping
+            "Metadata:\n  AWS::ServerlessRepo::Application:\n    Name: name\n",
+            # invalid YAML
+            "Resources: [\n",
+            "Metadata:\n  AWS::ServerlessRepo::Application:\n    Name: name\nResources:\n  Foo: {Type: [\n",
+            "",
+            # multiple documents, which parse_template rejects
+            "Metadata:\n  AWS::ServerlessRepo::Application:\n    Name: name\nResources: {}\n---\nfoo: bar\n",
+            "Resources: {}\n---\nMetadata:\n  AWS::ServerlessRepo::Application:\n    Name: name\n",
+            # byte strings, whose marks are character offsets
+            u"Description: caf\xe9\nMetadata:\n  AWS::ServerlessRepo::Application:\n    Name: name\n"
+            u"Resources: {}\n".encode('utf-8')
+        ]
+        for template in templates:
+            self.assertIsNone(parser.split_app_metadata(template), template)
+
+    def test_split_app_metadata_with_explicit_document_start(self):
+        template = (
+            "# comment\n"
+            "%YAML 1.1\n"
+            "--- # start\n"
+            "Metadata:\n"
+            "  AWS::ServerlessRepo::Application:\n"
+            "    Name: name\n"
+            "Resources:\n"
+            "  Key1: '---'\n"
+        )
+        app_metadata, stripped_template = parser.split_app_metadata(template)
+        self.assertEqual(app_metadata, ApplicationMetadata({'Name': 'name'}))
+        self.assertEqual(stripped_template, "# comment\n%YAML 1.1\n--- # start\nResources:\n  Key1: '---'\n")
+
+    def test_split_app_metadata_matches_parsed_template(self):
+        template = """
+        Metadata:
+            AWS::ServerlessRepo::Application:
+                Name: name
+                Description: !Sub "${AWS::Region}"
+            AnotherKey: 1
+        Resources:
+            Key1: !Ref Something
+        """
+        app_metadata, stripped_template = parser.split_app_metadata(template)
+        template_dict = parser.parse_template(template)
+        self.assertEqual(app_metadata, parser.get_app_metadata(template_dict))
+        self.assertEqual(parser.parse_template(stripped_template), parser.strip_app_metadata(template_dict))
+
+
+class TestExtractAppMetadata(TestCase):
+
+    def test_extract_app_metadata(self):
+        template = (
+            "Metadata:\n"
+            "  AWS::ServerlessRepo::Application:\n"
+            "    Name: name\n"
+            "Resources:\n"
+            "  Key1: !Ref Something\n"
+        )
+        self.assertEqual(parser.extract_app_metadata(template), ApplicationMetadata({'Name': 'name'}))
+
+    @patch('serverlessrepo.parser.SamLoader.construct_document')
+    def test_extract_app_metadata_only_constructs_app_metadata(self, construct_document_mock):
+        construct_document_mock.return_value = {'AWS::ServerlessRepo::Application': {'Name': 'name'}}
+        template = (
+            "Resources:\n"
+            "  Key1: !Ref Something\n"
+            "Metadata:\n"
+            "  AWS::ServerlessRepo::Application:\n"
+            "    Name: name\n"
+        )
+        parser.extract_app_metadata(template)
+        construct_document_mock.assert_called_once()
+        app_metadata_node = construct_document_mock.call_args[0][0]
+        self.assertEqual([key.value for key, _ in app_metadata_node.value], ['AWS::ServerlessRepo::Application'])
+
+    def test_extract_app_metadata_return_none_for_json(self):
+        template = '{"Metadata": {"AWS::ServerlessRepo::Application": {"Name": "name"}}}'
+        self.assertIsNone(parser.extract_app_metadata(template))
+
+
+class TestTemplateCache(TestCase):
+
+    def setUp(self):
+        self.cache = parser.TemplateCache(max_size=2)
+
+    def test_get_template_digest(self):
+        self.assertEqual(parser.get_template_digest(u'a: b'), parser.get_template_digest(u'a: b'))
+        self.assertNotEqual(parser.get_template_digest(u'a: b'), parser.get_template_digest(u'a: c'))
+
+    def test_get_template_digest_of_byte_string(self):
+        # Python 2 str templates are byte strings, which may contain any UTF-8 text
+        template = u'Description: caf\xe9'
+        self.assertEqual(parser.get_template_digest(template.encode('utf-8')), parser.get_template_digest(template))
+
+    def test_get_missing_template(self):
+        self.assertIsNone(self.cache.get('digest', parser.TemplateCache.APP_METADATA))
+        self.assertIsNone(self.cache.get_prepared('digest'))
+
+    def test_put_merges_values(self):
+        app_metadata = ApplicationMetadata({'Name': 'name'})
+        self.cache.put('digest', app_metadata=app_metadata)
+        self.assertIsNone(self.cache.get_prepared('digest'))
+
+        self.cache.put('digest', stripped_template='Resources: {}\n')
+        self.assertEqual(self.cache.get_prepared('digest'), (app_metadata, 'Resources: {}\n'))
+
+    def test_app_metadata_is_copied(self):
+        app_metadata = ApplicationMetadata({'Name': 'name', 'Labels': ['l1']})
+        self.cache.put_prepared('digest', app_metadata, 'Resources: {}\n')
+        app_metadata.labels.append('changed')
+        self.cache.get('digest', parser.TemplateCache.APP_METADATA).name = 'changed'
+        self.cache.get('digest', parser.TemplateCache.APP_METADATA).template_dict['Labels'].append('changed')
+        self.cache.get_prepared('digest')[0].labels.append('changed')
+
+        expected = ApplicationMetadata({'Name': 'name', 'Labels': ['l1']})
+        self.assertEqual(self.cache.get('digest', parser.TemplateCache.APP_METADATA), expected)
+        self.assertEqual(self.cache.get_prepared('digest')[0], expected)
+
+    def test_get_prepared_reads_one_entry(self):
+        self.cache.put_prepared('digest', ApplicationMetadata({'Name': 'name'}), 'Resources: {}\n')
+        with patch.object(self.cache, '_lock') as lock_mock:
+            self.cache.get_prepared('digest')
+
+        # Another thread can't evict the entry between reading the metadata and the template
+        lock_mock.__enter__.assert_called_once_with()
+
+    def test_evicts_least_recently_used_template(self):
+        self.cache.put('a', stripped_template='a')
+        self.cache.put('b', stripped_template='b')
+        self.cache.get('a', parser.TemplateCache.STRIPPED_TEMPLATE)
+        self.cache.put('c', stripped_template='c')
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.get('a', parser.TemplateCache.STRIPPED_TEMPLATE), 'a')
+        self.assertIsNone(self.cache.get('b', parser.TemplateCache.STRIPPED_TEMPLATE))
+        self.assertEqual(self.cache.get('c', parser.TemplateCache.STRIPPED_TEMPLATE), 'c')
+
+    def test_clear(self):
+        self.cache.put('a', stripped_template='a')
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(parser.get_template_cache())
@@ -1,6 +1,8 @@
 from unittest import TestCase
 from mock import Mock, patch
 
+from botocore.exceptions import ClientError
+
 import serverlessrepo.permission_helper as permission_helper
 from serverlessrepo.application_policy import ApplicationPolicy
 from serverlessrepo.exceptions import InvalidApplicationPolicyError
@@ -9,11 +11,11 @@ from serverlessrepo.exceptions import InvalidApplicationPolicyError
 class TestPermissionHelper(TestCase):
 
     def setUp(self):
-        patcher = patch('serverlessrepo.permission_helper.boto3')
+        patcher = patch('serverlessrepo.permission_helper.get_client')
         self.addCleanup(patcher.stop)
-        self.boto3_mock = patcher.start()
+        self.get_client_mock = patcher.start()
         self.serverlessrepo_mock = Mock()
-        self.boto3_mock.client.return_value = self.serverlessrepo_mock
+        self.get_client_mock.return_value = self.serverlessrepo_mock
         self.application_id = 'arn:aws:serverlessrepo:us-east-1:123456789012:applications/test-app'
         self.account_ids = ['123456789012']
 
@@ -107,3 +109,242 @@ class TestPermissionHelper(TestCase):
         # the self initiated boto3 client shouldn't be used
         self.serverlessrepo_mock.put_application_policy.assert_not_called()
         sar_client.put_application_policy.assert_called_once()
+
+
+class TestBulkPermissionHelper(TestCase):
+
+    def setUp(self):
+        patcher = patch('serverlessrepo.permission_helper.get_client')
+        self.addCleanup(patcher.stop)
+        self.get_client_mock = patcher.start()
+        self.serverlessrepo_mock = Mock()
+        self.get_client_mock.return_value = self.serverlessrepo_mock
+        self.application_ids = [
+            'arn:aws:serverlessrepo:us-east-1:123456789012:applications/test-app-1',
+            'arn:aws:serverlessrepo:us-east-1:123456789012:applications/test-app-2'
+        ]
+        self.account_ids = ['123456789012']
+
+    def assert_policies_put(self, statements):
+        self.assertEqual(self.serverlessrepo_mock.put_application_policy.call_count, len(self.application_ids))
+        for application_id in self.application_ids:
+            self.serverlessrepo_mock.put_application_policy.assert_any_call(
+                ApplicationId=application_id,
+                Statements=statements
+            )
+
+    def test_make_applications_public_succeeded(self):
+        self.serverlessrepo_mock.put_application_policy.return_value = {'Statements': []}
+        result = permission_helper.make_applications_public(self.application_ids)
+        self.assert_policies_put([{'Principals': ['*'], 'Actions': [ApplicationPolicy.DEPLOY]}])
+        self.assertEqual(list(result), self.application_ids)
+        self.assertEqual(result[self.application_ids[0]], {'result': True, 'error': None})
+
+    def test_make_applications_private_succeeded(self):
+        permission_helper.make_applications_private(self.application_ids)
+        self.assert_policies_put([])
+
+    def test_share_applications_with_accounts_succeeded(self):
+        permission_helper.share_applications_with_accounts(self.application_ids + self.application_ids[:1],
+                                                           self.account_ids, max_workers=20)
+        # duplicate application ids are only updated once
+        self.assert_policies_put([{'Principals': self.account_ids, 'Actions': [ApplicationPolicy.DEPLOY]}])
+        self.get_client_mock.assert_called_once_with(max_pool_connections=20)
+
+    @patch('serverlessrepo.permission_helper.ApplicationPolicy.validate')
+    def test_share_applications_with_accounts_validates_policy_once(self, validate_mock):
+        permission_helper.share_applications_with_accounts(self.application_ids, self.account_ids)
+        validate_mock.assert_called_once()
+
+    def test_failure_does_not_stop_other_applications(self):
+        error = ClientError({'Error': {'Code': 'NotFoundException', 'Message': 'Random'}}, 'put_application_policy')
+        self.serverlessrepo_mock.put_application_policy.side_effect = \
+            lambda ApplicationId, Statements: _raise(error) if ApplicationId == self.application_ids[0] else {}
+
+        result = permission_helper.make_applications_private(self.application_ids)
+        self.assertEqual(result[self.application_ids[0]], {'result': None, 'error': error})
+        self.assertEqual(result[self.application_ids[1]], {'result': True, 'error': None})
+
+    def test_share_applications_with_accounts_exception_with_invalid_account_ids(self):
+        with self.assertRaises(InvalidApplicationPolicyError):
+            permission_helper.share_applications_with_accounts(self.application_ids, ['123'])
+        self.serverlessrepo_mock.put_application_policy.assert_not_called()
+
+    def test_exception_with_empty_application_ids(self):
+        with self.assertRaises(ValueError):
+            permission_helper.make_applications_public([])
+        with self.assertRaises(ValueError):
+            permission_helper.make_applications_private([])
+        with self.assertRaises(ValueError):
+            permission_helper.share_applications_with_accounts([], self.account_ids)
+        with self.assertRaises(ValueError):
+            permission_helper.share_applications_with_accounts(self.application_ids, [])
+
+    def test_with_passed_in_sar_client(self):
+        sar_client = Mock()
+        permission_helper.make_applications_public(self.application_ids, sar_client)
+        self.assertEqual(sar_client.put_application_policy.call_count, 2)
+        self.get_client_mock.assert_not_called()
+
+    def test_ensure_skips_applications_in_snapshot_with_same_policy(self):
+        self.serverlessrepo_mock.get_application_policy.return_value = {'Statements': []}
+        policy_snapshot = {
+            self.application_ids[0]: [{'StatementId': 'abc', 'Principals': self.account_ids, 'Actions': ['Deploy']}]
+        }
+        result = permission_helper.share_applications_with_accounts(
+            self.application_ids, self.account_ids, ensure=True, policy_snapshot=policy_snapshot)
+
+        self.assertEqual(result[self.application_ids[0]], {'result': False, 'error': None})
+        self.assertEqual(result[self.application_ids[1]], {'result': True, 'error': None})
+        # only the application missing from the snapshot is fetched
+        self.serverlessrepo_mock.get_application_policy.assert_called_once_with(
+            ApplicationId=self.application_ids[1])
+        self.serverlessrepo_mock.put_application_policy.assert_called_once_with(
+            ApplicationId=self.application_ids[1],
+            Statements=[{'Principals': self.account_ids, 'Actions': [ApplicationPolicy.DEPLOY]}]
+        )
+        # the snapshot reflects the policy written
+        self.assertEqual(policy_snapshot[self.application_ids[1]],
+                         [{'Principals': self.account_ids, 'Actions': [ApplicationPolicy.DEPLOY]}])
+
+    def test_ensure_reuses_snapshot_across_calls(self):
+        self.serverlessrepo_mock.get_application_policy.return_value = {'Statements': []}
+        policy_snapshot = {}
+        permission_helper.make_applications_public(self.application_ids, ensure=True, policy_snapshot=policy_snapshot)
+        result = permission_helper.make_applications_public(self.application_ids, ensure=True,
+                                                            policy_snapshot=policy_snapshot)
+
+        self.assertEqual([output['result'] for output in result.values()], [False, False])
+        self.assertEqual(self.serverlessrepo_mock.get_application_policy.call_count, 2)
+        self.assertEqual(self.serverlessrepo_mock.put_application_policy.call_count, 2)
+
+
+class TestEnsureApplicationPolicy(TestCase):
+
+    def setUp(self):
+        self.serverlessrepo_mock = Mock()
+        self.application_id = 'arn:aws:serverlessrepo:us-east-1:123456789012:applications/test-app'
+
+    def test_ensure_skips_put_when_policy_matches(self):
+        self.serverlessrepo_mock.get_application_policy.return_value = {
+            'Statements': [{
+                'StatementId': 'abc',
+                'Principals': ['123456789013', '123456789012'],
+                'Actions': ['Deploy']
+            }]
+        }
+        changed = permission_helper.share_application_with_accounts(
+            self.application_id, ['123456789012', '123456789013', '123456789012'], self.serverlessrepo_mock,
+            ensure=True)
+
+        self.assertFalse(changed)
+        self.serverlessrepo_mock.get_application_policy.assert_called_once_with(ApplicationId=self.application_id)
+        self.serverlessrepo_mock.put_application_policy.assert_not_called()
+
+    def test_ensure_puts_when_policy_differs(self):
+        self.serverlessrepo_mock.get_application_policy.return_value = {
+            'Statements': [{'Principals': ['*'], 'Actions': ['Deploy']}]
+        }
+        changed = permission_helper.make_application_private(self.application_id, self.serverlessrepo_mock,
+                                                             ensure=True)
+
+        self.assertTrue(changed)
+        self.serverlessrepo_mock.put_application_policy.assert_called_once_with(
+            ApplicationId=self.application_id,
+            Statements=[]
+        )
+
+    def test_ensure_skips_put_when_no_policy_and_private(self):
+        self.serverlessrepo_mock.get_application_policy.return_value = {}
+        changed = permission_helper.make_application_private(self.application_id, self.serverlessrepo_mock,
+                                                             ensure=True)
+
+        self.assertFalse(changed)
+        self.serverlessrepo_mock.put_application_policy.assert_not_called()
+
+    def test_without_ensure_always_puts(self):
+        changed = permission_helper.make_application_public(self.application_id, self.serverlessrepo_mock)
+
+        self.assertTrue(changed)
+        self.serverlessrepo_mock.get_application_policy.assert_not_called()
+        self.serverlessrepo_mock.put_application_policy.assert_called_once()
+
+    def test_ensure_ignores_order_and_statement_ids(self):
+        self.serverlessrepo_mock.get_application_policy.side_effect = [
+            {'Statements': [{'StatementId': 'a', 'Principals': ['123456789013', '123456789012'],
+                             'Actions': ['Deploy']}]},
+            {'Statements': [{'StatementId': 'b', 'Principals': ['*'], 'Actions': ['Deploy']},
+                            {'StatementId': 'a', 'Principals': ['123456789012', '123456789013'],
+                             'Actions': ['Deploy']}]}
+        ]
+        account_ids = ['123456789012', '123456789013']
+        unchanged = permission_helper.share_application_with_accounts(
+            self.application_id, account_ids, self.serverlessrepo_mock, ensure=True)
+        changed = permission_helper.share_application_with_accounts(
+            self.application_id, account_ids, self.serverlessrepo_mock, ensure=True)
+
+        self.assertFalse(unchanged)
+        # an extra statement makes the policies differ
+        self.assertTrue(changed)
+        self.serverlessrepo_mock.put_application_policy.assert_called_once()
+
+
+class TestIncrementalPermissionHelper(TestCase):
+
+    def setUp(self):
+        self.serverlessrepo_mock = Mock()
+        self.application_id = 'arn:aws:serverlessrepo:us-east-1:123456789012:applications/test-app'
+        self.serverlessrepo_mock.get_application_policy.return_value = {
+            'Statements': [{'StatementId': 'abc', 'Principals': ['123456789013'], 'Actions': ['Deploy']}]
+        }
+
+    def test_add_accounts_to_application(self):
+        changed = permission_helper.add_accounts_to_application(
+            self.application_id, ['123456789012'], self.serverlessrepo_mock)
+
+        self.assertTrue(changed)
+        self.serverlessrepo_mock.put_application_policy.assert_called_once_with(
+            ApplicationId=self.application_id,
+            Statements=[{'Principals': ['123456789012', '123456789013'], 'Actions': ['Deploy']}]
+        )
+
+    def test_add_accounts_to_application_already_shared(self):
+        changed = permission_helper.add_accounts_to_application(
+            self.application_id, ['123456789013'], self.serverlessrepo_mock)
+
+        self.assertFalse(changed)
+        self.serverlessrepo_mock.put_application_policy.assert_not_called()
+
+    def test_remove_accounts_from_application(self):
+        changed = permission_helper.remove_accounts_from_application(
+            self.application_id, ['123456789013'], self.serverlessrepo_mock)
+
+        self.assertTrue(changed)
+        self.serverlessrepo_mock.put_application_policy.assert_called_once_with(
+            ApplicationId=self.application_id,
+            Statements=[]
+        )
+
+    def test_remove_accounts_from_application_not_shared(self):
+        changed = permission_helper.remove_accounts_from_application(
+            self.application_id, ['123456789012'], self.serverlessrepo_mock)
+
+        self.assertFalse(changed)
+        self.serverlessrepo_mock.put_application_policy.assert_not_called()
+
+    def test_exception_with_empty_account_ids(self):
+        with self.assertRaises(ValueError):
+            permission_helper.add_accounts_to_application(self.application_id, [], self.serverlessrepo_mock)
+        with self.assertRaises(ValueError):
+            permission_helper.remove_accounts_from_application(self.application_id, [], self.serverlessrepo_mock)
+
+    @patch('serverlessrepo.permission_helper.get_client')
+    def test_uses_shared_client_when_not_passed_in(self, get_client_mock):
+        get_client_mock.return_value = self.serverlessrepo_mock
+        permission_helper.add_accounts_to_application(self.application_id, ['123456789012'])
+        get_client_mock.assert_called_once_with()
+        self.serverlessrepo_mock.put_application_policy.assert_called_once()
+
+
+def _raise(error):
+    raise error
@@ -1,17 +1,32 @@
 import json
 from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
 from mock import patch, Mock
 
+import yaml
 from botocore.exceptions import ClientError
 
-from serverlessrepo import publish_application, update_application_metadata
+from serverlessrepo import (
+    publish_application,
+    publish_applications,
+    publish_application_to_regions,
+    prepare_template,
+    prepare_templates,
+    publish_prepared_applications,
+    update_application_metadata
+)
+from serverlessrepo.application_cache import ApplicationCache
 from serverlessrepo.exceptions import (
     InvalidApplicationMetadataError,
+    ApplicationMetadataNotFoundError,
     S3PermissionsRequired,
     InvalidS3UriError,
     ServerlessRepoClientError
 )
-from serverlessrepo.parser import get_app_metadata, strip_app_metadata, yaml_dump
+from serverlessrepo.parser import (
+    get_app_metadata, strip_app_metadata, yaml_dump, set_template_cache, TemplateCache
+)
+from serverlessrepo.publish_result import PublishResult
 from serverlessrepo.publish import (
     CREATE_APPLICATION,
     UPDATE_APPLICATION,
@@ -19,14 +34,14 @@ from serverlessrepo.publish import (
 )
 
 
-class TestPublishApplication(TestCase):
+class PublishApplicationTestCase(TestCase):
 
     def setUp(self):
-        patcher = patch('serverlessrepo.publish.boto3')
+        patcher = patch('serverlessrepo.publish.get_client')
         self.addCleanup(patcher.stop)
-        self.boto3_mock = patcher.start()
+        self.get_client_mock = patcher.start()
         self.serverlessrepo_mock = Mock()
-        self.boto3_mock.client.return_value = self.serverlessrepo_mock
+        self.get_client_mock.return_value = self.serverlessrepo_mock
         self.template = """
         {
             "Metadata": {
@@ -85,6 +100,9 @@ class TestPublishApplication(TestCase):
             'create_application'
         )
 
+
+class TestPublishApplication(PublishApplicationTestCase):
+
     def test_publish_raise_value_error_for_empty_template(self):
         with self.assertRaises(ValueError) as context:
             publish_application('')
@@ -112,14 +130,19 @@ class TestPublishApplication(TestCase):
         publish_application(self.template)
         parse_template_mock.assert_called_with(self.template)
 
-    @patch('serverlessrepo.publish.copy.deepcopy')
-    def test_publish_template_dict_should_copy_template(self, copy_mock):
+    def test_publish_template_dict_should_not_modify_template(self):
         self.serverlessrepo_mock.create_application.return_value = {
             'ApplicationId': self.application_id
         }
-        copy_mock.return_value = self.template_dict
-        publish_application(self.template_dict)
-        copy_mock.assert_called_with(self.template_dict)
+        template_dict = json.loads(self.template)
+        publish_application(template_dict)
+        self.assertEqual(template_dict, self.template_dict)
+
+        expected_request = dict(
+            {'TemplateBody': self.yaml_template_without_metadata},
+            **get_app_metadata(self.template_dict).template_dict
+        )
+        self.serverlessrepo_mock.create_application.assert_called_once_with(**expected_request)
 
     def test_publish_new_application_should_create_application(self):
         self.serverlessrepo_mock.create_application.return_value = {
@@ -311,6 +334,27 @@ class TestPublishApplication(TestCase):
         self.serverlessrepo_mock.update_application.assert_not_called()
         self.serverlessrepo_mock.create_application_version.assert_not_called()
 
+    def test_publish_yaml_template_should_keep_template_formatting(self):
+        self.serverlessrepo_mock.create_application.return_value = {
+            'ApplicationId': self.application_id
+        }
+        template = (
+            "Metadata:\n"
+            "  AWS::ServerlessRepo::Application:\n"
+            "    Name: test-app\n"
+            "    Description: hello world\n"
+            "    Author: abc\n"
+            "# resources are kept as written\n"
+            "Resources: { Key1: !Ref Key2 }\n"
+        )
+        publish_application(template)
+        self.serverlessrepo_mock.create_application.assert_called_once_with(
+            Name='test-app',
+            Description='hello world',
+            Author='abc',
+            TemplateBody="# resources are kept as written\nResources: { Key1: !Ref Key2 }\n"
+        )
+
     def test_create_application_with_licensebody(self):
         self.serverlessrepo_mock.create_application.return_value = {
             'ApplicationId': self.application_id
@@ -355,13 +399,464 @@ class TestPublishApplication(TestCase):
         self.assertEqual(expected_result, actual_result)
 
 
+class TestPublishApplicationParallelVersion(PublishApplicationTestCase):
+
+    def test_publish_parallel_version_should_update_and_create_application_version(self):
+        self.serverlessrepo_mock.create_application.side_effect = self.application_exists_error
+
+        actual_result = publish_application(self.template, parallel_version=True)
+        self.assertEqual(actual_result, publish_application(self.template))
+
+        self.assertEqual(self.serverlessrepo_mock.update_application.call_count, 2)
+        self.assertEqual(self.serverlessrepo_mock.create_application_version.call_count, 2)
+        self.assertEqual(self.serverlessrepo_mock.create_application_version.call_args_list[0],
+                         self.serverlessrepo_mock.create_application_version.call_args_list[1])
+
+    def test_publish_parallel_version_should_ignore_existing_version(self):
+        self.serverlessrepo_mock.create_application.side_effect = self.application_exists_error
+        self.serverlessrepo_mock.create_application_version.side_effect = ClientError(
+            {'Error': {'Code': 'ConflictException', 'Message': 'Random'}}, 'create_application_version')
+
+        actual_result = publish_application(self.template, parallel_version=True)
+        self.assertEqual(actual_result['actions'], [UPDATE_APPLICATION])
+
+    def test_publish_parallel_version_raise_update_application_error(self):
+        self.serverlessrepo_mock.create_application.side_effect = self.application_exists_error
+        self.serverlessrepo_mock.update_application.side_effect = self.not_conflict_exception
+
+        with self.assertRaises(ServerlessRepoClientError) as context:
+            publish_application(self.template, parallel_version=True)
+        # the version request was already sent, and the version was created
+        self.serverlessrepo_mock.create_application_version.assert_called_once()
+        self.assertEqual(context.exception.actions, [CREATE_APPLICATION_VERSION])
+        self.assertIsNone(context.exception.version_error)
+
+    def test_publish_parallel_version_raise_both_errors(self):
+        self.serverlessrepo_mock.create_application.side_effect = self.application_exists_error
+        self.serverlessrepo_mock.update_application.side_effect = self.not_conflict_exception
+        self.serverlessrepo_mock.create_application_version.side_effect = self.s3_denied_exception
+
+        with self.assertRaises(ServerlessRepoClientError) as context:
+            publish_application(self.template, parallel_version=True)
+        self.assertEqual(context.exception.actions, [])
+        self.assertIs(context.exception.version_error, self.s3_denied_exception)
+
+    def test_publish_parallel_version_raise_create_application_version_error(self):
+        self.serverlessrepo_mock.create_application.side_effect = self.application_exists_error
+        self.serverlessrepo_mock.create_application_version.side_effect = self.s3_denied_exception
+
+        with self.assertRaises(S3PermissionsRequired):
+            publish_application(self.template, parallel_version=True)
+
+    @patch('serverlessrepo.publish.get_shared_executor')
+    def test_publish_parallel_version_reuses_shared_executor(self, get_shared_executor_mock):
+        self.serverlessrepo_mock.create_application.side_effect = self.application_exists_error
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        get_shared_executor_mock.return_value = executor
+
+        publish_application(self.template, parallel_version=True)
+        publish_application(self.template, parallel_version=True)
+
+        self.assertEqual(get_shared_executor_mock.call_count, 2)
+        self.assertEqual(self.serverlessrepo_mock.create_application_version.call_count, 2)
+
+    def test_publish_parallel_version_rich_result(self):
+        self.serverlessrepo_mock.create_application.side_effect = self.application_exists_error
+
+        actual_result = publish_application(self.template, rich_result=True, parallel_version=True)
+        self.assertEqual(actual_result.sar_calls, 3)
+        self.assertEqual(actual_result.actions, [UPDATE_APPLICATION, CREATE_APPLICATION_VERSION])
+
+
+class TestPublishApplicationRichResult(PublishApplicationTestCase):
+
+    def test_publish_rich_result_new_application(self):
+        self.serverlessrepo_mock.create_application.return_value = {
+            'ApplicationId': self.application_id
+        }
+        actual_result = publish_application(self.template, rich_result=True)
+
+        self.assertIsInstance(actual_result, PublishResult)
+        self.assertEqual(actual_result.application_id, self.application_id)
+        self.assertEqual(actual_result.actions, [CREATE_APPLICATION])
+        self.assertEqual(actual_result.sar_calls, 1)
+        self.assertEqual(actual_result.template_bytes, len(self.yaml_template_without_metadata))
+        self.assertFalse(actual_result.conflict)
+        self.assertEqual(list(actual_result.call_timings), ['create_application'])
+        self.assertGreaterEqual(actual_result.duration, actual_result.call_timings['create_application'])
+        self.assertEqual(actual_result.to_dict(), publish_application(self.template))
+
+    def test_publish_rich_result_existing_application(self):
+        self.serverlessrepo_mock.create_application.side_effect = self.application_exists_error
+        actual_result = publish_application(self.template, rich_result=True)
+
+        self.assertEqual(actual_result.actions, [UPDATE_APPLICATION, CREATE_APPLICATION_VERSION])
+        self.assertTrue(actual_result.conflict)
+        self.assertEqual(actual_result.sar_calls, 3)
+        # the template is sent with both create_application and create_application_version
+        self.assertEqual(actual_result.template_bytes, 2 * len(self.yaml_template_without_metadata))
+        self.assertEqual(set(actual_result.call_timings),
+                         {'create_application', 'update_application', 'create_application_version'})
+
+    def test_publish_rich_result_unchanged_application(self):
+        self.serverlessrepo_mock.create_application.return_value = {
+            'ApplicationId': self.application_id
+        }
+        application_cache = ApplicationCache()
+        publish_application(self.template, application_cache=application_cache)
+        actual_result = publish_application(self.template, application_cache=application_cache, rich_result=True)
+
+        self.assertEqual(actual_result.actions, [])
+        self.assertEqual(actual_result.sar_calls, 0)
+        self.assertEqual(actual_result.template_bytes, 0)
+
+
+class TestPublishApplicationWithCaches(PublishApplicationTestCase):
+
+    def test_publish_cached_application_should_skip_create_application(self):
+        application_cache = ApplicationCache()
+        application_cache.put('test-app', self.application_id)
+
+        actual_result = publish_application(self.template, application_cache=application_cache)
+        self.assertEqual(actual_result['application_id'], self.application_id)
+        self.assertEqual(actual_result['actions'], [UPDATE_APPLICATION, CREATE_APPLICATION_VERSION])
+
+        self.serverlessrepo_mock.create_application.assert_not_called()
+        self.serverlessrepo_mock.update_application.assert_called_once()
+        self.serverlessrepo_mock.create_application_version.assert_called_once()
+
+    def test_publish_cached_application_raise_metadata_error_for_invalid_create_application_request(self):
+        application_cache = ApplicationCache()
+        application_cache.put('test-app', self.application_id)
+        template_without_author = self.template.replace('"Author": "abc",', '')
+        with self.assertRaises(InvalidApplicationMetadataError) as context:
+            publish_application(template_without_author, application_cache=application_cache)
+
+        message = str(context.exception)
+        self.assertEqual("Invalid application metadata: 'author properties not provided'", message)
+        self.serverlessrepo_mock.update_application.assert_not_called()
+        self.serverlessrepo_mock.create_application_version.assert_not_called()
+
+    def test_template_cache_entry_not_changed_by_publish_details(self):
+        self.serverlessrepo_mock.create_application.return_value = {
+            'ApplicationId': self.application_id
+        }
+        set_template_cache(TemplateCache())
+        publish_application(self.template)['details']['Labels'].append('INJECTED')
+        publish_application(self.template)
+
+        _, kwargs = self.serverlessrepo_mock.create_application.call_args
+        self.assertEqual(kwargs['Labels'], ['test1', 'test2'])
+
+    def test_publish_cached_application_raise_parse_error_for_malformed_template(self):
+        application_cache = ApplicationCache()
+        application_cache.put('test-app', self.application_id)
+        template = (
+            "Metadata:\n"
+            "  AWS::ServerlessRepo::Application:\n"
+            "    Name: test-app\n"
+            "    Description: hello world\n"
+            "    Author: abc\n"
+            "    SemanticVersion: 1.0.0\n"
+            "Resources:\n"
+            "  Foo: {Type: [\n"
+        )
+        with self.assertRaises(yaml.YAMLError):
+            publish_application(template, application_cache=application_cache)
+        with self.assertRaises(yaml.YAMLError):
+            update_application_metadata(template, self.application_id)
+
+        # The template is rejected before any call to SAR
+        self.serverlessrepo_mock.update_application.assert_not_called()
+        self.serverlessrepo_mock.create_application_version.assert_not_called()
+
+    def test_publish_stale_cached_application_should_fall_back_to_create_application(self):
+        application_cache = ApplicationCache()
+        application_cache.put('test-app', 'arn:aws:serverlessrepo:us-east-1:123456789012:applications/deleted')
+        self.serverlessrepo_mock.update_application.side_effect = [
+            ClientError({'Error': {'Code': 'NotFoundException', 'Message': 'Random'}}, 'update_application'),
+            None
+        ]
+        self.serverlessrepo_mock.create_application.side_effect = self.application_exists_error
+
+        actual_result = publish_application(self.template, application_cache=application_cache)
+        self.assertEqual(actual_result['application_id'], self.application_id)
+        self.assertEqual(actual_result['actions'], [UPDATE_APPLICATION, CREATE_APPLICATION_VERSION])
+        self.serverlessrepo_mock.create_application.assert_called_once()
+        self.assertEqual(self.serverlessrepo_mock.update_application.call_count, 2)
+        self.assertEqual(application_cache.get('test-app'), self.application_id)
+
+    def test_publish_cached_application_raise_client_error(self):
+        application_cache = ApplicationCache()
+        application_cache.put('test-app', self.application_id)
+        self.serverlessrepo_mock.update_application.side_effect = self.not_conflict_exception
+
+        with self.assertRaises(ServerlessRepoClientError):
+            publish_application(self.template, application_cache=application_cache)
+
+        self.serverlessrepo_mock.create_application.assert_not_called()
+        self.assertEqual(application_cache.get('test-app'), self.application_id)
+
+    def test_publish_new_application_should_cache_application_id(self):
+        self.serverlessrepo_mock.create_application.return_value = {
+            'ApplicationId': self.application_id
+        }
+        application_cache = ApplicationCache()
+
+        publish_application(self.template, application_cache=application_cache)
+        self.assertEqual(application_cache.get('test-app'), self.application_id)
+
+    def test_republish_unchanged_application_should_skip_sar_calls(self):
+        self.serverlessrepo_mock.create_application.return_value = {
+            'ApplicationId': self.application_id
+        }
+        application_cache = ApplicationCache()
+        publish_application(self.template, application_cache=application_cache)
+
+        actual_result = publish_application(self.template, application_cache=application_cache)
+        expected_result = {
+            'application_id': self.application_id,
+            'actions': [],
+            'details': {}
+        }
+        self.assertEqual(expected_result, actual_result)
+        self.serverlessrepo_mock.create_application.assert_called_once()
+        self.serverlessrepo_mock.update_application.assert_not_called()
+        self.serverlessrepo_mock.create_application_version.assert_not_called()
+
+    def test_republish_changed_application_should_update_application(self):
+        self.serverlessrepo_mock.create_application.return_value = {
+            'ApplicationId': self.application_id
+        }
+        application_cache = ApplicationCache()
+        publish_application(self.template, application_cache=application_cache)
+
+        changed_metadata = self.template.replace('hello world', 'hello again')
+        actual_result = publish_application(changed_metadata, application_cache=application_cache)
+        self.assertEqual(actual_result['actions'], [UPDATE_APPLICATION, CREATE_APPLICATION_VERSION])
+
+        changed_template = self.template.replace('"Key2": {}', '"Key3": {}')
+        actual_result = publish_application(changed_template, application_cache=application_cache)
+        self.assertEqual(actual_result['actions'], [UPDATE_APPLICATION, CREATE_APPLICATION_VERSION])
+
+        # publishing the last template again is a no-op
+        actual_result = publish_application(changed_template, application_cache=application_cache)
+        self.assertEqual(actual_result['actions'], [])
+        self.assertEqual(self.serverlessrepo_mock.update_application.call_count, 2)
+
+
+class TestPublishApplications(TestCase):
+
+    def setUp(self):
+        patcher = patch('serverlessrepo.publish.get_client')
+        self.addCleanup(patcher.stop)
+        self.get_client_mock = patcher.start()
+        self.serverlessrepo_mock = Mock()
+        self.get_client_mock.return_value = self.serverlessrepo_mock
+        self.template = """
+        {
+            "Metadata": {
+                "AWS::ServerlessRepo::Application": {
+                    "Name": "test-app",
+                    "Description": "hello world",
+                    "Author": "abc"
+                }
+            }
+        }
+        """
+        self.application_id = 'arn:aws:serverlessrepo:us-east-1:123456789012:applications/test-app'
+        self.serverlessrepo_mock.create_application.return_value = {
+            'ApplicationId': self.application_id
+        }
+
+    def test_publish_applications_returns_results_in_input_order(self):
+        template_without_name = self.template.replace('"Name": "test-app",', '')
+        actual_result = publish_applications([self.template, template_without_name, self.template])
+
+        self.assertEqual(len(actual_result), 3)
+        self.assertEqual(actual_result[0]['result']['application_id'], self.application_id)
+        self.assertIsNone(actual_result[0]['error'])
+        self.assertIsNone(actual_result[1]['result'])
+        self.assertIsInstance(actual_result[1]['error'], InvalidApplicationMetadataError)
+        self.assertEqual(actual_result[2]['result']['actions'], [CREATE_APPLICATION])
+        self.assertEqual(self.serverlessrepo_mock.create_application.call_count, 2)
+
+    def test_publish_applications_shares_one_client(self):
+        publish_applications([self.template] * 5, max_workers=20)
+        self.get_client_mock.assert_called_once_with(max_pool_connections=20)
+
+    def test_publish_applications_parallel_version_doubles_connection_pool(self):
+        publish_applications([self.template], max_workers=20, parallel_version=True)
+        self.get_client_mock.assert_called_once_with(max_pool_connections=40)
+
+    def test_publish_prepared_applications_parallel_version_doubles_connection_pool(self):
+        publish_prepared_applications([prepare_template(self.template)], max_workers=20, parallel_version=True)
+        self.get_client_mock.assert_called_once_with(max_pool_connections=40)
+
+    def test_publish_applications_with_passed_in_sar_client(self):
+        sar_client = Mock()
+        sar_client.create_application.return_value = {
+            'ApplicationId': self.application_id
+        }
+        publish_applications([self.template, self.template], sar_client)
+
+        self.assertEqual(sar_client.create_application.call_count, 2)
+        self.get_client_mock.assert_not_called()
+
+    def test_publish_applications_rich_result(self):
+        actual_result = publish_applications([self.template], rich_result=True)
+        self.assertIsInstance(actual_result[0]['result'], PublishResult)
+
+    def test_publish_applications_empty_list(self):
+        self.assertEqual(publish_applications([]), [])
+
+
+class TestPreparedApplications(TestCase):
+
+    def setUp(self):
+        self.template = """
+        {
+            "Metadata": {
+                "AWS::ServerlessRepo::Application": {
+                    "Name": "test-app",
+                    "Description": "hello world",
+                    "Author": "abc"
+                }
+            },
+            "Resources": {}
+        }
+        """
+        self.application_id = 'arn:aws:serverlessrepo:us-east-1:123456789012:applications/test-app'
+        self.serverlessrepo_mock = Mock()
+        self.serverlessrepo_mock.create_application.return_value = {
+            'ApplicationId': self.application_id
+        }
+
+    def test_prepare_template(self):
+        app_metadata, stripped_template = prepare_template(self.template)
+
+        self.assertEqual(app_metadata.name, 'test-app')
+        self.assertEqual(stripped_template, yaml_dump({'Resources': {}}))
+
+    def test_prepare_template_empty_template(self):
+        with self.assertRaises(ValueError) as context:
+            prepare_template('')
+
+        self.assertEqual(str(context.exception), 'Require SAM template to prepare the template')
+
+    def test_prepare_templates_in_processes(self):
+        actual_result = prepare_templates([self.template, '{"Resources": {}}'], max_processes=2)
+
+        self.assertEqual(actual_result[0]['result'][0].name, 'test-app')
+        self.assertIsNone(actual_result[0]['error'])
+        self.assertIsInstance(actual_result[1]['error'], ApplicationMetadataNotFoundError)
+        self.assertIn('AWS::ServerlessRepo::Application', str(actual_result[1]['error']))
+
+    def test_publish_prepared_applications(self):
+        prepared_templates = [prepare_template(self.template)] * 2
+        actual_result = publish_prepared_applications(prepared_templates, self.serverlessrepo_mock)
+
+        self.assertEqual([r['result']['application_id'] for r in actual_result], [self.application_id] * 2)
+        self.assertEqual(self.serverlessrepo_mock.create_application.call_count, 2)
+        self.assertEqual(
+            self.serverlessrepo_mock.create_application.call_args[1]['TemplateBody'], prepared_templates[0][1])
+
+
+class TestPublishApplicationToRegions(TestCase):
+
+    def setUp(self):
+        patcher = patch('serverlessrepo.publish.get_client')
+        self.addCleanup(patcher.stop)
+        self.get_client_mock = patcher.start()
+        self.regions = ['us-east-1', 'eu-west-1', 'ap-southeast-2']
+        self.sar_clients = {}
+        for region in self.regions:
+            sar_client = Mock()
+            sar_client.create_application.return_value = {
+                'ApplicationId': 'arn:aws:serverlessrepo:{}:123456789012:applications/test-app'.format(region)
+            }
+            self.sar_clients[region] = sar_client
+        self.get_client_mock.side_effect = lambda region_name: self.sar_clients[region_name]
+        self.template = """
+        Metadata:
+          AWS::ServerlessRepo::Application:
+            Name: test-app
+            Description: hello world
+            Author: abc
+        Resources:
+          Function:
+            Type: AWS::Serverless::Function
+        """
+
+    @patch('serverlessrepo.publish.split_app_metadata')
+    def test_publish_application_to_regions_prepares_template_once(self, split_app_metadata_mock):
+        split_app_metadata_mock.return_value = (get_app_metadata(self.template_dict()), 'Resources: {}\n')
+        actual_result = publish_application_to_regions(self.template, self.regions)
+
+        split_app_metadata_mock.assert_called_once_with(self.template)
+        self.assertEqual(list(actual_result), self.regions)
+        for region in self.regions:
+            self.assertIsNone(actual_result[region]['error'])
+            self.assertEqual(actual_result[region]['result']['actions'], [CREATE_APPLICATION])
+            self.assertIn(region, actual_result[region]['result']['application_id'])
+            self.get_client_mock.assert_any_call(region_name=region)
+            self.assertEqual(self.sar_clients[region].create_application.call_args[1]['TemplateBody'],
+                             'Resources: {}\n')
+
+    def test_publish_application_to_regions_fails_regions_independently(self):
+        self.sar_clients['eu-west-1'].create_application.side_effect = ClientError(
+            {'Error': {'Code': 'InternalServerErrorException', 'Message': 'Random'}}, 'create_application')
+        actual_result = publish_application_to_regions(self.template, self.regions)
+
+        self.assertIsInstance(actual_result['eu-west-1']['error'], ServerlessRepoClientError)
+        self.assertIsNone(actual_result['eu-west-1']['result'])
+        self.assertIsNone(actual_result['us-east-1']['error'])
+        self.assertIsNone(actual_result['ap-southeast-2']['error'])
+
+    def test_publish_application_to_regions_with_passed_in_sar_clients(self):
+        sar_client = Mock()
+        sar_client.create_application.return_value = {'ApplicationId': 'test-app-id'}
+        actual_result = publish_application_to_regions(
+            self.template, ['us-east-1', 'eu-west-1', 'us-east-1'], sar_clients={'us-east-1': sar_client})
+
+        # each region is published to once
+        self.assertEqual(list(actual_result), ['us-east-1', 'eu-west-1'])
+        sar_client.create_application.assert_called_once()
+        self.get_client_mock.assert_called_once_with(region_name='eu-west-1')
+
+    def test_publish_application_to_regions_with_application_caches(self):
+        application_caches = {region: ApplicationCache() for region in self.regions}
+        publish_application_to_regions(self.template, self.regions, application_caches=application_caches)
+        actual_result = publish_application_to_regions(self.template, self.regions,
+                                                       application_caches=application_caches)
+
+        for region in self.regions:
+            self.assertEqual(actual_result[region]['result']['actions'], [])
+            self.sar_clients[region].create_application.assert_called_once()
+
+    def test_publish_application_to_regions_missing_metadata_raised_before_publishing(self):
+        with self.assertRaises(ApplicationMetadataNotFoundError):
+            publish_application_to_regions('Resources: {}', self.regions)
+
+        self.get_client_mock.assert_not_called()
+
+    def test_publish_application_to_regions_exception_without_regions(self):
+        with self.assertRaises(ValueError):
+            publish_application_to_regions(self.template, [])
+
+    def template_dict(self):
+        return {'Metadata': {'AWS::ServerlessRepo::Application': {
+            'Name': 'test-app', 'Description': 'hello world', 'Author': 'abc'}}}
+
+
 class TestUpdateApplicationMetadata(TestCase):
     def setUp(self):
-        patcher = patch('serverlessrepo.publish.boto3')
+        patcher = patch('serverlessrepo.publish.get_client')
         self.addCleanup(patcher.stop)
-        self.boto3_mock = patcher.start()
+        self.get_client_mock = patcher.start()
         self.serverlessrepo_mock = Mock()
-        self.boto3_mock.client.return_value = self.serverlessrepo_mock
+        self.get_client_mock.return_value = self.serverlessrepo_mock
         self.template = """
         {
             "Metadata": {
@@ -410,11 +905,35 @@ class TestUpdateApplicationMetadata(TestCase):
         update_application_metadata(self.template, self.application_id)
         parse_template_mock.assert_called_with(self.template)
 
-    @patch('serverlessrepo.publish.copy.deepcopy')
-    def test_publish_template_dict_should_copy_template(self, copy_mock):
-        copy_mock.return_value = self.template_dict
-        update_application_metadata(self.template_dict, self.application_id)
-        copy_mock.assert_called_with(self.template_dict)
+    @patch('serverlessrepo.publish.parse_template')
+    def test_template_cache_should_parse_template_once(self, parse_template_mock):
+        parse_template_mock.return_value = self.template_dict
+        self.serverlessrepo_mock.create_application.return_value = {
+            'ApplicationId': self.application_id
+        }
+        set_template_cache(TemplateCache())
+        update_application_metadata(self.template, self.application_id)
+        update_application_metadata(self.template, self.application_id)
+        publish_application(self.template)
+        publish_application(self.template)
+
+        # The parsed template isn't cached, publishing parses it once more to strip it
+        self.assertEqual(parse_template_mock.call_count, 2)
+        self.assertEqual(self.serverlessrepo_mock.create_application.call_count, 2)
+
+    @patch('serverlessrepo.publish.parse_template')
+    def test_update_application_metadata_without_template_cache(self, parse_template_mock):
+        parse_template_mock.return_value = self.template_dict
+        update_application_metadata(self.template, self.application_id)
+        update_application_metadata(self.template, self.application_id)
+
+        self.assertEqual(parse_template_mock.call_count, 2)
+
+    def test_update_application_metadata_with_template_dict_should_not_modify_template(self):
+        template_dict = json.loads(self.template)
+        update_application_metadata(template_dict, self.application_id)
+        self.assertEqual(template_dict, self.template_dict)
+        self.serverlessrepo_mock.update_application.assert_called_once()
 
     def test_update_application_metadata_ignore_irrelevant_fields(self):
         update_application_metadata(self.template, self.application_id)
@@ -426,6 +945,25 @@ class TestUpdateApplicationMetadata(TestCase):
         }
         self.serverlessrepo_mock.update_application.assert_called_once_with(**expected_request)
 
+    @patch('serverlessrepo.publish.parse_template')
+    def test_update_application_metadata_with_yaml_template_should_not_parse_template(self, parse_template_mock):
+        template = (
+            "Metadata:\n"
+            "  AWS::ServerlessRepo::Application:\n"
+            "    Name: test-app\n"
+            "    Description: hello world\n"
+            "    Author: abc\n"
+            "Resources:\n"
+            "  Key1: !Ref Key2\n"
+        )
+        update_application_metadata(template, self.application_id)
+        parse_template_mock.assert_not_called()
+        self.serverlessrepo_mock.update_application.assert_called_once_with(
+            ApplicationId=self.application_id,
+            Author='abc',
+            Description='hello world'
+        )
+
     def test_update_application_metadata_with_passed_in_sar_client(self):
         sar_client = Mock()
         update_application_metadata(self.template, self.application_id, sar_client)
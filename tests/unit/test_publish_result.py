@@ -0,0 +1,34 @@
+from unittest import TestCase
+
+from serverlessrepo.publish_result import PublishResult
+
+
+class TestPublishResult(TestCase):
+
+    def test_record_call(self):
+        result = PublishResult()
+        result.record_call('create_application', 0.5, u'Resources: {}é')
+        result.record_call('update_application', 0.25)
+        result.record_call('update_application', 0.25)
+
+        self.assertEqual(result.sar_calls, 3)
+        self.assertEqual(result.call_timings, {'create_application': 0.5, 'update_application': 0.5})
+        # bytes of the UTF-8 encoded template, not characters
+        self.assertEqual(result.template_bytes, 15)
+
+    def test_to_dict(self):
+        result = PublishResult()
+        result.application_id = 'test-app-id'
+        result.actions = ['CREATE_APPLICATION']
+        result.details = {'Name': 'test-app'}
+        self.assertEqual(result.to_dict(), {
+            'application_id': 'test-app-id',
+            'actions': ['CREATE_APPLICATION'],
+            'details': {'Name': 'test-app'}
+        })
+
+    def test_slots(self):
+        result = PublishResult()
+        with self.assertRaises(AttributeError):
+            result.application_name = 'test-app'  # pylint: disable=assigning-non-slot
+        self.assertIn("application_id=None", repr(result))
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from mock import patch
+
+from serverlessrepo.application_metadata import ApplicationMetadata
+from serverlessrepo.parser import TemplateCache
+from serverlessrepo.template_directory_cache import TemplateDirectoryCache
+
+
+class TestTemplateDirectoryCache(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.path = os.path.join(self.temp_dir, 'templates')
+        self.app_metadata = ApplicationMetadata({'Name': 'test-app', 'Author': 'abc'})
+        self.stripped_template = 'Resources: {}\n'
+
+    def get_entry_paths(self):
+        # entry files are named after the digest of their template, after a version prefix
+        return {name[:-len('.json')].rsplit('-', 1)[1]: os.path.join(self.path, name)
+                for name in os.listdir(self.path) if name.endswith('.json')}
+
+    def test_persist_to_directory(self):
+        cache = TemplateDirectoryCache(self.path)
+        cache.put('digest', self.app_metadata, self.stripped_template)
+
+        self.assertEqual(TemplateDirectoryCache(self.path).get('digest'),
+                         (self.app_metadata, self.stripped_template))
+        # temporary files shouldn't be left behind
+        self.assertEqual(list(self.get_entry_paths()), ['digest'])
+        self.assertEqual(len(os.listdir(self.path)), 1)
+
+    def test_entries_are_specific_to_versions(self):
+        cache = TemplateDirectoryCache(self.path)
+        cache.put('digest', self.app_metadata, self.stripped_template)
+        entry_path = self.get_entry_paths()['digest']
+        os.rename(entry_path, os.path.join(self.path, 'v1-0.1.9-pyyaml-5.1-digest.json'))
+
+        self.assertIn('-pyyaml-', os.path.basename(entry_path))
+        self.assertIsNone(cache.get('digest'))
+
+    def test_missing_entry(self):
+        self.assertIsNone(TemplateDirectoryCache(self.path).get('digest'))
+
+    def test_ignore_malformed_entry(self):
+        cache = TemplateDirectoryCache(self.path)
+        cache.put('digest', self.app_metadata, self.stripped_template)
+        for content in ['not json', '{"ApplicationMetadata": {"Name": "test-app"}}']:
+            with open(self.get_entry_paths()['digest'], 'w') as f:
+                f.write(content)
+
+            self.assertIsNone(cache.get('digest'), content)
+
+    def test_skip_metadata_json_cannot_represent(self):
+        cache = TemplateDirectoryCache(self.path)
+        cache.put('digest', ApplicationMetadata({'Name': 'test-app', 'Labels': {object()}}), self.stripped_template)
+
+        self.assertEqual(os.listdir(self.path), [])
+
+    def test_evict_least_recently_used_entries(self):
+        cache = TemplateDirectoryCache(self.path, max_bytes=350)
+        for i, digest in enumerate(['a', 'b', 'c']):
+            cache.put(digest, self.app_metadata, self.stripped_template)
+            os.utime(self.get_entry_paths()[digest], (i, i))
+        cache.get('a')
+        cache.put('d', self.app_metadata, self.stripped_template)
+
+        self.assertEqual(sorted(self.get_entry_paths()), ['a', 'c', 'd'])
+
+    def test_remove_stale_temporary_files(self):
+        os.makedirs(self.path)
+        stale_path = os.path.join(self.path, '.serverlessrepo-template-stale')
+        for path in [stale_path, os.path.join(self.path, '.serverlessrepo-template-new')]:
+            with open(path, 'w'):
+                pass
+        os.utime(stale_path, (0, 0))
+
+        TemplateDirectoryCache(self.path)
+        self.assertEqual(os.listdir(self.path), ['.serverlessrepo-template-new'])
+
+    def test_template_cache_falls_back_to_directory(self):
+        TemplateCache(directory_cache=TemplateDirectoryCache(self.path)).put_prepared(
+            'digest', self.app_metadata, self.stripped_template)
+        template_cache = TemplateCache(directory_cache=TemplateDirectoryCache(self.path))
+
+        self.assertEqual(template_cache.get_prepared('digest'), (self.app_metadata, self.stripped_template))
+        with patch.object(template_cache.directory_cache, 'get') as get_mock:
+            template_cache.get_prepared('digest')
+        get_mock.assert_not_called()
@@ -0,0 +1,130 @@
+from unittest import TestCase
+from mock import patch
+
+from botocore.exceptions import ClientError
+
+from serverlessrepo import publish_application, share_application_with_accounts, add_accounts_to_application
+from serverlessrepo.parser import parse_application_id
+from serverlessrepo.publish import CREATE_APPLICATION, UPDATE_APPLICATION, CREATE_APPLICATION_VERSION
+from serverlessrepo.testing import FakeServerlessRepoClient
+from serverlessrepo.throttling import CallScheduler
+
+
+class TestFakeServerlessRepoClient(TestCase):
+
+    def setUp(self):
+        self.sar_client = FakeServerlessRepoClient()
+        self.template = (
+            "Metadata:\n"
+            "  AWS::ServerlessRepo::Application:\n"
+            "    Name: test-app\n"
+            "    Description: hello world\n"
+            "    Author: abc\n"
+            "    SemanticVersion: 1.0.0\n"
+            "Resources: {}\n"
+        )
+        self.application_id = 'arn:aws:serverlessrepo:us-east-1:123456789012:applications/test-app'
+
+    def test_publish_application(self):
+        actual_result = publish_application(self.template, self.sar_client)
+        self.assertEqual(actual_result['application_id'], self.application_id)
+        self.assertEqual(actual_result['actions'], [CREATE_APPLICATION])
+
+        # republishing goes through the conflict fallback
+        actual_result = publish_application(self.template, self.sar_client)
+        self.assertEqual(actual_result['actions'], [UPDATE_APPLICATION])
+
+        actual_result = publish_application(self.template.replace('1.0.0', '1.0.1'), self.sar_client)
+        self.assertEqual(actual_result['actions'], [UPDATE_APPLICATION, CREATE_APPLICATION_VERSION])
+
+        application = self.sar_client.get_application_state(self.application_id)
+        self.assertEqual(application['Versions'], {'1.0.0': 'Resources: {}\n', '1.0.1': 'Resources: {}\n'})
+        self.assertEqual(self.sar_client.calls, {
+            'create_application': 3,
+            'update_application': 2,
+            'create_application_version': 2
+        })
+
+    def test_conflict_message_contains_application_id(self):
+        self.sar_client.create_application(Name='test-app', Description='hello world', Author='abc')
+        with self.assertRaises(ClientError) as context:
+            self.sar_client.create_application(Name='test-app', Description='hello world', Author='abc')
+
+        self.assertEqual(context.exception.response['Error']['Code'], 'ConflictException')
+        self.assertEqual(parse_application_id(context.exception.response['Error']['Message']), self.application_id)
+
+    def test_application_not_found(self):
+        with self.assertRaises(ClientError) as context:
+            self.sar_client.update_application(ApplicationId=self.application_id, Author='abc')
+
+        self.assertEqual(context.exception.response['Error']['Code'], 'NotFoundException')
+
+    def test_application_policy(self):
+        publish_application(self.template, self.sar_client)
+        share_application_with_accounts(self.application_id, ['123456789013'], self.sar_client)
+        add_accounts_to_application(self.application_id, ['123456789014'], self.sar_client)
+
+        statements = self.sar_client.get_application_policy(ApplicationId=self.application_id)['Statements']
+        self.assertEqual(statements, [{
+            'StatementId': '0',
+            'Principals': ['123456789013', '123456789014'],
+            'Actions': ['Deploy']
+        }])
+
+    def test_fail_next(self):
+        self.sar_client.fail_next('create_application', 'BadRequestException', 'Invalid S3 URI', count=2)
+        for _ in range(2):
+            with self.assertRaises(ClientError) as context:
+                self.sar_client.create_application(Name='test-app', Description='hello world', Author='abc')
+            self.assertEqual(context.exception.response['Error']['Message'], 'Invalid S3 URI')
+
+        self.sar_client.create_application(Name='test-app', Description='hello world', Author='abc')
+
+    def test_throttling_retried_by_scheduler(self):
+        sar_client = FakeServerlessRepoClient(throttle_rate=0.5, seed=1)
+        scheduler = CallScheduler(max_attempts=20, sleep=lambda delay: None)
+        for i in range(10):
+            scheduler.call(sar_client, 'create_application', Name='app{}'.format(i), Description='d', Author='a')
+
+        self.assertGreater(scheduler.stats()['throttled'], 0)
+        self.assertEqual(sar_client.calls['create_application'], 10 + scheduler.stats()['retries'])
+
+    def test_error_rate(self):
+        sar_client = FakeServerlessRepoClient(error_rate=1)
+        with self.assertRaises(ClientError) as context:
+            sar_client.create_application(Name='test-app', Description='hello world', Author='abc')
+
+        self.assertEqual(context.exception.response['Error']['Code'], 'InternalServerErrorException')
+        self.assertEqual(context.exception.response['ResponseMetadata']['HTTPStatusCode'], 500)
+
+    def test_errors_retried_by_scheduler(self):
+        sar_client = FakeServerlessRepoClient()
+        sar_client.fail_next('create_application', 'InternalServerErrorException')
+        scheduler = CallScheduler(sleep=lambda delay: None)
+        scheduler.call(sar_client, 'create_application', Name='test-app', Description='d', Author='a')
+
+        self.assertEqual(scheduler.stats()['retries'], 1)
+        sar_client.fail_next('create_application', 'BadRequestException')
+        with self.assertRaises(ClientError):
+            scheduler.call(sar_client, 'create_application', Name='other-app', Description='d', Author='a')
+        self.assertEqual(scheduler.stats()['retries'], 1)
+
+    @patch('serverlessrepo.testing._clock')
+    def test_rate_limit(self, clock_mock):
+        sar_client = FakeServerlessRepoClient(rate_limit=2)
+        outcomes = []
+        for i, now in enumerate([100.0, 100.5, 100.9, 101.0]):
+            clock_mock.return_value = now
+            try:
+                sar_client.create_application(Name='app{}'.format(i), Description='d', Author='a')
+                outcomes.append(None)
+            except ClientError as e:
+                outcomes.append(e.response['Error']['Code'])
+
+        self.assertEqual(outcomes, [None, None, 'TooManyRequestsException', None])
+
+    def test_latency(self):
+        delays = []
+        sar_client = FakeServerlessRepoClient(latency=lambda: 0.25, sleep=delays.append)
+        sar_client.create_application(Name='test-app', Description='hello world', Author='abc')
+        self.assertEqual(delays, [0.25])
@@ -0,0 +1,166 @@
+from unittest import TestCase
+from mock import Mock
+
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from serverlessrepo import throttling, make_application_private
+from serverlessrepo.throttling import CallScheduler, TokenBucket
+
+
+class TestCallScheduler(TestCase):
+
+    def setUp(self):
+        self.sleep_mock = Mock()
+        self.sar_client = Mock()
+        self.throttled_error = ClientError(
+            {'Error': {'Code': 'TooManyRequestsException', 'Message': 'Rate exceeded'}},
+            'create_application'
+        )
+        self.bad_request_error = ClientError(
+            {'Error': {'Code': 'BadRequestException', 'Message': 'Random message'}},
+            'create_application'
+        )
+
+    def test_call_succeeded(self):
+        scheduler = CallScheduler(sleep=self.sleep_mock)
+        self.sar_client.create_application.return_value = {'ApplicationId': 'id'}
+
+        response = scheduler.call(self.sar_client, 'create_application', Name='name')
+        self.assertEqual(response, {'ApplicationId': 'id'})
+        self.sar_client.create_application.assert_called_once_with(Name='name')
+        self.assertEqual(scheduler.stats(), {'calls': 1, 'retries': 0, 'throttled': 0, 'wait_time': 0.0})
+
+    def test_retry_throttled_call(self):
+        scheduler = CallScheduler(base_delay=1, sleep=self.sleep_mock)
+        self.sar_client.create_application.side_effect = [self.throttled_error, self.throttled_error, {}]
+
+        self.assertEqual(scheduler.call(self.sar_client, 'create_application'), {})
+        self.assertEqual(self.sar_client.create_application.call_count, 3)
+        self.assertEqual(self.sleep_mock.call_count, 2)
+        # jittered exponential backoff
+        self.assertLessEqual(self.sleep_mock.call_args_list[0][0][0], 1)
+        self.assertLessEqual(self.sleep_mock.call_args_list[1][0][0], 2)
+
+        stats = scheduler.stats()
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['throttled'], 2)
+        self.assertAlmostEqual(stats['wait_time'], sum(c[0][0] for c in self.sleep_mock.call_args_list))
+
+    def test_raise_after_max_attempts(self):
+        scheduler = CallScheduler(max_attempts=3, sleep=self.sleep_mock)
+        self.sar_client.create_application.side_effect = self.throttled_error
+
+        with self.assertRaises(ClientError):
+            scheduler.call(self.sar_client, 'create_application')
+        self.assertEqual(self.sar_client.create_application.call_count, 3)
+
+    def test_do_not_retry_other_errors(self):
+        scheduler = CallScheduler(sleep=self.sleep_mock)
+        self.sar_client.create_application.side_effect = self.bad_request_error
+
+        with self.assertRaises(ClientError):
+            scheduler.call(self.sar_client, 'create_application')
+        self.sar_client.create_application.assert_called_once()
+        self.sleep_mock.assert_not_called()
+
+    def test_retry_transient_errors(self):
+        scheduler = CallScheduler(sleep=self.sleep_mock)
+        server_error = ClientError(
+            {'Error': {'Code': 'InternalServerErrorException', 'Message': 'Random message'},
+             'ResponseMetadata': {'HTTPStatusCode': 500}},
+            'create_application'
+        )
+        connection_error = EndpointConnectionError(endpoint_url='https://serverlessrepo.us-east-1.amazonaws.com')
+        self.sar_client.create_application.side_effect = [server_error, connection_error, {}]
+
+        self.assertEqual(scheduler.call(self.sar_client, 'create_application'), {})
+        self.assertEqual(self.sar_client.create_application.call_count, 3)
+        self.assertEqual(scheduler.stats()['retries'], 2)
+        self.assertEqual(scheduler.stats()['throttled'], 0)
+
+    def test_retry_budget(self):
+        scheduler = CallScheduler(retry_budget=1, sleep=self.sleep_mock)
+        self.sar_client.create_application.side_effect = [self.throttled_error, {}, self.throttled_error]
+
+        scheduler.call(self.sar_client, 'create_application')
+        # the budget is spent, the next throttled call fails without retrying
+        with self.assertRaises(ClientError):
+            scheduler.call(self.sar_client, 'create_application')
+        self.assertEqual(scheduler.stats()['retries'], 1)
+
+    def test_rate_limit_per_region(self):
+        scheduler = CallScheduler(rate=1, sleep=self.sleep_mock)
+        other_client = Mock()
+        other_client.meta.region_name = 'us-west-2'
+
+        scheduler.call(self.sar_client, 'create_application')
+        scheduler.call(other_client, 'create_application')
+        self.sleep_mock.assert_not_called()
+
+        scheduler.call(self.sar_client, 'create_application')
+        self.sleep_mock.assert_called_once()
+        self.assertGreater(scheduler.stats()['wait_time'], 0)
+
+    def test_default_scheduler(self):
+        scheduler = CallScheduler(sleep=self.sleep_mock)
+        original_scheduler = throttling.get_scheduler()
+        self.addCleanup(throttling.set_scheduler, original_scheduler)
+
+        throttling.set_scheduler(scheduler)
+        self.assertIs(throttling.get_scheduler(), scheduler)
+        throttling.make_call(self.sar_client, 'create_application', Name='name')
+        self.sar_client.create_application.assert_called_once_with(Name='name')
+        self.assertEqual(scheduler.stats()['calls'], 1)
+
+
+class TestTokenBucket(TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.sleep_mock = Mock()
+
+    def clock(self):
+        return self.now
+
+    def test_acquire_waits_for_tokens(self):
+        bucket = TokenBucket(2, sleep=self.sleep_mock, clock=self.clock)
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertEqual(bucket.acquire(), 0.5)
+        self.sleep_mock.assert_called_once_with(0.5)
+
+        # tokens are refilled over time
+        self.now = 10.0
+        self.assertEqual(bucket.acquire(), 0)
+
+    def test_rate_adapts_to_throttling(self):
+        bucket = TokenBucket(16, sleep=self.sleep_mock, clock=self.clock)
+        bucket.on_throttled()
+        self.assertEqual(bucket.rate, 8)
+        bucket.on_success()
+        self.assertEqual(bucket.rate, 9)
+        for _ in range(10):
+            bucket.on_success()
+        self.assertEqual(bucket.rate, 16)
+        for _ in range(10):
+            bucket.on_throttled()
+        self.assertEqual(bucket.rate, 1)
+
+
+class TestThrottledSarCalls(TestCase):
+
+    def test_permission_helper_retries_throttled_calls(self):
+        scheduler = CallScheduler(sleep=Mock())
+        original_scheduler = throttling.get_scheduler()
+        self.addCleanup(throttling.set_scheduler, original_scheduler)
+        throttling.set_scheduler(scheduler)
+
+        sar_client = Mock()
+        sar_client.put_application_policy.side_effect = [
+            ClientError({'Error': {'Code': 'TooManyRequestsException', 'Message': 'Rate exceeded'}},
+                        'put_application_policy'),
+            {}
+        ]
+        make_application_private('application-id', sar_client)
+        self.assertEqual(sar_client.put_application_policy.call_count, 2)
+        self.assertEqual(scheduler.stats()['retries'], 1)